@@ -1,10 +1,18 @@
+import atexit
+import hashlib
+import logging
+import time
+from datetime import datetime
 from flask import Flask
 from flask_wtf.csrf import CSRFProtect
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from apscheduler.schedulers.background import BackgroundScheduler
-from app.models import db
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app.models import db, VersionStamp
 from app.config import Config
+from app.caching import Cache
 
 # Initialize extensions
 csrf = CSRFProtect()
@@ -13,6 +21,25 @@ limiter = Limiter(
     default_limits=["200 per day", "50 per hour"],
     storage_uri="memory://"
 )
+cache = Cache()
+
+logger = logging.getLogger(__name__)
+
+
+def _begin_sqlite_transactions_for_savepoints(engine):
+    """
+    Open a transaction before a SAVEPOINT when the sqlite3 driver hasn't yet
+
+    The driver only sends BEGIN before the first INSERT/UPDATE/DELETE, so a
+    SAVEPOINT issued first would run outside the transaction and its
+    RELEASE would commit. Bulk writes rely on savepoints to isolate bad rows.
+    Plain reads keep running outside a transaction, so they hold no lock
+    that a concurrent writer would have to wait for.
+    """
+    @event.listens_for(engine, 'savepoint')
+    def begin_before_savepoint(connection, name):
+        if not connection.connection.dbapi_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN')
 
 
 def create_app():
@@ -27,6 +54,9 @@ def create_app():
     csrf.init_app(app)
     limiter.init_app(app)
 
+    # Initialize cache
+    cache.init_app(app)
+
     # Register blueprints
     from app.auth import auth_bp
     from app.news import news_bp
@@ -38,20 +68,191 @@ def create_app():
     app.register_blueprint(admin_bp)
     app.register_blueprint(interactions_bp)
 
-    # Create database tables
     with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            _begin_sqlite_transactions_for_savepoints(db.engine)
+        _ensure_schema()
+
+        if Config.PRELOAD_APP:
+            # Loaded once in the Gunicorn master and forked: connections don't
+            # survive a fork, so close the master's. Each worker then gets a
+            # fresh pool and its own background threads from the post_fork
+            # hook in gunicorn.conf.py (see after_worker_fork)
+            db.engine.dispose()
+
+    if not Config.PRELOAD_APP:
+        start_background_services(app)
+
+    return app
+
+
+def _schema_version(metadata, dialect):
+    """Digest of the DDL of every table and index (and the data migrations), so any model change gives a new version"""
+    from app.schema import MIGRATIONS
+    ddl = [f'migration:{name}' for name, _ in MIGRATIONS]
+    for table in metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl.extend(str(CreateIndex(index).compile(dialect=dialect))
+                   for index in sorted(table.indexes, key=lambda index: index.name))
+    return hashlib.sha1('\n'.join(ddl).encode('utf-8')).hexdigest()
+
+
+def _ensure_schema():
+    """
+    Create or migrate the tables and register the default feeds
+
+    The schema version (a digest of the models' DDL) is recorded in
+    version_stamps once the live tables, columns and indexes are checked
+    to match the models; with SCHEMA_CHECK=auto a boot that finds its
+    version there skips this, which otherwise inspects every table on every
+    worker start. SCHEMA_CHECK=always runs it regardless, and skip does no
+    schema work at all (when something else manages the schema).
+    """
+    if Config.SCHEMA_CHECK == 'skip':
+        return
+
+    stamp = f'schema:{_schema_version(db.metadata, db.engine.dialect)}'
+    if Config.SCHEMA_CHECK == 'auto':
+        try:
+            if db.session.get(VersionStamp, stamp) is not None:
+                return
+        except SQLAlchemyError:
+            db.session.rollback()  # No version_stamps table yet: a new database
+
+    # One worker migrates at a time; the others wait, then find its stamp
+    from app.schema import (
+        SCHEMA_LEASE_TTL, create_lease_table, add_missing_columns, run_migrations,
+        create_missing_indexes, schema_drift
+    )
+    from app.services.scheduler_lease import DatabaseLease
+    create_lease_table()
+    lease = DatabaseLease('schema', ttl=SCHEMA_LEASE_TTL)
+    while not lease.acquire():
+        time.sleep(1)
+    try:
         db.create_all()
+        db.session.commit()
+        if Config.SCHEMA_CHECK == 'auto' and db.session.get(VersionStamp, stamp) is not None:
+            return  # Migrated by the worker we waited for
+
+        # create_all() skips existing tables: add their new columns, fill them
+        # in for the rows already there, then build their new indexes
+        add_missing_columns()
+        run_migrations()
+        create_missing_indexes()
+
+        from app.services.feed_registry import RSS_FEEDS, seed_feeds
+        try:
+            seed_feeds(RSS_FEEDS)
+        except IntegrityError:
+            db.session.rollback()  # Another worker seeded them first
+
+        # Fill the article_counts rollup from the articles already there
+        from app.services.article_stats import rebuild_article_counts
+        rebuild_article_counts()
+
+        drift = schema_drift()
+        if drift:
+            # No stamp, so the next boot tries again
+            logger.error(f"Database schema doesn't match the models: {'; '.join(drift)}")
+            return
 
-    # Start background scheduler for daily cache refresh
-    scheduler = BackgroundScheduler()
+        try:
+            VersionStamp.query.filter(VersionStamp.name.like('schema:%'), VersionStamp.name != stamp)\
+                .delete(synchronize_session=False)
+            if db.session.get(VersionStamp, stamp) is None:
+                db.session.add(VersionStamp(name=stamp, version=1))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # Another worker recorded it first
+    finally:
+        lease.release()
+
+
+def after_worker_fork(app):
+    """
+    Set up a worker forked from a preloaded app (Gunicorn post_fork hook)
+
+    Drops the connections inherited from the master without closing them
+    (they are the master's), then starts the worker's background threads.
+    """
     with app.app_context():
+        db.engine.dispose(close=False)
+    start_background_services(app)
+
+
+def start_background_services(app):
+    """
+    Start this process's scheduler and job threads
+
+    Called by create_app(), or by after_worker_fork() in each worker when the
+    app is preloaded.
+    """
+    # Start background scheduler: poll due feeds, plus daily maintenance. Every
+    # worker runs it, but jobs only execute in the one holding the leader lease
+    if Config.SCHEDULER_ENABLED:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        from app.services.scheduler_lease import SchedulerLeader
         from app.services.cache_service import update_cache
+        from app.services.engagement_service import reconcile_engagement_counters
+        from app.services.retention_service import apply_retention
+        from app.services.article_stats import rebuild_article_counts
+        from app.services.job_queue import expire_jobs
+
+        scheduler = BackgroundScheduler()
+        leader = SchedulerLeader(app)
+        scheduler.add_job(
+            func=leader.heartbeat,
+            trigger='interval',
+            seconds=Config.SCHEDULER_HEARTBEAT,
+            id='scheduler_heartbeat',
+            next_run_time=datetime.now(),  # Elect a leader straight away
+            max_instances=1,
+            coalesce=True
+        )
+        scheduler.add_job(
+            func=leader.run,
+            args=['poll_due_feeds', update_cache],
+            trigger='interval',
+            seconds=Config.FEED_SCHEDULER_TICK,  # Each feed is polled on its own interval
+            id='poll_due_feeds',
+            max_instances=1,
+            coalesce=True
+        )
+        scheduler.add_job(
+            func=leader.run,
+            args=['reconcile_engagement_counters', reconcile_engagement_counters],
+            trigger='cron',
+            hour=5,  # Repair any counter drift once a day
+            id='reconcile_engagement_counters'
+        )
+        scheduler.add_job(
+            func=leader.run,
+            args=['apply_retention', apply_retention],
+            trigger='cron',
+            minute=30,  # Expire and archive old articles every hour, a batch at a time
+            id='apply_retention'
+        )
         scheduler.add_job(
-            func=lambda: update_cache(app),
+            func=leader.run,
+            args=['rebuild_article_counts', rebuild_article_counts],
             trigger='cron',
-            hour=6,  # Run at 6 AM daily
-            id='refresh_news_cache'
+            hour=5,
+            minute=15,  # Repair any drift in the dashboard's article counts once a day
+            id='rebuild_article_counts'
         )
-    scheduler.start()
+        scheduler.add_job(
+            func=leader.run,
+            args=['expire_jobs', expire_jobs],
+            trigger='interval',
+            seconds=Config.JOB_EXPIRE_INTERVAL,  # Fail jobs whose worker died, drop old finished ones
+            id='expire_jobs',
+            max_instances=1,
+            coalesce=True
+        )
+        scheduler.start()
+        atexit.register(leader.release)  # Let another worker take over without waiting for expiry
 
-    return app
+    # Thread pool for admin-triggered background jobs (fetches, CSV imports, bulk reviews)
+    from app.services.job_queue import runner as job_runner
+    job_runner.start(app, Config.JOB_WORKERS)
@@ -1,16 +1,28 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
 from functools import wraps
 from datetime import datetime
 import csv
 import io
-from app.models import db, User, Article, ReportedComment
-from app.auth import login_required
+from app.models import db, User, Article, ReportedComment, Feed, BackgroundJob
+from app.config import Config
+from app.auth import login_required, get_current_principal
 from app.services.cache_service import (
-    fetch_articles_for_review,
     get_pending_articles,
     approve_article,
-    reject_article
+    reject_article,
+    bulk_review_articles,
+    get_dashboard_counts
 )
+from app import cache
+from app.services.engagement_service import adjust_counters
+from app.services.feed_snapshot import invalidate_feed
+from app.services.ingest_service import url_hash
+from app.services.story_service import assign_stories
+from app.services.article_stats import count_inserted, update_articles
+from app.services.feed_registry import feed_health
+from app.services.scheduler_lease import job_status
+from app.services.job_queue import enqueue
+from app.services import admin_jobs  # noqa: F401 (registers the job handlers)
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -23,8 +35,8 @@ def admin_required(f):
             flash('Please log in to access admin panel', 'error')
             return redirect(url_for('auth.login'))
 
-        user = User.query.get(session['user_id'])
-        if not user or not user.is_admin:
+        principal = get_current_principal()
+        if not principal or not principal.is_admin:
             flash('Admin access required', 'error')
             return redirect(url_for('news.feed'))
 
@@ -36,26 +48,25 @@ def admin_required(f):
 @admin_required
 def dashboard():
     """Admin dashboard"""
-    total_articles = Article.query.filter_by(is_active=True, status='approved').count()
-    manual_articles = Article.query.filter_by(source_type='manual', is_active=True, status='approved').count()
-    auto_articles = Article.query.filter_by(source_type='auto', is_active=True, status='approved').count()
-    pending_count = Article.query.filter_by(status='pending').count()
-    reports_count = ReportedComment.query.filter_by(is_resolved=False).count()
+    counts = get_dashboard_counts()
 
     recent_manual = Article.query.filter_by(source_type='manual', is_active=True)\
         .order_by(Article.cached_at.desc()).limit(10).all()
 
     return render_template(
         'admin/dashboard.html',
-        total_articles=total_articles,
-        manual_articles=manual_articles,
-        auto_articles=auto_articles,
         recent_manual=recent_manual,
-        pending_count=pending_count,
-        reports_count=reports_count
+        **counts
     )
 
 
+@admin_bp.route('/cache-stats')
+@admin_required
+def cache_stats():
+    """Cache hit/miss/eviction statistics for this worker"""
+    return jsonify(cache.stats())
+
+
 @admin_bp.route('/add-news', methods=['GET', 'POST'])
 @admin_required
 def add_news():
@@ -72,6 +83,11 @@ def add_news():
             flash('Title, URL, and Source Name are required', 'error')
             return render_template('admin/add_news.html')
 
+        # Reject URLs we already have (in any status)
+        if Article.query.filter_by(url_hash=url_hash(url)).first():
+            flash('An article with this URL already exists', 'error')
+            return render_template('admin/add_news.html')
+
         # Create new article (pending approval)
         try:
             article = Article(
@@ -80,6 +96,7 @@ def add_news():
                 content=description,  # Use description as content for manual entries
                 image_url=image_url if image_url else None,
                 source_url=url,
+                url_hash=url_hash(url),
                 source_name=source_name,
                 published_at=datetime.utcnow(),
                 source_type='manual',
@@ -88,7 +105,17 @@ def add_news():
                 is_active=True
             )
 
+            from app.services.sentiment_service import score_articles
+
             db.session.add(article)
+            db.session.flush()
+            count_inserted([{
+                'source_type': article.source_type,
+                'status': article.status,
+                'is_active': article.is_active
+            }])
+            assign_stories()
+            score_articles()
             db.session.commit()
 
             flash('News article submitted for review!', 'success')
@@ -150,77 +177,14 @@ def upload_csv():
                 flash(f'CSV is missing required columns: {", ".join(missing_columns)}', 'error')
                 return redirect(url_for('admin.upload_csv'))
 
-            # Process CSV rows
-            articles_added = 0
-            articles_skipped = 0
-            errors = []
-
-            for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 (header is row 1)
-                try:
-                    # Get values using normalized column names
-                    title = None
-                    url = None
-                    source_name = None
-                    description = None
-                    image_url = None
-
-                    for key, value in row.items():
-                        normalized_key = key.lower().strip().replace(' ', '_')
-                        if normalized_key == 'title' or normalized_key == 'article_title':
-                            title = value.strip()
-                        elif normalized_key == 'url' or normalized_key == 'article_url':
-                            url = value.strip()
-                        elif normalized_key == 'source_name':
-                            source_name = value.strip()
-                        elif normalized_key == 'description':
-                            description = value.strip()
-                        elif normalized_key == 'image_url':
-                            image_url = value.strip()
-
-                    # Validate required fields
-                    if not title or not url or not source_name:
-                        articles_skipped += 1
-                        errors.append(f'Row {row_num}: Missing required fields (title, url, or source_name)')
-                        continue
-
-                    # Create article (pending approval)
-                    article = Article(
-                        title=title,
-                        description=description if description else None,
-                        content=description if description else None,
-                        image_url=image_url if image_url else None,
-                        source_url=url,
-                        source_name=source_name,
-                        published_at=datetime.utcnow(),
-                        source_type='manual',
-                        added_by_id=session['user_id'],
-                        status='pending',
-                        is_active=True
-                    )
-
-                    db.session.add(article)
-                    articles_added += 1
-
-                except Exception as e:
-                    articles_skipped += 1
-                    errors.append(f'Row {row_num}: {str(e)}')
-                    continue
-
-            # Commit all articles
-            db.session.commit()
-
-            # Show results
-            if articles_added > 0:
-                flash(f'Successfully imported {articles_added} article(s) for review!', 'success')
-
-            if articles_skipped > 0:
-                flash(f'Skipped {articles_skipped} row(s) due to errors', 'error')
-
-            if errors and len(errors) <= 10:  # Only show first 10 errors
-                for error in errors[:10]:
-                    flash(error, 'error')
-
-            return redirect(url_for('admin.review_articles'))
+            # Import in the background; the review page shows the job's progress
+            job_id = enqueue(
+                'import_csv',
+                {'user_id': session['user_id'], 'filename': file.filename},
+                payload=stream.getvalue(),
+                user_id=session['user_id']
+            )
+            return job_started(job_id, f'Importing {file.filename} in the background')
 
         except Exception as e:
             db.session.rollback()
@@ -260,7 +224,8 @@ def delete_news(article_id):
     article = Article.query.get_or_404(article_id)
 
     try:
-        article.is_active = False
+        update_articles([Article.id == article.id], {'is_active': False})
+        invalidate_feed()
         db.session.commit()
         flash('Article deleted successfully', 'success')
     except Exception as e:
@@ -281,10 +246,8 @@ def bulk_delete():
         return redirect(url_for('admin.manage_news'))
 
     try:
-        count = Article.query.filter(Article.id.in_(article_ids)).update(
-            {'is_active': False},
-            synchronize_session=False
-        )
+        count = update_articles([Article.id.in_(article_ids)], {'is_active': False})
+        invalidate_feed()
         db.session.commit()
         flash(f'{count} article(s) deleted successfully', 'success')
     except Exception as e:
@@ -299,10 +262,8 @@ def bulk_delete():
 def delete_all_auto():
     """Delete all auto-fetched articles"""
     try:
-        count = Article.query.filter_by(source_type='auto', is_active=True).update(
-            {'is_active': False},
-            synchronize_session=False
-        )
+        count = update_articles([Article.source_type == 'auto', Article.is_active == True], {'is_active': False})
+        invalidate_feed()
         db.session.commit()
         flash(f'{count} auto-fetched article(s) deleted successfully', 'success')
     except Exception as e:
@@ -317,10 +278,8 @@ def delete_all_auto():
 def delete_all_manual():
     """Delete all manually added articles"""
     try:
-        count = Article.query.filter_by(source_type='manual', is_active=True).update(
-            {'is_active': False},
-            synchronize_session=False
-        )
+        count = update_articles([Article.source_type == 'manual', Article.is_active == True], {'is_active': False})
+        invalidate_feed()
         db.session.commit()
         flash(f'{count} manual article(s) deleted successfully', 'success')
     except Exception as e:
@@ -335,10 +294,8 @@ def delete_all_manual():
 def delete_all():
     """Delete all articles"""
     try:
-        count = Article.query.filter_by(is_active=True).update(
-            {'is_active': False},
-            synchronize_session=False
-        )
+        count = update_articles([Article.is_active == True], {'is_active': False})
+        invalidate_feed()
         db.session.commit()
         flash(f'All {count} article(s) deleted successfully', 'success')
     except Exception as e:
@@ -357,12 +314,16 @@ def edit_news(article_id):
     if request.method == 'POST':
         article.title = request.form.get('title', '').strip()
         article.source_url = request.form.get('url', '').strip()
+        article.url_hash = url_hash(article.source_url)
         article.description = request.form.get('description', '').strip()
         article.content = article.description
         article.image_url = request.form.get('image_url', '').strip() or None
         article.source_name = request.form.get('source_name', '').strip()
+        # Edited articles are no longer refreshed from their feed
+        article.edited_at = datetime.utcnow()
 
         try:
+            invalidate_feed()
             db.session.commit()
             flash('Article updated successfully!', 'success')
             return redirect(url_for('admin.manage_news'))
@@ -411,7 +372,9 @@ def resolve_report(report_id, action):
     try:
         if action == 'delete':
             # Delete the comment
-            report.comment.is_active = False
+            if report.comment.is_active:
+                report.comment.is_active = False
+                adjust_counters(report.comment.article_id, active_comment_count=-1)
             flash('Comment deleted successfully', 'success')
         elif action == 'dismiss':
             # Just dismiss the report
@@ -441,26 +404,44 @@ def resolve_report(report_id, action):
 def review_articles():
     """Show pending articles for review"""
     pending = get_pending_articles()
-    return render_template('admin/review_articles.html', articles=pending)
+    return render_template(
+        'admin/review_articles.html',
+        articles=pending,
+        job_id=request.args.get('job', type=int)
+    )
 
 
 @admin_bp.route('/fetch-articles', methods=['POST'])
 @admin_required
 def fetch_articles():
-    """Trigger manual article fetch"""
+    """Queue a manual article fetch; responds with the job ID straight away"""
     count = request.form.get('count', 25, type=int)
 
     # Limit to reasonable range
     count = max(10, min(count, 50))
 
-    success, articles_count, error = fetch_articles_for_review(count)
+    job_id = enqueue('fetch_articles', {'count': count, 'user_id': session['user_id']}, user_id=session['user_id'])
+    return job_started(job_id, f'Fetching {count} articles in the background')
 
-    if success:
-        flash(f'Successfully fetched {articles_count} articles for review', 'success')
-    else:
-        flash(f'Failed to fetch articles: {error}', 'error')
 
-    return redirect(url_for('admin.review_articles'))
+@admin_bp.route('/jobs/<int:job_id>')
+@admin_required
+def job_status_json(job_id):
+    """Status, progress and result counts of a background job"""
+    job = BackgroundJob.query.get_or_404(job_id)
+    return jsonify(job.to_dict())
+
+
+def job_started(job_id, message):
+    """Response for a queued job: JSON with its ID for API clients, else the review page polling it"""
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({
+            'job_id': job_id,
+            'status_url': url_for('admin.job_status_json', job_id=job_id)
+        }), 202
+
+    flash(message, 'info')
+    return redirect(url_for('admin.review_articles', job=job_id))
 
 
 @admin_bp.route('/approve-article/<int:article_id>', methods=['POST'])
@@ -491,27 +472,101 @@ def reject_article_route(article_id):
 @admin_required
 def bulk_approve():
     """Approve multiple articles at once"""
-    article_ids = request.form.getlist('article_ids[]')
-    approved_count = 0
-
-    for article_id in article_ids:
-        if approve_article(int(article_id), session['user_id']):
-            approved_count += 1
-
-    flash(f'Approved {approved_count} article(s)', 'success')
-    return redirect(url_for('admin.review_articles'))
+    return bulk_review('approved')
 
 
 @admin_bp.route('/bulk-reject', methods=['POST'])
 @admin_required
 def bulk_reject():
     """Reject multiple articles at once"""
-    article_ids = request.form.getlist('article_ids[]')
-    rejected_count = 0
+    return bulk_review('rejected')
 
-    for article_id in article_ids:
-        if reject_article(int(article_id), session['user_id']):
-            rejected_count += 1
 
-    flash(f'Rejected {rejected_count} article(s)', 'info')
+def bulk_review(status):
+    """Review the selected articles inline, or in the background when there are many"""
+    article_ids = request.form.getlist('article_ids[]', type=int)  # Values that aren't IDs are dropped
+    skipped = len(request.form.getlist('article_ids[]')) - len(article_ids)
+    if skipped:
+        flash(f'Skipped {skipped} invalid article selection(s)', 'error')
+
+    if len(article_ids) > Config.JOB_INLINE_LIMIT:
+        job_id = enqueue(
+            'review_articles',
+            {'article_ids': article_ids, 'admin_id': session['user_id'], 'status': status},
+            user_id=session['user_id']
+        )
+        return job_started(job_id, f'Reviewing {len(article_ids)} articles in the background')
+
+    reviewed_count = bulk_review_articles(article_ids, session['user_id'], status)
+    if status == 'approved':
+        flash(f'Approved {reviewed_count} article(s)', 'success')
+    else:
+        flash(f'Rejected {reviewed_count} article(s)', 'info')
     return redirect(url_for('admin.review_articles'))
+
+
+# ==================== FEED ROUTES ====================
+
+@admin_bp.route('/feeds', methods=['GET', 'POST'])
+@admin_required
+def feeds():
+    """List registered RSS feeds with their health, or register a new one"""
+    if request.method == 'POST':
+        url = request.form.get('url', '').strip()
+        source_name = request.form.get('source_name', '').strip()
+        poll_minutes = request.form.get('poll_minutes', Config.FEED_POLL_INTERVAL // 60, type=int)
+
+        if not url or not source_name:
+            flash('Feed URL and Source Name are required', 'error')
+            return redirect(url_for('admin.feeds'))
+
+        if Feed.query.filter_by(url=url).first():
+            flash('This feed is already registered', 'error')
+            return redirect(url_for('admin.feeds'))
+
+        try:
+            db.session.add(Feed(
+                url=url,
+                source_name=source_name,
+                poll_interval=max(5, poll_minutes) * 60
+            ))
+            db.session.commit()
+            flash(f'Feed "{source_name}" added; it will be polled within a minute', 'success')
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error adding feed: {str(e)}', 'error')
+        return redirect(url_for('admin.feeds'))
+
+    return render_template(
+        'admin/feeds.html',
+        feeds=feed_health(),
+        jobs=job_status(),
+        default_poll_minutes=Config.FEED_POLL_INTERVAL // 60
+    )
+
+
+@admin_bp.route('/feeds/<int:feed_id>/toggle', methods=['POST'])
+@admin_required
+def toggle_feed(feed_id):
+    """Enable or disable polling of a feed"""
+    feed = Feed.query.get_or_404(feed_id)
+    feed.is_active = not feed.is_active
+    if feed.is_active:
+        feed.failure_count = 0
+        feed.next_poll_at = None
+    db.session.commit()
+
+    flash(f'Feed "{feed.source_name}" {"enabled" if feed.is_active else "disabled"}', 'success')
+    return redirect(url_for('admin.feeds'))
+
+
+@admin_bp.route('/feeds/<int:feed_id>/poll-now', methods=['POST'])
+@admin_required
+def poll_feed_now(feed_id):
+    """Make a feed due so the next scheduler tick polls it, skipping any backoff"""
+    feed = Feed.query.get_or_404(feed_id)
+    feed.next_poll_at = None
+    db.session.commit()
+
+    flash(f'Feed "{feed.source_name}" will be polled within a minute', 'success')
+    return redirect(url_for('admin.feeds'))
@@ -1,14 +1,84 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, g
 from functools import wraps
 from datetime import datetime, timedelta
 from app.models import db, User, LoginAttempt
 from app.config import Config
-from app import limiter
+from app.services.version_service import USERS_VERSION, get_recent_version, bump_version
+from app import limiter, cache
 import re
 
 auth_bp = Blueprint('auth', __name__)
 
 
+class Principal:
+    """The logged-in user's identity and privileges, cached across requests"""
+    __slots__ = ('id', 'username', 'is_admin', 'version')
+
+    def __init__(self, id, username, is_admin, version):
+        self.id = id
+        self.username = username
+        self.is_admin = is_admin
+        self.version = version  # USERS_VERSION stamp the entry was loaded under
+
+
+def _principal_cache_key(user_id):
+    return f'principal:{user_id}'
+
+
+def load_principal(user_id):
+    """
+    Load a user's principal from the cache, falling back to the database
+
+    Cached entries are discarded once the shared users version stamp moves
+    on, so privilege changes reach every worker within
+    USERS_VERSION_CHECK_INTERVAL seconds.
+
+    Args:
+        user_id: User ID from the session
+
+    Returns:
+        Principal: The user's principal, or None if the user doesn't exist
+    """
+    version = get_recent_version(USERS_VERSION, Config.USERS_VERSION_CHECK_INTERVAL)
+    principal = cache.get(_principal_cache_key(user_id))
+    if principal is not None and principal.version == version:
+        return principal
+
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+
+    principal = Principal(user.id, user.username, bool(user.is_admin), version)
+    cache.set(_principal_cache_key(user_id), principal, ttl=Config.PRINCIPAL_CACHE_TTL)
+    return principal
+
+
+def get_current_principal():
+    """
+    Get the logged-in user's principal, loaded at most once per request
+
+    Returns:
+        Principal: Current principal, or None if not logged in
+    """
+    if 'principal' not in g:
+        g.principal = load_principal(session['user_id']) if 'user_id' in session else None
+    return g.principal
+
+
+def invalidate_principal(user_id):
+    """
+    Invalidate cached principals after a privilege change
+
+    Call inside the transaction that changes the user; other workers notice
+    the bumped users version stamp once it commits.
+
+    Args:
+        user_id: ID of the changed user
+    """
+    bump_version(USERS_VERSION)
+    cache.delete(_principal_cache_key(user_id))
+
+
 def login_required(f):
     """Decorator to require login for routes"""
     @wraps(f)
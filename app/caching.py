@@ -0,0 +1,301 @@
+"""Pluggable cache layer with in-process and cross-worker backends"""
+import functools
+import logging
+from abc import ABC, abstractmethod
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class CacheBackend(ABC):
+    """Base class for cache backends"""
+
+    def __init__(self, default_ttl=60, max_entries=1024):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    def get(self, key):
+        """Return the cached value or _MISSING"""
+
+    @abstractmethod
+    def set(self, key, value, ttl=None):
+        """Store a value for `ttl` seconds (default_ttl if None)"""
+
+    @abstractmethod
+    def delete(self, key):
+        """Remove the entry for `key`, if any"""
+
+    @abstractmethod
+    def clear(self):
+        """Remove every entry"""
+
+    @abstractmethod
+    def size(self):
+        """Number of stored entries"""
+
+    def stats(self):
+        """Hit/miss/eviction counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self).__name__,
+            'pid': os.getpid(),
+            'entries': self.size(),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class NullCache(CacheBackend):
+    """Backend that never stores anything (CACHE_BACKEND=null)"""
+
+    def get(self, key):
+        self.misses += 1
+        return _MISSING
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def clear(self):
+        pass
+
+    def size(self):
+        return 0
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with per-entry TTL (not shared between workers)"""
+
+    def __init__(self, default_ttl=60, max_entries=1024):
+        super().__init__(default_ttl, max_entries)
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache stored in a local SQLite file, shared by every worker on the host
+
+    Entries expire by TTL; when the table grows past max_entries the least
+    recently read entries are evicted. Reads only refresh an entry's access
+    time once it is ACCESS_GRANULARITY seconds old, so hot keys don't turn
+    every hit into a write that contends for the database lock.
+    """
+
+    # Run the eviction sweep once every N writes rather than on every write
+    SWEEP_EVERY = 64
+    # Seconds an entry's accessed_at may lag behind its latest read
+    ACCESS_GRANULARITY = 60
+
+    def __init__(self, path, default_ttl=60, max_entries=10000):
+        super().__init__(default_ttl, max_entries)
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                'expires_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        # Connections must not cross a fork, so key them by pid as well as thread
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT value, expires_at, accessed_at FROM cache_entries WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None or row[1] < now:
+            self.misses += 1
+            return _MISSING
+        if now - row[2] >= self.ACCESS_GRANULARITY:
+            conn.execute('UPDATE cache_entries SET accessed_at = ? WHERE key = ?', (now, key))
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+            (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now + ttl, now)
+        )
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            self._sweep(conn, now)
+
+    def _sweep(self, conn, now):
+        """Drop expired entries, then least recently read ones beyond max_entries"""
+        expired = conn.execute('DELETE FROM cache_entries WHERE expires_at < ?', (now,)).rowcount
+        overflow = conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0] - self.max_entries
+        evicted = 0
+        if overflow > 0:
+            evicted = conn.execute(
+                'DELETE FROM cache_entries WHERE key IN '
+                '(SELECT key FROM cache_entries ORDER BY accessed_at LIMIT ?)',
+                (overflow,)
+            ).rowcount
+        self.evictions += expired + evicted
+
+    def delete(self, key):
+        self._connect().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM cache_entries')
+
+    def size(self):
+        return self._connect().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+
+
+class Cache:
+    """Cache facade configured from the Flask app (CACHE_* settings)"""
+
+    def __init__(self):
+        self.backend = MemoryCache()
+
+    def init_app(self, app):
+        """Select and configure the backend from app.config"""
+        backend = app.config.get('CACHE_BACKEND', 'memory')
+        default_ttl = app.config.get('CACHE_DEFAULT_TTL', 60)
+        max_entries = app.config.get('CACHE_MAX_ENTRIES', 1024)
+
+        if backend == 'sqlite':
+            self.backend = SQLiteCache(app.config['CACHE_SQLITE_PATH'], default_ttl, max_entries)
+        elif backend == 'null':
+            self.backend = NullCache(default_ttl, max_entries)
+        elif backend == 'memory':
+            self.backend = MemoryCache(default_ttl, max_entries)
+        else:
+            raise ValueError(f'Unknown CACHE_BACKEND: {backend}')
+
+        logger.info(f"Cache backend: {type(self.backend).__name__}")
+
+    def get(self, key, default=None):
+        """Get a cached value, or `default` if missing or expired"""
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache get failed for {key}: {str(e)}")
+            return default
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        """Store a value for `ttl` seconds (backend default if None)"""
+        try:
+            self.backend.set(key, value, ttl)
+        except Exception as e:
+            logger.warning(f"Cache set failed for {key}: {str(e)}")
+
+    def delete(self, key):
+        """Remove a cached value"""
+        try:
+            self.backend.delete(key)
+        except Exception as e:
+            logger.warning(f"Cache delete failed for {key}: {str(e)}")
+
+    def clear(self):
+        """Remove every cached value"""
+        self.backend.clear()
+
+    def stats(self):
+        """Hit/miss/eviction statistics for the active backend"""
+        return self.backend.stats()
+
+    def memoize(self, ttl=None, key_prefix=None):
+        """
+        Decorator caching a function's result per argument list
+
+        The wrapped function gains an `invalidate(*args, **kwargs)` method that
+        drops the entry for those arguments.
+
+        Args:
+            ttl: Seconds to keep results (backend default if None)
+            key_prefix: Key namespace (defaults to module.qualname)
+        """
+        def decorator(func):
+            prefix = key_prefix or f'{func.__module__}.{func.__qualname__}'
+
+            def make_key(args, kwargs):
+                return f'{prefix}:{args!r}:{sorted(kwargs.items())!r}'
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                try:
+                    value = self.backend.get(key)
+                except Exception as e:
+                    logger.warning(f"Cache get failed for {key}: {str(e)}")
+                    value = _MISSING
+                if value is _MISSING:
+                    value = func(*args, **kwargs)
+                    self.set(key, value, ttl)
+                return value
+
+            wrapper.invalidate = lambda *args, **kwargs: self.delete(make_key(args, kwargs))
+            wrapper.uncached = func
+            return wrapper
+        return decorator
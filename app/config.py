@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -27,14 +28,78 @@ class Config:
     RATELIMIT_STORAGE_URL = "memory://"  # Use memory storage for rate limits
     RATELIMIT_STRATEGY = "fixed-window"
 
+    # Caching: 'memory' (per worker), 'sqlite' (shared by all workers on the host) or 'null'
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_SQLITE_PATH = os.getenv('CACHE_SQLITE_PATH', os.path.join(tempfile.gettempdir(), 'good_news_cache.db'))
+    CACHE_DEFAULT_TTL = 60  # Seconds
+    CACHE_MAX_ENTRIES = 1024
+
+    # Cached session principal (user id, username, admin flag)
+    PRINCIPAL_CACHE_TTL = 60  # Seconds
+    USERS_VERSION_CHECK_INTERVAL = 5  # Seconds between privilege-change checks
+
+    # RSS ingestion
+    RSS_FETCH_WORKERS = 8  # Feeds downloaded in parallel
+    RSS_CONNECT_TIMEOUT = 5  # Seconds
+    RSS_READ_TIMEOUT = 15  # Seconds per socket read
+    RSS_FETCH_DEADLINE = 30  # Seconds per feed download in total
+    RSS_CACHE_DIR = os.getenv('RSS_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'good_news_feeds'))
+
+    # Feed registry scheduling (per-feed intervals live in the feeds table)
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'true').lower() != 'false'  # Background jobs in this process
+    FEED_POLL_INTERVAL = int(os.getenv('FEED_POLL_INTERVAL', 3600))  # Default seconds between polls of a new feed
+    FEED_MAX_BACKOFF = 24 * 3600  # Longest wait after repeated failures, in seconds
+    FEED_SCHEDULER_TICK = 60  # Seconds between checks for due feeds
+    FEED_POLL_BATCH = 100  # Most feeds polled per tick; the rest stay due for the next one
+    FEED_CLAIM_TIMEOUT = 600  # Seconds a claimed feed is held before another worker may retry it
+
+    # Worker boot
+    SCHEMA_CHECK = os.getenv('SCHEMA_CHECK', 'auto')  # auto (skip DDL if the schema version matches), always or skip
+    PRELOAD_APP = os.getenv('PRELOAD_APP', 'false').lower() == 'true'  # Set by gunicorn.conf.py (preload_app)
+
+    # Scheduler leader election: only the worker holding the lease runs background jobs
+    SCHEDULER_LEASE_TTL = 90  # Seconds the lease survives without a heartbeat
+    SCHEDULER_HEARTBEAT = 30  # Seconds between lease renewals
+    SCHEDULER_LOCK_FILE = os.getenv('SCHEDULER_LOCK_FILE')  # Single host: elect with a file lock instead
+    JOB_RUN_RETENTION_DAYS = 30  # Job run history kept
+
+    # Background job pool for admin-triggered work (fetches, CSV imports, bulk reviews)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))  # Job threads per process; 0 runs none here
+    JOB_POLL_INTERVAL = 2  # Seconds between checks for queued jobs
+    JOB_STALE_AFTER = 900  # Seconds without progress before a running job is marked failed
+    JOB_EXPIRE_INTERVAL = 60  # Seconds between sweeps for stale and old jobs (scheduler leader only)
+    JOB_RETENTION_DAYS = 30  # Finished jobs kept
+    JOB_INLINE_LIMIT = 50  # Bulk reviews of more articles than this run in the background
+
+    # Bulk article writes (ingest and CSV import)
+    INGEST_CHUNK_SIZE = 1000  # Rows per INSERT chunk (and per commit for CSV imports)
+
+    # Near-duplicate story clustering
+    STORY_COLLAPSE = True  # Show one feed card per story
+    STORY_WINDOW_DAYS = 7  # Only articles this recent are duplicate candidates
+    STORY_SIMILARITY_THRESHOLD = 0.5  # Estimated Jaccard similarity of title+description words
+
+    # Positivity scoring model (trained with train_sentiment_model.py; keyword lexicon until then)
+    SENTIMENT_MODEL_PATH = os.getenv('SENTIMENT_MODEL_PATH', 'sentiment_model.json')
+
     # NewsAPI Configuration
     NEWS_API_KEY = os.getenv('NEWS_API_KEY')
     NEWS_API_BASE_URL = 'https://newsapi.org/v2'
 
     # Application Settings
     ARTICLES_PER_PAGE = 5
+    COMMENTS_PER_PAGE = 20
     MAX_DAILY_API_REQUESTS = 90  # Buffer for 100/day limit
-    ARTICLE_RETENTION_DAYS = 7
+    ARTICLE_RETENTION_DAYS = 7  # Articles leave the feed after this many days
+
+    # Retention: expired articles move out of the hot tables with their likes, comments, ratings and reads
+    ARTICLE_ARCHIVE_DAYS = int(os.getenv('ARTICLE_ARCHIVE_DAYS', 30))  # Days before an article is archived
+    ARCHIVE_POLICY = os.getenv('ARCHIVE_POLICY', 'archive')  # 'archive' (copy to *_archive tables) or 'delete'
+    RETENTION_BATCH_SIZE = 500  # Articles per transaction, so no lock is held for long
+
+    # Hot feed snapshot kept in memory by each worker
+    FEED_SNAPSHOT_SIZE = 200  # Newest approved articles held in memory
+    FEED_SNAPSHOT_CHECK_INTERVAL = 2  # Seconds between feed version checks
 
     # Security: Password & Account Settings
     MIN_PASSWORD_LENGTH = 8
@@ -0,0 +1,73 @@
+"""Conditional GET helpers (ETag / Last-Modified) for per-user responses"""
+import hashlib
+from datetime import timezone
+from flask import request, make_response
+
+
+def make_etag(*parts):
+    """
+    Build a weak ETag from the version stamps a response depends on
+
+    Args:
+        *parts: Values identifying the response's content (versions, ids, user)
+
+    Returns:
+        str: Opaque tag (without quotes)
+    """
+    raw = ':'.join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+
+def _to_utc(value):
+    """Naive UTC datetimes from the database -> aware, whole-second datetimes"""
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def not_modified(etag, last_modified=None):
+    """
+    Return a 304 response if the client's cached copy is still current
+
+    If-None-Match takes precedence over If-Modified-Since, as in RFC 9110.
+    Call this before doing any expensive serialization.
+
+    Args:
+        etag: Current ETag for the resource
+        last_modified: Naive UTC datetime of the last change, if known
+
+    Returns:
+        Response: 304 response, or None if the full response must be sent
+    """
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif last_modified is not None and request.if_modified_since:
+        matched = _to_utc(last_modified) <= request.if_modified_since
+    else:
+        matched = False
+
+    if not matched:
+        return None
+    return with_validators(make_response('', 304), etag, last_modified)
+
+
+def with_validators(response, etag, last_modified=None):
+    """
+    Attach validators so the client revalidates instead of re-downloading
+
+    Args:
+        response: Response (or anything make_response accepts)
+        etag: Current ETag for the resource
+        last_modified: Naive UTC datetime of the last change, if known
+
+    Returns:
+        Response: The response with ETag, Last-Modified and Cache-Control set
+    """
+    response = make_response(response)
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = _to_utc(last_modified)
+    # Per-user content: browsers may keep it but must revalidate every time
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
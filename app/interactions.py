@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify, session
-from app.auth import login_required
+from app.auth import login_required, get_current_principal
 from app.models import db, Article, Like, Comment, ReportedComment, User, HappinessRating, ReadArticle
 from app import csrf
+from app.http_cache import make_etag, not_modified, with_validators
+from app.services.engagement_service import adjust_counters, get_engagement, get_comment_page
+from app.config import Config
 from datetime import datetime
 
 interactions_bp = Blueprint('interactions', __name__, url_prefix='/api')
@@ -9,6 +12,36 @@ interactions_bp = Blueprint('interactions', __name__, url_prefix='/api')
 # Exempt API routes from CSRF protection (they use session-based authentication)
 csrf.exempt(interactions_bp)
 
+# Maximum number of articles accepted by the bulk engagement endpoint
+MAX_ENGAGEMENT_IDS = 50
+
+# ==================== BULK ENGAGEMENT ENDPOINT ====================
+
+@interactions_bp.route('/articles/engagement', methods=['GET'])
+@login_required
+def get_bulk_engagement():
+    """Get likes, liker previews, comment counts and happiness data for several articles"""
+    user_id = session['user_id']
+
+    try:
+        article_ids = [int(part) for part in request.args.get('ids', '').split(',') if part.strip()]
+    except ValueError:
+        return jsonify({'success': False, 'error': 'ids must be a comma-separated list of integers'}), 400
+
+    if not article_ids:
+        return jsonify({'success': False, 'error': 'No article ids provided'}), 400
+
+    if len(article_ids) > MAX_ENGAGEMENT_IDS:
+        return jsonify({'success': False, 'error': f'At most {MAX_ENGAGEMENT_IDS} ids per request'}), 400
+
+    engagement = get_engagement(article_ids, user_id=user_id)
+
+    return jsonify({
+        'success': True,
+        'engagement': {str(article_id): data for article_id, data in engagement.items()}
+    })
+
+
 # ==================== LIKE ENDPOINTS ====================
 
 @interactions_bp.route('/articles/<int:article_id>/like', methods=['POST'])
@@ -28,17 +61,19 @@ def toggle_like(article_id):
         if existing_like:
             # Unlike
             db.session.delete(existing_like)
+            adjust_counters(article_id, like_count=-1)
             db.session.commit()
             action = 'unliked'
         else:
             # Like
             new_like = Like(user_id=user_id, article_id=article_id)
             db.session.add(new_like)
+            adjust_counters(article_id, like_count=1)
             db.session.commit()
             action = 'liked'
 
-        # Get updated like data
-        like_count = Like.query.filter_by(article_id=article_id).count()
+        # Get updated like data (counter was refreshed by the commit)
+        like_count = article.like_count
         user_has_liked = (action == 'liked')
 
         # Get liked_by_users for Instagram-style display
@@ -93,26 +128,37 @@ def get_likes(article_id):
 @interactions_bp.route('/articles/<int:article_id>/comments', methods=['GET'])
 @login_required
 def get_comments(article_id):
-    """Get all comments for an article"""
+    """Get a page of comments for an article (?cursor=...&order=newest|oldest)"""
     article = Article.query.get_or_404(article_id)
     user_id = session['user_id']
-    user = User.query.get(user_id)
+    principal = get_current_principal()
+    is_admin = principal.is_admin if principal else False
+    cursor = request.args.get('cursor')
+    order = request.args.get('order', 'newest')
+
+    # Answer repeat polls from the article's engagement version before loading comments
+    etag = make_etag('comments', article.id, article.engagement_version, user_id, is_admin, cursor, order)
+    cached = not_modified(etag, article.engagement_updated_at)
+    if cached:
+        return cached
 
-    comments = Comment.query.filter_by(
-        article_id=article_id,
-        is_active=True
-    ).order_by(Comment.created_at.desc()).all()
+    try:
+        comments, next_cursor = get_comment_page(article_id, cursor, order, Config.COMMENTS_PER_PAGE)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
 
     comments_data = [
         comment.to_dict(current_user_id=user_id)
         for comment in comments
     ]
 
-    return jsonify({
+    return with_validators(jsonify({
         'success': True,
         'comments': comments_data,
-        'is_admin': user.is_admin if user else False
-    })
+        'comment_count': article.active_comment_count,
+        'next_cursor': next_cursor,
+        'is_admin': is_admin
+    }), etag, article.engagement_updated_at)
 
 
 @interactions_bp.route('/articles/<int:article_id>/comments', methods=['POST'])
@@ -139,6 +185,7 @@ def add_comment(article_id):
             content=content
         )
         db.session.add(comment)
+        adjust_counters(article_id, active_comment_count=1)
         db.session.commit()
 
         return jsonify({
@@ -175,6 +222,7 @@ def edit_comment(comment_id):
     try:
         comment.content = content
         comment.updated_at = datetime.utcnow()
+        adjust_counters(comment.article_id)
         db.session.commit()
 
         return jsonify({
@@ -193,15 +241,17 @@ def delete_comment(comment_id):
     """Delete a comment (owner or admin)"""
     comment = Comment.query.get_or_404(comment_id)
     user_id = session['user_id']
-    user = User.query.get(user_id)
+    principal = get_current_principal()
 
     # Authorization: Comment owner or admin
-    if comment.user_id != user_id and not user.is_admin:
+    if comment.user_id != user_id and not (principal and principal.is_admin):
         return jsonify({'success': False, 'error': 'Unauthorized'}), 403
 
     try:
         # Soft delete
-        comment.is_active = False
+        if comment.is_active:
+            comment.is_active = False
+            adjust_counters(comment.article_id, active_comment_count=-1)
         db.session.commit()
 
         return jsonify({
@@ -284,6 +334,7 @@ def rate_happiness(article_id):
 
         if existing_rating:
             # Update existing rating
+            adjust_counters(article_id, rating_sum=rating - existing_rating.rating)
             existing_rating.rating = rating
             existing_rating.updated_at = datetime.utcnow()
         else:
@@ -294,18 +345,15 @@ def rate_happiness(article_id):
                 rating=rating
             )
             db.session.add(new_rating)
+            adjust_counters(article_id, rating_sum=rating, rating_count=1)
 
         db.session.commit()
 
-        # Calculate new average
-        all_ratings = HappinessRating.query.filter_by(article_id=article_id).all()
-        rating_count = len(all_ratings)
-        average_happiness = round(sum(r.rating for r in all_ratings) / rating_count) if rating_count > 0 else 0
-
+        # New average from the maintained counters (refreshed by the commit)
         return jsonify({
             'success': True,
-            'happiness_average': average_happiness,
-            'happiness_count': rating_count,
+            'happiness_average': article.happiness_average,
+            'happiness_count': article.rating_count,
             'user_happiness_rating': rating
         })
 
@@ -321,9 +369,10 @@ def get_happiness(article_id):
     article = Article.query.get_or_404(article_id)
     user_id = session['user_id']
 
-    ratings = HappinessRating.query.filter_by(article_id=article_id).all()
-    rating_count = len(ratings)
-    average_happiness = round(sum(r.rating for r in ratings) / rating_count) if rating_count > 0 else 0
+    etag = make_etag('happiness', article.id, article.engagement_version, user_id)
+    cached = not_modified(etag, article.engagement_updated_at)
+    if cached:
+        return cached
 
     user_rating = None
     user_rating_obj = HappinessRating.query.filter_by(
@@ -333,12 +382,12 @@ def get_happiness(article_id):
     if user_rating_obj:
         user_rating = user_rating_obj.rating
 
-    return jsonify({
+    return with_validators(jsonify({
         'success': True,
-        'happiness_average': average_happiness,
-        'happiness_count': rating_count,
+        'happiness_average': article.happiness_average,
+        'happiness_count': article.rating_count,
         'user_happiness_rating': user_rating
-    })
+    }), etag, article.engagement_updated_at)
 
 
 # ==================== READ ARTICLE ENDPOINTS ====================
@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -39,6 +40,12 @@ class Article(db.Model):
     published_at = db.Column(db.DateTime)
     source_name = db.Column(db.String(100))
     source_url = db.Column(db.String(500))
+    # SHA-256 of the normalised source URL (see services/ingest_service.py); NULL for URL-less rows
+    url_hash = db.Column(db.String(64))
+    # ID of the first article of the near-duplicate cluster (see services/story_service.py)
+    story_id = db.Column(db.Integer, nullable=True)
+    # 0-1 positivity from the sentiment model (see services/sentiment_service.py); NULL until scored
+    positivity_score = db.Column(db.Float, nullable=True)
     cached_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     source_type = db.Column(db.String(20), default='auto')  # 'auto' or 'manual'
@@ -47,12 +54,50 @@ class Article(db.Model):
     status = db.Column(db.String(20), default='approved')  # 'pending', 'approved', 'rejected'
     reviewed_by_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     reviewed_at = db.Column(db.DateTime, nullable=True)
+    edited_at = db.Column(db.DateTime, nullable=True)  # Set by an admin edit; feed refreshes stop
+    # Denormalised engagement counters, maintained by app/interactions.py
+    like_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    active_comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Bumped on every like/comment/rating change; used for HTTP validators
+    engagement_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    engagement_updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Composite index backing keyset (cursor) pagination of the public feed
+    __table_args__ = (
+        db.Index('idx_article_feed', 'is_active', 'status', 'published_at', 'id'),
+        # One row per article URL; ingestion upserts against this
+        db.Index('uq_article_url_hash', 'url_hash', unique=True),
+        db.Index('idx_article_story', 'story_id'),
+        db.Index('idx_article_positivity', 'positivity_score'),  # Finding unscored articles
+        db.Index('idx_article_cached', 'cached_at'),  # Retention (see services/retention_service.py)
+        db.Index('idx_article_source_recent', 'source_type', 'is_active', 'cached_at'),  # Dashboard's recent manual
+    )
+
+    @property
+    def happiness_average(self):
+        """Average happiness rating rounded to a whole percentage (0 if unrated)"""
+        return round(self.rating_sum / self.rating_count) if self.rating_count else 0
+
+    def to_card_dict(self):
+        """Convert the article's own fields to a dictionary (no engagement data)"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'content': self.content,
+            'image_url': self.image_url,
+            'published_at': self.published_at.strftime('%B %d, %Y') if self.published_at else '',
+            'source_name': self.source_name,
+            'source_url': self.source_url,
+        }
 
     def to_dict(self, user_id=None):
         """Convert article to dictionary for JSON serialization with social engagement data"""
-        like_count = len(self.likes)
         user_has_liked = False
         liked_by_users = []
+        user_rating = None
 
         if user_id:
             user_has_liked = any(like.user_id == user_id for like in self.likes)
@@ -62,46 +107,40 @@ class Article(db.Model):
                 for like in sorted(self.likes, key=lambda x: x.created_at)[:5]  # First 5 users
             ]
 
-        # Get comment count (only active comments)
-        comment_count = len([c for c in self.comments if c.is_active])
-
-        # Calculate happiness rating data
-        ratings = self.happiness_ratings
-        rating_count = len(ratings)
-        average_happiness = 0
-        user_rating = None
-
-        if rating_count > 0:
-            average_happiness = round(sum(r.rating for r in ratings) / rating_count)
-
-        if user_id:
-            user_rating_obj = next((r for r in ratings if r.user_id == user_id), None)
+            user_rating_obj = next((r for r in self.happiness_ratings if r.user_id == user_id), None)
             user_rating = user_rating_obj.rating if user_rating_obj else None
 
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'content': self.content,
-            'image_url': self.image_url,
-            'published_at': self.published_at.strftime('%B %d, %Y') if self.published_at else '',
-            'source_name': self.source_name,
-            'source_url': self.source_url,
+        data = self.to_card_dict()
+        data.update({
             # Social engagement data
-            'like_count': like_count,
+            'like_count': self.like_count,
             'user_has_liked': user_has_liked,
             'liked_by_users': liked_by_users,
-            'comment_count': comment_count,
+            'comment_count': self.active_comment_count,
             # Happiness rating data
-            'happiness_average': average_happiness,
-            'happiness_count': rating_count,
+            'happiness_average': self.happiness_average,
+            'happiness_count': self.rating_count,
             'user_happiness_rating': user_rating,
-        }
+        })
+        return data
 
     def __repr__(self):
         return f'<Article {self.title[:50]}>'
 
 
+class ArticleCount(db.Model):
+    """Rollup of article counts per (source_type, status, is_active), kept by services/article_stats.py"""
+    __tablename__ = 'article_counts'
+
+    source_type = db.Column(db.String(20), primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    is_active = db.Column(db.Boolean, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<ArticleCount {self.source_type}/{self.status}/{self.is_active}={self.count}>'
+
+
 class APIRequest(db.Model):
     """Track daily API requests for rate limiting"""
     __tablename__ = 'api_requests'
@@ -155,7 +194,7 @@ class Comment(db.Model):
 
     # Indexes for performance
     __table_args__ = (
-        db.Index('idx_article_comments', 'article_id', 'is_active'),
+        db.Index('idx_article_comments', 'article_id', 'is_active', 'created_at', 'id'),
         db.Index('idx_user_comments', 'user_id'),
     )
 
@@ -268,6 +307,163 @@ class ReadArticle(db.Model):
         return f'<ReadArticle user={self.user_id} article={self.article_id}>'
 
 
+class VersionStamp(db.Model):
+    """Named version counters shared by all workers for cache invalidation"""
+    __tablename__ = 'version_stamps'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<VersionStamp {self.name}={self.version}>'
+
+
+class SchedulerLease(db.Model):
+    """Time-limited lease electing the one worker that runs background jobs (see services/scheduler_lease.py)"""
+    __tablename__ = 'scheduler_leases'
+
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)  # host:pid of the leader
+    acquired_at = db.Column(db.DateTime, nullable=False)
+    heartbeat_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<SchedulerLease {self.name} held by {self.holder}>'
+
+
+class JobRun(db.Model):
+    """One run of a scheduled background job"""
+    __tablename__ = 'job_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_name = db.Column(db.String(50), nullable=False)
+    holder = db.Column(db.String(100), nullable=False)
+    started_at = db.Column(db.DateTime, nullable=False)
+    duration_ms = db.Column(db.Integer, nullable=False)
+    outcome = db.Column(db.String(20), nullable=False)  # 'success' or 'failed'
+    error = db.Column(db.Text, nullable=True)
+
+    __table_args__ = (
+        db.Index('idx_job_run_name', 'job_name', 'started_at'),
+        db.Index('idx_job_run_started', 'started_at'),
+    )
+
+    def __repr__(self):
+        return f'<JobRun {self.job_name} {self.outcome} at {self.started_at}>'
+
+
+class BackgroundJob(db.Model):
+    """Admin-triggered work run by the background job pool (see services/job_queue.py)"""
+    __tablename__ = 'background_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    params = db.Column(db.Text, nullable=True)  # JSON
+    payload = db.deferred(db.Column(db.Text, nullable=True))  # Bulk input (e.g. an uploaded CSV), dropped when done
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    result = db.Column(db.Text, nullable=True)  # JSON
+    error = db.Column(db.Text, nullable=True)
+    worker = db.Column(db.String(100), nullable=True)  # host:pid running the job
+    created_by_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('idx_background_job_status', 'status', 'id'),
+    )
+
+    def to_dict(self):
+        """Status as reported by the job status endpoint"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress,
+            'total': self.total,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f'<BackgroundJob {self.id} {self.kind} {self.status}>'
+
+
+class StoryFingerprint(db.Model):
+    """MinHash signature of an article's title and description"""
+    __tablename__ = 'story_fingerprints'
+
+    article_id = db.Column(db.Integer, db.ForeignKey('articles.id'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<StoryFingerprint article={self.article_id}>'
+
+
+class StoryBand(db.Model):
+    """LSH bucket of a fingerprint band; articles sharing a bucket are duplicate candidates"""
+    __tablename__ = 'story_bands'
+
+    bucket = db.Column(db.BigInteger, primary_key=True)  # Hash of band number and band rows
+    article_id = db.Column(db.Integer, db.ForeignKey('articles.id'), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_story_band_created', 'created_at'),  # Pruning of the candidate window
+    )
+
+    def __repr__(self):
+        return f'<StoryBand {self.bucket} article={self.article_id}>'
+
+
+class Feed(db.Model):
+    """RSS/Atom source with its poll schedule and health (see services/feed_registry.py)"""
+    __tablename__ = 'feeds'
+
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(500), unique=True, nullable=False)
+    source_name = db.Column(db.String(100), nullable=False)
+    is_active = db.Column(db.Boolean, default=True)
+    poll_interval = db.Column(db.Integer, nullable=False)  # Seconds between successful polls
+    next_poll_at = db.Column(db.DateTime, nullable=True)  # NULL = due now
+    # Health of the most recent polls
+    failure_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Consecutive failures
+    last_polled_at = db.Column(db.DateTime, nullable=True)
+    last_success_at = db.Column(db.DateTime, nullable=True)
+    last_latency_ms = db.Column(db.Integer, nullable=True)
+    last_entry_count = db.Column(db.Integer, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    # Newest entry already ingested (timestamp and entry id); older entries are not parsed again
+    watermark_at = db.Column(db.DateTime, nullable=True)
+    watermark_entry_id = db.Column(db.Text, nullable=True)  # Not truncated: compared whole
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_feed_due', 'is_active', 'next_poll_at'),
+    )
+
+    def as_config(self):
+        """Feed config dict as used by the RSS service"""
+        return {
+            'id': self.id,
+            'url': self.url,
+            'source_name': self.source_name,
+            'watermark': (self.watermark_at, self.watermark_entry_id) if self.watermark_at else None,
+        }
+
+    def __repr__(self):
+        return f'<Feed {self.source_name}>'
+
+
 class LoginAttempt(db.Model):
     """Track failed login attempts for account security"""
     __tablename__ = 'login_attempts'
@@ -285,3 +481,30 @@ class LoginAttempt(db.Model):
     def __repr__(self):
         return f'<LoginAttempt {self.username} at {self.attempted_at}>'
 
+
+def _archive_table(model, *indexes):
+    """
+    Cold copy of a model's table, written by the retention engine (see services/retention_service.py)
+
+    Mirrors the model's columns, so it follows schema changes, but without
+    keys, constraints or the hot table's indexes; rows get their own
+    archive_id, since SQLite may hand an archived id out again.
+    """
+    return db.Table(
+        f'{model.__tablename__}_archive',
+        db.Column('archive_id', db.Integer, primary_key=True),
+        *[db.Column(column.name, column.type, nullable=True) for column in model.__table__.columns],
+        db.Column('archived_at', db.DateTime, nullable=False),
+        *indexes
+    )
+
+
+# Hot table name -> archive table; expired articles move here with their interactions
+ARCHIVE_TABLES = {
+    'articles': _archive_table(Article, db.Index('idx_articles_archive_url_hash', 'url_hash')),
+    'likes': _archive_table(Like),
+    'comments': _archive_table(Comment),
+    'reported_comments': _archive_table(ReportedComment),
+    'happiness_ratings': _archive_table(HappinessRating),
+    'read_articles': _archive_table(ReadArticle),
+}
@@ -1,7 +1,18 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session, jsonify, abort
-from app.auth import login_required
-from app.services.cache_service import get_paginated_articles, get_total_cached_articles
-from app.models import User, Article, ReadArticle, db
+from app.auth import login_required, get_current_principal
+from app.services.cache_service import (
+    get_paginated_articles,
+    get_total_cached_articles,
+    get_articles_by_cursor,
+    encode_feed_cursor,
+    filter_by_read_status
+)
+from app.services.engagement_service import serialize_articles, get_comment_page
+from app.services.feed_snapshot import get_snapshot_page
+from app.services.story_service import collapse_stories
+from app.services.version_service import FEED_VERSION, get_version_info, get_recent_version
+from app.http_cache import make_etag, not_modified, with_validators
+from app.models import Article, db
 from app.config import Config
 from sqlalchemy import and_
 
@@ -21,42 +32,43 @@ def index():
 def feed():
     """Main news feed page"""
     page = request.args.get('page', 1, type=int)
+    cursor = request.args.get('cursor')
     show_read = request.args.get('show_read', 'false')  # Default: show only unread
     user_id = session['user_id']
 
     # Get articles based on read status
-    query = Article.query.filter_by(is_active=True, status='approved')
-
-    if show_read == 'false':
-        # Show only unread articles (exclude articles in read_articles table for this user)
-        read_article_ids = db.session.query(ReadArticle.article_id).filter_by(user_id=user_id).all()
-        read_ids = [r[0] for r in read_article_ids]
-        if read_ids:
-            query = query.filter(~Article.id.in_(read_ids))
-    elif show_read == 'only':
-        # Show only read articles
-        read_article_ids = db.session.query(ReadArticle.article_id).filter_by(user_id=user_id).all()
-        read_ids = [r[0] for r in read_article_ids]
-        if read_ids:
-            query = query.filter(Article.id.in_(read_ids))
-        else:
-            query = query.filter(Article.id == -1)  # No read articles, return empty
-    # If show_read == 'true', show all articles (no filtering)
-
-    # Paginate
-    articles = query.order_by(Article.published_at.desc())\
-        .limit(Config.ARTICLES_PER_PAGE)\
-        .offset((page - 1) * Config.ARTICLES_PER_PAGE)\
-        .all()
+    query = filter_by_read_status(
+        collapse_stories(Article.query.filter_by(is_active=True, status='approved')),
+        user_id,
+        show_read
+    )
+
+    # Paginate: in-memory snapshot (falling back to keyset queries) for the first page and
+    # cursor requests, offset for legacy ?page=N links
+    if cursor or page == 1:
+        try:
+            result = get_snapshot_page(user_id, show_read, cursor, Config.ARTICLES_PER_PAGE)
+            if result is None:
+                result = get_articles_by_cursor(cursor, Config.ARTICLES_PER_PAGE, query)
+        except ValueError:
+            abort(400)
+        articles, next_cursor = result
+    else:
+        articles = query.order_by(Article.published_at.desc(), Article.id.desc())\
+            .limit(Config.ARTICLES_PER_PAGE)\
+            .offset((page - 1) * Config.ARTICLES_PER_PAGE)\
+            .all()
+        next_cursor = encode_feed_cursor(articles[-1]) if len(articles) == Config.ARTICLES_PER_PAGE else None
 
     # Get user admin status
-    user = User.query.get(user_id)
-    is_admin = user.is_admin if user else False
+    principal = get_current_principal()
+    is_admin = principal.is_admin if principal else False
 
     return render_template(
         'news_feed.html',
         articles=articles,
         page=page,
+        next_cursor=next_cursor,
         show_read=show_read,
         username=session.get('username'),
         is_admin=is_admin
@@ -73,28 +85,77 @@ def article_detail(article_id):
         abort(404)
 
     # Get user admin status
-    user = User.query.get(session['user_id'])
-    is_admin = user.is_admin if user else False
+    principal = get_current_principal()
+    is_admin = principal.is_admin if principal else False
 
-    return render_template(
+    # Card fields change through admin edits (feed version), comments through engagement
+    feed_version, feed_updated_at = get_version_info(FEED_VERSION)
+    last_modified = max(filter(None, [feed_updated_at, article.engagement_updated_at]), default=None)
+    etag = make_etag('article', article.id, feed_version, article.engagement_version, session['user_id'], is_admin)
+    cached = not_modified(etag, last_modified)
+    if cached:
+        return cached
+
+    # Render only the first page of comments; the rest load on demand
+    comments, next_comments_cursor = get_comment_page(article.id, per_page=Config.COMMENTS_PER_PAGE)
+
+    return with_validators(render_template(
         'article_detail.html',
         article=article,
+        comments=[comment.to_dict(current_user_id=session['user_id']) for comment in comments],
+        next_comments_cursor=next_comments_cursor,
         username=session.get('username'),
         is_admin=is_admin
-    )
+    ), etag, last_modified)
 
 
 @news_bp.route('/api/feed')
 @login_required
 def api_feed():
-    """API endpoint for AJAX pagination"""
-    page = request.args.get('page', 1, type=int)
-    articles = get_paginated_articles(page=page, per_page=Config.ARTICLES_PER_PAGE)
+    """API endpoint for AJAX pagination (cursor-based, ?page=N kept for old clients)"""
+    cursor = request.args.get('cursor')
+    show_read = request.args.get('show_read', 'true')
+
+    if cursor or 'page' not in request.args:
+        try:
+            result = get_snapshot_page(session['user_id'], show_read, cursor, Config.ARTICLES_PER_PAGE)
+            if result is None:
+                query = filter_by_read_status(
+                    collapse_stories(Article.query.filter_by(is_active=True, status='approved')),
+                    session['user_id'],
+                    show_read
+                )
+                result = get_articles_by_cursor(cursor, Config.ARTICLES_PER_PAGE, query)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+        articles, next_cursor = result
+    else:
+        page = request.args.get('page', 1, type=int)
+        articles = get_paginated_articles(page=page, per_page=Config.ARTICLES_PER_PAGE)
+        next_cursor = encode_feed_cursor(articles[-1]) if len(articles) == Config.ARTICLES_PER_PAGE else None
 
     # Get current user_id for social data
     user_id = session.get('user_id')
 
-    # Convert articles to dictionaries for JSON with user context
-    articles_data = [article.to_dict(user_id=user_id) for article in articles]
+    # Validate against the feed version and each card's engagement version before serializing
+    article_ids = [article.id for article in articles]
+    engagement_versions = db.session.query(Article.id, Article.engagement_version)\
+        .filter(Article.id.in_(article_ids)).all() if article_ids else []
+    etag = make_etag(
+        'feed',
+        get_recent_version(FEED_VERSION, Config.FEED_SNAPSHOT_CHECK_INTERVAL),
+        user_id,
+        next_cursor,
+        *sorted(engagement_versions)
+    )
+    cached = not_modified(etag)
+    if cached:
+        return cached
+
+    # Convert articles to dictionaries for JSON with user context (batched engagement queries)
+    articles_data = serialize_articles(articles, user_id=user_id)
 
-    return jsonify(articles_data)
+    return with_validators(jsonify({
+        'articles': articles_data,
+        'next_cursor': next_cursor
+    }), etag)
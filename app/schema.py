@@ -0,0 +1,284 @@
+"""Bring an existing database up to date with the models
+
+db.create_all() only creates tables that don't exist yet, so columns and
+indexes added to an existing table are never built by it, and nothing
+fills new columns in for the rows already there. The steps here cover
+that gap; _ensure_schema() in app/__init__.py runs them after create_all():
+add_missing_columns(), run_migrations(), then create_missing_indexes(),
+and records the schema version only if schema_drift() finds nothing.
+"""
+import logging
+from typing import List
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from app.models import (
+    db, VersionStamp, SchedulerLease, Article, Like, Comment, HappinessRating, ReadArticle,
+    StoryFingerprint, StoryBand, ARCHIVE_TABLES
+)
+
+logger = logging.getLogger(__name__)
+
+# Seconds the 'schema' lease is held for: longer than any migration should take
+SCHEMA_LEASE_TTL = 600
+
+
+def create_lease_table():
+    """Create scheduler_leases on its own, so workers can take the 'schema' lease before create_all()"""
+    table = SchedulerLease.__table__
+    try:
+        table.create(db.engine, checkfirst=True)
+    except SQLAlchemyError:
+        if not inspect(db.engine).has_table(table.name):
+            raise  # Otherwise another worker created it first
+
+
+def add_missing_columns():
+    """
+    ALTER TABLE ... ADD COLUMN for model columns missing from existing tables
+
+    Columns are added with their server default, and NOT NULL only when
+    they have one (existing rows need a value); anything the existing rows
+    need beyond that is filled in by run_migrations().
+    """
+    dialect = db.engine.dialect
+    compiler = dialect.ddl_compiler(dialect, None)
+    preparer = dialect.identifier_preparer
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        live_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in live_columns:
+                continue
+
+            ddl = f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN ' \
+                  f'{preparer.format_column(column)} {column.type.compile(dialect=dialect)}'
+            default = compiler.get_column_default_string(column)
+            if default is not None:
+                ddl += f' DEFAULT {default}'
+                if not column.nullable:
+                    ddl += ' NOT NULL'
+
+            logger.info(f"Adding column {table.name}.{column.name}")
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(text(ddl))
+            except SQLAlchemyError:
+                # Another worker may have added it in the meantime
+                if column.name not in {c['name'] for c in inspect(db.engine).get_columns(table.name)}:
+                    raise
+
+
+def _fill_engagement_counters():
+    """The denormalized like/comment/rating counters start at 0: count them once"""
+    from app.services.engagement_service import reconcile_engagement_counters
+    reconcile_engagement_counters()
+
+
+def _hash_article_urls(batch_size=1000):
+    """
+    Fill in url_hash for articles stored before it existed, then merge duplicate URLs
+
+    Archived articles are hashed too, so ingestion's archived-URL check
+    sees them. Must run before uq_article_url_hash is built.
+    """
+    from app.services.ingest_service import url_hash
+
+    archive = ARCHIVE_TABLES['articles']
+    for table, key in ((Article.__table__, Article.__table__.c.id), (archive, archive.c.archive_id)):
+        hashed = 0
+        last_key = 0
+        while True:
+            rows = db.session.execute(
+                db.select(key, table.c.source_url)
+                .where(key > last_key, table.c.url_hash.is_(None))
+                .order_by(key)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            last_key = rows[-1][0]
+
+            values = [{'row_key': row_key, 'row_hash': url_hash(url)} for row_key, url in rows if url_hash(url)]
+            if values:
+                db.session.execute(
+                    table.update().where(key == bindparam('row_key')).values(url_hash=bindparam('row_hash')),
+                    values
+                )
+                hashed += len(values)
+            db.session.commit()
+        logger.info(f"Hashed {hashed} URL(s) in {table.name}")
+
+    merged = 0
+    duplicates = [row[0] for row in db.session.query(Article.url_hash)
+                  .filter(Article.url_hash.isnot(None))
+                  .group_by(Article.url_hash)
+                  .having(db.func.count(Article.id) > 1)]
+    for key in duplicates:
+        merged += _merge_articles(key)
+        db.session.commit()
+
+    if merged:
+        logger.warning(f"Merged {merged} article(s) that duplicated the URL of another")
+        # The kept articles took over likes, comments and ratings
+        from app.services.engagement_service import reconcile_engagement_counters
+        reconcile_engagement_counters()
+
+
+def _merge_articles(key) -> int:
+    """
+    Fold the articles sharing a url_hash into one
+
+    The one kept is the first active, approved article (lowest id breaks
+    ties). Likes, ratings and reads move to it unless the user already has
+    one there; comments always move. Returns the number of articles removed.
+    """
+    ids = [row[0] for row in db.session.query(Article.id)
+           .filter(Article.url_hash == key)
+           .order_by(
+               db.case((Article.is_active == False, 1), else_=0),
+               db.case((Article.status == 'approved', 0), else_=1),
+               Article.id
+           )]
+    keep_id, duplicate_ids = ids[0], ids[1:]
+
+    for duplicate_id in duplicate_ids:
+        for model in (Like, HappinessRating, ReadArticle):
+            table = model.__table__
+            kept_users = db.select(table.c.user_id).where(table.c.article_id == keep_id)
+            db.session.execute(
+                table.update()
+                .where(table.c.article_id == duplicate_id, table.c.user_id.not_in(kept_users))
+                .values(article_id=keep_id)
+            )
+            db.session.execute(table.delete().where(table.c.article_id == duplicate_id))
+
+        db.session.execute(
+            Comment.__table__.update().where(Comment.__table__.c.article_id == duplicate_id).values(article_id=keep_id)
+        )
+        db.session.execute(
+            Article.__table__.update().where(Article.__table__.c.story_id == duplicate_id).values(story_id=keep_id)
+        )
+        for table in (StoryBand.__table__, StoryFingerprint.__table__):
+            db.session.execute(table.delete().where(table.c.article_id == duplicate_id))
+        db.session.execute(Article.__table__.delete().where(Article.__table__.c.id == duplicate_id))
+
+    return len(duplicate_ids)
+
+
+def _widen_watermark_entry_id():
+    """
+    feeds.watermark_entry_id was VARCHAR(500), cutting off longer entry ids
+
+    A cut id never matches the entry again, so its feed was parsed in full
+    on every poll. SQLite doesn't enforce VARCHAR lengths; elsewhere the
+    column becomes TEXT. The stored cut ids heal on the next poll.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        with db.engine.begin() as connection:
+            connection.execute(text('ALTER TABLE feeds ALTER COLUMN watermark_entry_id TYPE TEXT'))
+
+
+# One-off data migrations, in the order they run. Each is recorded as a
+# 'migration:<name>' version stamp once done, so it runs once per database;
+# it must also be safe to run again if a boot dies halfway.
+MIGRATIONS = [
+    ('article_url_hash', _hash_article_urls),
+    ('engagement_counters', _fill_engagement_counters),
+    ('feed_watermark_text', _widen_watermark_entry_id),
+]
+
+
+def run_migrations():
+    """Run the data migrations this database hasn't had yet; each commits"""
+    for name, migrate in MIGRATIONS:
+        stamp = f'migration:{name}'
+        if db.session.get(VersionStamp, stamp) is not None:
+            continue
+
+        logger.info(f"Running migration {name}")
+        migrate()
+        try:
+            db.session.add(VersionStamp(name=stamp, version=1))
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # Another worker recorded it first
+
+
+def _index_matches(live, index) -> bool:
+    """Whether a reflected index has the model index's columns and uniqueness"""
+    return live['column_names'] == [column.name for column in index.columns] \
+        and bool(live.get('unique')) == bool(index.unique)
+
+
+def create_missing_indexes():
+    """
+    Build model indexes that are missing from existing tables
+
+    An index whose columns changed in the model is dropped and built again.
+    Indexes over columns the table doesn't have yet are skipped, and
+    reported by schema_drift().
+    """
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        live_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        live_indexes = {index['name']: index for index in inspector.get_indexes(table.name)}
+
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            live = live_indexes.get(index.name)
+            if live is not None and _index_matches(live, index):
+                continue
+            if not {column.name for column in index.columns} <= live_columns:
+                logger.warning(f"Not building index {index.name}: {table.name} lacks some of its columns")
+                continue
+
+            try:
+                # One connection for both: SQLite's other pooled connections may
+                # not have seen the DROP yet when the CREATE is parsed
+                with db.engine.begin() as connection:
+                    if live is not None:
+                        logger.info(f"Rebuilding index {index.name} on {table.name} with the model's columns")
+                        index.drop(connection)
+                    else:
+                        logger.info(f"Building index {index.name} on {table.name}")
+                    index.create(connection)
+            except SQLAlchemyError:
+                # Another worker may have built it in the meantime
+                live = {i['name']: i for i in inspect(db.engine).get_indexes(table.name)}.get(index.name)
+                if live is None or not _index_matches(live, index):
+                    raise
+
+
+def schema_drift() -> List[str]:
+    """
+    Differences between the live database and the models
+
+    Returns:
+        list: Missing tables and columns, and missing or changed indexes
+    """
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    drift = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            drift.append(f"table {table.name} is missing")
+            continue
+
+        live_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        drift.extend(f"column {table.name}.{column.name} is missing"
+                     for column in table.columns if column.name not in live_columns)
+
+        live_indexes = {index['name']: index for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            live = live_indexes.get(index.name)
+            if live is None:
+                drift.append(f"index {index.name} on {table.name} is missing")
+            elif not _index_matches(live, index):
+                drift.append(f"index {index.name} on {table.name} differs from the model")
+    return drift
@@ -0,0 +1,141 @@
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, List
+from app.models import db
+from app.services.job_queue import job_handler, JobContext
+from app.services.cache_service import fetch_articles_for_review, bulk_review_articles
+from app.services.ingest_service import url_hash, BulkWriter, batches
+from app.services.story_service import assign_stories
+
+logger = logging.getLogger(__name__)
+
+# Row errors kept in an import result
+MAX_REPORTED_ROW_ERRORS = 10
+
+
+@job_handler('fetch_articles')
+def fetch_articles_job(job: JobContext, params: Dict) -> Dict:
+    """Fetch articles from the RSS feeds into the review queue"""
+    job.progress(0, 1)
+    success, articles_count, error = fetch_articles_for_review(params['count'], user_id=params.get('user_id'))
+    if not success:
+        raise RuntimeError(error)
+    job.progress(1)
+    return {
+        'fetched': articles_count,
+        'message': f'Successfully fetched {articles_count} articles for review',
+    }
+
+
+def csv_article_rows(reader: csv.DictReader, user_id: int, errors: List[str]) -> Iterator[Dict]:
+    """
+    Article rows from an uploaded CSV, read lazily
+
+    Rows missing a required field are skipped and described in `errors`.
+
+    Args:
+        reader: DictReader over the CSV text
+        user_id: Admin the articles are credited to
+        errors: Receives one message per skipped row
+    """
+    for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
+        try:
+            # Get values using normalized column names
+            title = None
+            url = None
+            source_name = None
+            description = None
+            image_url = None
+
+            for key, value in row.items():
+                normalized_key = key.lower().strip().replace(' ', '_')
+                if normalized_key == 'title' or normalized_key == 'article_title':
+                    title = value.strip()
+                elif normalized_key == 'url' or normalized_key == 'article_url':
+                    url = value.strip()
+                elif normalized_key == 'source_name':
+                    source_name = value.strip()
+                elif normalized_key == 'description':
+                    description = value.strip()
+                elif normalized_key == 'image_url':
+                    image_url = value.strip()
+
+            # Validate required fields
+            if not title or not url or not source_name:
+                errors.append(f'Row {row_num}: Missing required fields (title, url, or source_name)')
+                continue
+
+            # Queue article (pending approval)
+            yield {
+                'title': title,
+                'description': description if description else None,
+                'content': description if description else None,
+                'image_url': image_url if image_url else None,
+                'source_url': url,
+                'url_hash': url_hash(url),
+                'source_name': source_name,
+                'published_at': datetime.utcnow(),
+                'source_type': 'manual',
+                'added_by_id': user_id,
+                'status': 'pending',
+                'is_active': True
+            }
+
+        except Exception as e:
+            errors.append(f'Row {row_num}: {str(e)}')
+            continue
+
+
+@job_handler('import_csv')
+def import_csv_job(job: JobContext, params: Dict) -> Dict:
+    """
+    Import an uploaded CSV (the job payload) into the review queue
+
+    Rows are written in committed chunks, skipping URLs already stored and
+    isolating rows the database rejects; progress counts rows read.
+    """
+    from app.services.sentiment_service import score_articles
+
+    text = job.payload or ''
+    job.progress(0, max(text.count('\n') - 1, 0))  # Estimate: quoted fields may span lines
+    reader = csv.DictReader(io.StringIO(text, newline=None))
+
+    errors = []
+    writer = BulkWriter(commit=True)
+    for chunk in batches(csv_article_rows(reader, params['user_id'], errors), writer.chunk_size):
+        writer.write_chunk(chunk)
+        job.progress(writer.rows + len(errors))
+    assign_stories()
+    score_articles()
+    db.session.commit()
+    job.progress(writer.rows + len(errors), writer.rows + len(errors))
+
+    report = writer.report()
+    logger.info(f"CSV import of {params.get('filename')}: {writer}")
+    return {
+        'inserted': report['inserted'],
+        'skipped': report['skipped'],
+        'failed': report['failed'],
+        'invalid': len(errors),
+        'rows_per_second': report['rows_per_second'],
+        'errors': (errors + report['errors'])[:MAX_REPORTED_ROW_ERRORS],
+        'message': (
+            f'Imported {report["inserted"]} article(s) for review in {report["seconds"]:.1f}s '
+            f'({report["rows_per_second"]:,} rows/s); {report["skipped"]} already in the database, '
+            f'{len(errors)} invalid row(s), {report["failed"]} row(s) could not be saved'
+        ),
+    }
+
+
+@job_handler('review_articles')
+def review_articles_job(job: JobContext, params: Dict) -> Dict:
+    """Approve or reject a batch of pending articles"""
+    article_ids = params['article_ids']
+    job.progress(0, len(article_ids))
+    reviewed = bulk_review_articles(article_ids, params['admin_id'], params['status'], progress=job.progress)
+    return {
+        'reviewed': reviewed,
+        'message': f'{params["status"].capitalize()} {reviewed} article(s)',
+    }
@@ -0,0 +1,179 @@
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models import db, Article, ArticleCount
+
+logger = logging.getLogger(__name__)
+
+# (source_type, status, is_active) - the grain of the article_counts rollup
+CountKey = Tuple[str, str, bool]
+
+
+def count_key(source_type, status, is_active) -> CountKey:
+    """Rollup key for an article, with the column defaults standing in for NULLs"""
+    return (source_type or 'auto', status or 'approved', True if is_active is None else bool(is_active))
+
+
+def count_groups(*criteria) -> Counter:
+    """
+    Count articles per rollup key with one GROUP BY source_type, status, is_active
+
+    Args:
+        *criteria: Filters on Article (none counts every article)
+
+    Returns:
+        Counter: CountKey -> number of articles
+    """
+    groups = Counter()
+    rows = db.session.query(Article.source_type, Article.status, Article.is_active, db.func.count(Article.id))\
+        .filter(*criteria)\
+        .group_by(Article.source_type, Article.status, Article.is_active)
+    for source_type, status, is_active, count in rows:
+        groups[count_key(source_type, status, is_active)] += count
+    return groups
+
+
+def adjust_article_counts(deltas: Dict[CountKey, int]):
+    """
+    Apply count deltas to the rollup inside the caller's transaction
+
+    Like the engagement counters, the change commits or rolls back together
+    with the article write it describes.
+
+    Args:
+        deltas: CountKey -> change in the number of articles
+    """
+    _write_counts({key: delta for key, delta in deltas.items() if delta}, increment=True)
+
+
+def _write_counts(counts: Dict[CountKey, int], increment: bool):
+    """Add `counts` to the rollup rows, or with increment=False overwrite them"""
+    values = [
+        {'source_type': key[0], 'status': key[1], 'is_active': key[2], 'count': count}
+        for key, count in counts.items()
+    ]
+    if not values:
+        return
+
+    table = ArticleCount.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = (postgresql.insert if dialect == 'postgresql' else sqlite.insert)(table)
+        db.session.execute(insert.on_conflict_do_update(
+            index_elements=[table.c.source_type, table.c.status, table.c.is_active],
+            set_={'count': table.c.count + insert.excluded.count if increment else insert.excluded.count}
+        ), values)
+        return
+
+    # Portable fallback: update the known keys, insert the rest
+    for row in values:
+        updated = db.session.execute(
+            db.update(ArticleCount)
+            .where(
+                ArticleCount.source_type == row['source_type'],
+                ArticleCount.status == row['status'],
+                ArticleCount.is_active == row['is_active']
+            )
+            .values(count=ArticleCount.count + row['count'] if increment else row['count'])
+        ).rowcount
+        if not updated:
+            db.session.execute(table.insert(), [row])
+
+
+def count_inserted(rows: Iterable[Dict]):
+    """Add newly inserted articles (Article column dicts) to the rollup"""
+    adjust_article_counts(Counter(
+        count_key(row.get('source_type'), row.get('status'), row.get('is_active')) for row in rows
+    ))
+
+
+def count_removed(*criteria):
+    """Take the articles matching `criteria` out of the rollup; call before deleting them"""
+    adjust_article_counts({key: -count for key, count in count_groups(*criteria).items()})
+
+
+def update_articles(criteria: List, values: Dict) -> int:
+    """
+    UPDATE the articles matching `criteria`, moving their counts in the rollup
+
+    Use instead of a bare UPDATE whenever source_type, status or is_active
+    may change. The affected rows are grouped first (one GROUP BY), so the
+    rollup moves by exactly what the UPDATE changes; both run inside the
+    caller's transaction.
+
+    Args:
+        criteria: Filters on Article
+        values: Column name -> new value
+
+    Returns:
+        int: Number of articles updated
+    """
+    groups = count_groups(*criteria)
+    result = db.session.execute(
+        db.update(Article).where(*criteria).values(**values),
+        execution_options={'synchronize_session': False}
+    )
+
+    deltas = Counter()
+    for key, count in groups.items():
+        new_key = count_key(
+            values.get('source_type', key[0]),
+            values.get('status', key[1]),
+            values.get('is_active', key[2])
+        )
+        if new_key != key:
+            deltas[key] -= count
+            deltas[new_key] += count
+    adjust_article_counts(deltas)
+    return result.rowcount
+
+
+def get_article_counts() -> Dict[CountKey, int]:
+    """
+    The rollup: article counts per (source_type, status, is_active)
+
+    Reads a handful of rows however many articles there are.
+    """
+    return {
+        count_key(row.source_type, row.status, row.is_active): row.count
+        for row in ArticleCount.query.all()
+    }
+
+
+def rebuild_article_counts(app=None) -> Dict[str, int]:
+    """
+    Recompute the rollup from the articles table and repair any drift; commits
+
+    Incremental updates can drift if two transactions move the same
+    articles at once (or an article is changed outside the services), so
+    this also runs as a daily job.
+
+    Args:
+        app: Flask application instance (for app context)
+
+    Returns:
+        dict: {'keys': rollup rows, 'drifted': rows that were wrong}
+    """
+    if app:
+        with app.app_context():
+            return _rebuild_article_counts_impl()
+    return _rebuild_article_counts_impl()
+
+
+def _rebuild_article_counts_impl():
+    try:
+        actual = count_groups()
+        stored = get_article_counts()
+        drifted = [key for key in set(actual) | set(stored) if actual.get(key, 0) != stored.get(key, 0)]
+        if drifted:
+            logger.warning(f"Article count drift on {len(drifted)} key(s): {sorted(drifted)}")
+            # Absolute values, so workers rebuilding at the same time can't double-count
+            _write_counts({key: actual.get(key, 0) for key in drifted}, increment=False)
+        db.session.commit()
+        return {'keys': len(actual), 'drifted': len(drifted)}
+
+    except Exception as e:
+        logger.error(f"Error rebuilding article counts: {str(e)}")
+        db.session.rollback()
+        raise
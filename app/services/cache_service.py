@@ -1,16 +1,27 @@
 import logging
-from datetime import date, datetime, timedelta
-from flask import current_app, session
-from app.models import db, Article, APIRequest, FetchHistory
-from app.services.rss_feed_service import fetch_articles_from_rss
+from datetime import date, datetime
+from flask import current_app
+from sqlalchemy import and_, or_
+from app.models import db, Article, APIRequest, FetchHistory, ReadArticle, ReportedComment
+from app.services.feed_cache import forget_feed_states
+from app.services.feed_registry import claim_due_feeds, get_active_feeds, poll_reporter
+from app.services.ingest_service import batches
+from app.services.article_stats import count_key, adjust_article_counts, get_article_counts, update_articles
+from app.services.story_service import assign_stories
+from app.services.feed_cursor import encode_feed_cursor, decode_feed_cursor
+from app.services.feed_snapshot import invalidate_feed
 from app.config import Config
+from app import cache
 
 logger = logging.getLogger(__name__)
 
 
 def update_cache(app=None):
     """
-    Update article cache by fetching new articles from NewsAPI
+    Update article cache by polling the RSS feeds that are due
+
+    Runs every FEED_SCHEDULER_TICK seconds; each feed is polled on its own
+    interval (see services/feed_registry.py).
 
     Args:
         app: Flask application instance (for app context)
@@ -28,42 +39,48 @@ def update_cache(app=None):
 def _update_cache_impl():
     """Internal implementation of cache update"""
     try:
-        # Fetch new articles from RSS feeds
-        articles = fetch_articles_from_rss()
-        if not articles:
+        feeds = claim_due_feeds()
+        if not feeds:
+            return True
+
+        # The ingestion stack (feedparser, requests, numpy) is loaded on first
+        # use rather than when a worker boots
+        from app.services.ingest_pipeline import ingest_feeds
+        from app.services.sentiment_service import score_articles
+
+        # Stream articles from the due feeds into the database (scheduled
+        # fetches are auto-approved), recording each feed's outcome
+        result = ingest_feeds(
+            [feed.as_config() for feed in feeds],
+            status='approved',
+            update_existing=True,
+            report=poll_reporter(feeds)
+        )
+        if result is None:
+            db.session.commit()  # Keep the failure counts and backoff
             logger.error("Failed to fetch articles from RSS feeds")
             return False
+        if not result['inserted'] and not result['updated']:
+            db.session.commit()
+            logger.info("No new or changed articles in the polled RSS feeds")
+            return True
 
-        # Store articles in database (automatically approved for scheduled fetches)
-        for item in articles:
-            try:
-                article = Article(
-                    title=item.get('title', 'No title'),
-                    description=item.get('description'),
-                    content=item.get('content'),
-                    image_url=item.get('urlToImage'),
-                    published_at=datetime.strptime(item['publishedAt'], '%Y-%m-%dT%H:%M:%SZ') if item.get('publishedAt') else None,
-                    source_name=item['source']['name'] if isinstance(item.get('source'), dict) else 'Unknown',
-                    source_url=item.get('url', ''),
-                    source_type='auto',
-                    status='approved'  # Scheduled fetches are auto-approved
-                )
-                db.session.add(article)
-            except Exception as e:
-                logger.error(f"Error processing article: {str(e)}")
-                continue
-
-        # Mark old articles as inactive
-        cutoff_date = datetime.utcnow() - timedelta(days=Config.ARTICLE_RETENTION_DAYS)
-        Article.query.filter(Article.cached_at < cutoff_date).update({'is_active': False})
+        assign_stories()
+        score_articles()
 
+        invalidate_feed()
         db.session.commit()
-        logger.info(f"Successfully cached {len(articles)} articles")
+        logger.info(
+            f"Successfully cached articles: {result['inserted']} inserted, "
+            f"{result['updated']} updated, {result['skipped']} skipped"
+        )
         return True
 
     except Exception as e:
         logger.error(f"Error updating cache: {str(e)}")
         db.session.rollback()
+        # Re-fetch the feeds in full next time instead of skipping them as unchanged
+        forget_feed_states()
         return False
 
 
@@ -82,7 +99,7 @@ def get_paginated_articles(page=1, per_page=5):
 
     articles = Article.query\
         .filter_by(is_active=True, status='approved')\
-        .order_by(Article.published_at.desc())\
+        .order_by(Article.published_at.desc(), Article.id.desc())\
         .offset(offset)\
         .limit(per_page)\
         .all()
@@ -90,6 +107,77 @@ def get_paginated_articles(page=1, per_page=5):
     return articles
 
 
+def get_articles_by_cursor(cursor=None, per_page=5, query=None):
+    """
+    Retrieve a page of articles using keyset pagination on (published_at, id)
+
+    Unlike get_paginated_articles this never uses OFFSET, so deep pages cost
+    the same as the first one and rows don't shift when new articles land.
+
+    Args:
+        cursor: Cursor returned with the previous page (None for first page)
+        per_page: Number of articles per page
+        query: Optional base query (defaults to active, approved articles)
+
+    Returns:
+        tuple: (list of Article objects, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if query is None:
+        query = Article.query.filter_by(is_active=True, status='approved')
+
+    if cursor:
+        published_at, article_id = decode_feed_cursor(cursor)
+        # Every ingest path stamps published_at, so undated rows are not paged past
+        query = query.filter(or_(
+            Article.published_at < published_at,
+            and_(Article.published_at == published_at, Article.id < article_id)
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    articles = query\
+        .order_by(Article.published_at.desc(), Article.id.desc())\
+        .limit(per_page + 1)\
+        .all()
+
+    next_cursor = None
+    if len(articles) > per_page:
+        articles = articles[:per_page]
+        next_cursor = encode_feed_cursor(articles[-1])
+
+    return articles, next_cursor
+
+
+def filter_by_read_status(query, user_id, show_read='false'):
+    """
+    Restrict an article query by the user's read history
+
+    Uses a correlated (NOT) EXISTS against read_articles so the read-ID list is
+    never pulled into Python or bound as a giant IN (...) parameter list.
+
+    Args:
+        query: Article query to filter
+        user_id: Current user's ID
+        show_read: 'false' for unread only, 'only' for read only, 'true' for all
+
+    Returns:
+        Query: Filtered query
+    """
+    if show_read not in ('false', 'only'):
+        return query
+
+    has_read = db.session.query(ReadArticle.id).filter(
+        ReadArticle.user_id == user_id,
+        ReadArticle.article_id == Article.id
+    ).exists()
+
+    if show_read == 'false':
+        return query.filter(~has_read)
+    return query.filter(has_read)
+
+
 def get_api_request_count(request_date=None):
     """
     Get API request count for a specific date
@@ -107,6 +195,29 @@ def get_api_request_count(request_date=None):
     return api_request.request_count if api_request else 0
 
 
+@cache.memoize(ttl=10)
+def get_dashboard_counts():
+    """
+    Get the article and report counts shown on the admin dashboard
+
+    Article counts come from the article_counts rollup (a few rows, kept up
+    to date by every write; see services/article_stats.py), so the cost
+    doesn't grow with the articles table. Cached briefly in the shared
+    cache on top.
+
+    Returns:
+        dict: total, manual, auto, pending and reports counts
+    """
+    counts = get_article_counts()
+    return {
+        'total_articles': sum(n for (_, status, active), n in counts.items() if status == 'approved' and active),
+        'manual_articles': counts.get(('manual', 'approved', True), 0),
+        'auto_articles': counts.get(('auto', 'approved', True), 0),
+        'pending_count': sum(n for (_, status, _), n in counts.items() if status == 'pending'),
+        'reports_count': ReportedComment.query.filter_by(is_resolved=False).count(),
+    }
+
+
 def get_total_cached_articles():
     """
     Get total number of active cached articles
@@ -114,7 +225,7 @@ def get_total_cached_articles():
     Returns:
         int: Count of active articles
     """
-    return Article.query.filter_by(is_active=True, status='approved').count()
+    return sum(n for (_, status, active), n in get_article_counts().items() if status == 'approved' and active)
 
 
 # ==================== ARTICLE REVIEW FUNCTIONS ====================
@@ -139,61 +250,102 @@ def increment_api_request_count():
         db.session.add(api_request)
 
 
-def fetch_articles_for_review(count=25):
+def fetch_articles_for_review(count=25, user_id=None):
     """
     Fetch articles from RSS feeds and save with 'pending' status
+    Args: count (articles to keep), user_id (admin who asked, for the fetch history)
     Returns: (success: bool, article_count: int, error: str)
     """
+    from app.services.ingest_pipeline import ingest_feeds
+    from app.services.sentiment_service import score_articles
+
     try:
-        # Fetch from RSS feeds
-        news_data = fetch_articles_from_rss(max_articles=count)
+        # Fetch from every enabled feed, whether or not it is due, keeping the
+        # newest `count` articles; ones already known (in any status) are skipped
+        feeds = get_active_feeds()
+        result = ingest_feeds(
+            [feed.as_config() for feed in feeds],
+            status='pending',
+            limit=count,
+            only_changed=False,  # Entries cut by the limit must be offered again
+            report=poll_reporter(feeds)
+        )
 
-        if not news_data:
+        if result is None:
+            db.session.commit()  # Keep the failure counts and backoff
             return False, 0, "No articles returned from RSS feeds"
 
-        # Save as pending
-        articles_added = 0
-        for item in news_data:
-            try:
-                article = Article(
-                    title=item.get('title', 'No title'),
-                    description=item.get('description'),
-                    content=item.get('content'),
-                    image_url=item.get('urlToImage'),
-                    published_at=datetime.strptime(item['publishedAt'], '%Y-%m-%dT%H:%M:%SZ') if item.get('publishedAt') else None,
-                    source_name=item['source']['name'] if isinstance(item.get('source'), dict) else 'Unknown',
-                    source_url=item.get('url', ''),
-                    source_type='auto',
-                    status='pending'  # Key difference - articles start as pending
-                )
-                db.session.add(article)
-                articles_added += 1
-            except Exception as e:
-                logger.error(f"Error processing article: {str(e)}")
-                continue
+        assign_stories()
+        score_articles()
+        articles_added = result['inserted']
 
         # Create fetch history record
         fetch_record = FetchHistory(
-            fetched_by_id=session.get('user_id'),
+            fetched_by_id=user_id,
             articles_fetched=articles_added
         )
         db.session.add(fetch_record)
 
         db.session.commit()
-        logger.info(f"Fetched {articles_added} articles for review from RSS feeds")
+        logger.info(
+            f"Fetched {articles_added} articles for review from RSS feeds "
+            f"({result['skipped']} already known)"
+        )
         return True, articles_added, None
 
     except Exception as e:
         logger.error(f"Error fetching articles for review: {str(e)}")
         db.session.rollback()
+        forget_feed_states()
         return False, 0, str(e)
 
 
+def bulk_review_articles(article_ids, admin_id, status, batch_size=500, progress=None):
+    """
+    Approve or reject many pending articles with batched UPDATEs
+
+    Commits after every batch and invalidates the feed once at the end,
+    instead of once per article.
+
+    Args:
+        article_ids: IDs of the articles to review; ones no longer pending are left alone
+        admin_id: Reviewing admin
+        status: 'approved' or 'rejected'
+        batch_size: Articles updated per statement
+        progress: Called with the number of IDs processed after each batch
+
+    Returns:
+        int: Number of articles reviewed
+    """
+    reviewed = 0
+    done = 0
+    for batch in batches(article_ids, batch_size):
+        reviewed += update_articles(
+            [Article.id.in_(batch), Article.status == 'pending'],
+            {
+                'status': status,
+                'reviewed_by_id': admin_id,
+                'reviewed_at': datetime.utcnow(),
+                'is_active': status == 'approved'
+            }
+        )
+        db.session.commit()
+        done += len(batch)
+        if progress:
+            progress(done)
+
+    if reviewed:
+        invalidate_feed()
+        db.session.commit()
+    logger.info(f"Bulk review: {reviewed} article(s) {status}")
+    return reviewed
+
+
 def get_pending_articles():
-    """Get all pending articles for review"""
+    """Get all pending articles for review, most positive first"""
     return Article.query\
         .filter_by(status='pending')\
-        .order_by(Article.cached_at.desc())\
+        .order_by(Article.positivity_score.desc().nullslast(), Article.cached_at.desc())\
         .all()
 
 
@@ -202,10 +354,13 @@ def approve_article(article_id, admin_id):
     try:
         article = Article.query.get(article_id)
         if article and article.status == 'pending':
+            before = count_key(article.source_type, article.status, article.is_active)
             article.status = 'approved'
             article.reviewed_by_id = admin_id
             article.reviewed_at = datetime.utcnow()
             article.is_active = True
+            adjust_article_counts({before: -1, count_key(article.source_type, article.status, article.is_active): 1})
+            invalidate_feed()
             db.session.commit()
             return True
         return False
@@ -220,10 +375,13 @@ def reject_article(article_id, admin_id):
     try:
         article = Article.query.get(article_id)
         if article and article.status == 'pending':
+            before = count_key(article.source_type, article.status, article.is_active)
             article.status = 'rejected'
             article.reviewed_by_id = admin_id
             article.reviewed_at = datetime.utcnow()
             article.is_active = False
+            adjust_article_counts({before: -1, count_key(article.source_type, article.status, article.is_active): 1})
+            invalidate_feed()
             db.session.commit()
             return True
         return False
@@ -0,0 +1,318 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import bindparam, func, or_, and_
+from sqlalchemy.orm import joinedload
+from app.models import db, User, Article, Like, Comment, HappinessRating
+from app.services.feed_cursor import encode_cursor, decode_cursor
+from app.services.feed_snapshot import invalidate_feed
+
+logger = logging.getLogger(__name__)
+
+# Number of likers shown in the Instagram-style "liked by" line
+LIKER_PREVIEW_SIZE = 5
+
+
+def get_engagement(article_ids: List[int], user_id: Optional[int] = None) -> Dict[int, Dict]:
+    """
+    Load social engagement data for a page of articles with grouped aggregates
+
+    Issues a fixed number of queries regardless of how many articles are
+    requested. Counts are read from the denormalised counters on Article, so
+    interaction tables are only touched for the liker preview and the user's
+    own like/rating.
+
+    Args:
+        article_ids: IDs of the articles on the page
+        user_id: Current user's ID (for own like/rating and liker preview)
+
+    Returns:
+        dict: Engagement data keyed by article ID (unknown IDs are omitted)
+    """
+    engagement = {
+        article_id: {
+            'like_count': 0,
+            'user_has_liked': False,
+            'liked_by_users': [],
+            'comment_count': 0,
+            'happiness_average': 0,
+            'happiness_count': 0,
+            'user_happiness_rating': None,
+        }
+        for article_id in article_ids
+    }
+    if not engagement:
+        return engagement
+
+    ids = list(engagement)
+
+    # Counts come from the denormalised counters on Article
+    counters = db.session.query(
+        Article.id,
+        Article.like_count,
+        Article.active_comment_count,
+        Article.rating_sum,
+        Article.rating_count
+    ).filter(Article.id.in_(ids))
+    found = set()
+    for article_id, like_count, comment_count, rating_sum, rating_count in counters:
+        found.add(article_id)
+        engagement[article_id].update({
+            'like_count': like_count,
+            'comment_count': comment_count,
+            'happiness_average': round(rating_sum / rating_count) if rating_count else 0,
+            'happiness_count': rating_count,
+        })
+
+    # Drop IDs that don't match an article
+    engagement = {article_id: data for article_id, data in engagement.items() if article_id in found}
+    ids = list(engagement)
+    if not ids:
+        return engagement
+
+    if user_id:
+        # First likers per article via a window function, joined to usernames
+        liker_rank = func.row_number().over(
+            partition_by=Like.article_id,
+            order_by=(Like.created_at, Like.id)
+        ).label('liker_rank')
+        ranked = db.session.query(Like.article_id, Like.user_id, liker_rank)\
+            .filter(Like.article_id.in_(ids))\
+            .subquery()
+        likers = db.session.query(ranked.c.article_id, ranked.c.user_id, User.username)\
+            .join(User, User.id == ranked.c.user_id)\
+            .filter(ranked.c.liker_rank <= LIKER_PREVIEW_SIZE)\
+            .order_by(ranked.c.article_id, ranked.c.liker_rank)
+        for article_id, liker_id, username in likers:
+            engagement[article_id]['liked_by_users'].append({'id': liker_id, 'username': username})
+
+        # The user's own likes and ratings on this page
+        own_likes = db.session.query(Like.article_id)\
+            .filter(Like.user_id == user_id, Like.article_id.in_(ids))
+        for (article_id,) in own_likes:
+            engagement[article_id]['user_has_liked'] = True
+
+        own_ratings = db.session.query(HappinessRating.article_id, HappinessRating.rating)\
+            .filter(HappinessRating.user_id == user_id, HappinessRating.article_id.in_(ids))
+        for article_id, rating in own_ratings:
+            engagement[article_id]['user_happiness_rating'] = rating
+
+    return engagement
+
+
+def serialize_articles(articles, user_id: Optional[int] = None) -> List[Dict]:
+    """
+    Serialize a page of articles with engagement data in bulk
+
+    Produces the same dictionaries as Article.to_dict, but with a fixed number
+    of queries for the whole page instead of several per article.
+
+    Args:
+        articles: List of Article objects
+        user_id: Current user's ID
+
+    Returns:
+        list: Article dictionaries in the same order as `articles`
+    """
+    engagement = get_engagement([article.id for article in articles], user_id)
+
+    result = []
+    for article in articles:
+        data = article.to_card_dict()
+        data.update(engagement[article.id])
+        result.append(data)
+    return result
+
+
+def get_comment_page(article_id: int, cursor: Optional[str] = None, order: str = 'newest', per_page: int = 20):
+    """
+    Get one page of an article's active comments using keyset pagination
+
+    Authors are joined in the same query, so rendering usernames needs no
+    extra lookups.
+
+    Args:
+        article_id: Article whose comments to load
+        cursor: Cursor returned with the previous page (None for first page)
+        order: 'newest' or 'oldest' first
+        per_page: Number of comments per page
+
+    Returns:
+        tuple: (list of Comment objects, next cursor or None)
+
+    Raises:
+        ValueError: If the cursor or order is invalid
+    """
+    if order not in ('newest', 'oldest'):
+        raise ValueError('order must be "newest" or "oldest"')
+    newest_first = order == 'newest'
+
+    query = Comment.query\
+        .options(joinedload(Comment.user))\
+        .filter(Comment.article_id == article_id, Comment.is_active == True)
+
+    if cursor:
+        created_at, comment_id = decode_cursor(cursor)
+        if newest_first:
+            query = query.filter(or_(
+                Comment.created_at < created_at,
+                and_(Comment.created_at == created_at, Comment.id < comment_id)
+            ))
+        else:
+            query = query.filter(or_(
+                Comment.created_at > created_at,
+                and_(Comment.created_at == created_at, Comment.id > comment_id)
+            ))
+
+    if newest_first:
+        query = query.order_by(Comment.created_at.desc(), Comment.id.desc())
+    else:
+        query = query.order_by(Comment.created_at.asc(), Comment.id.asc())
+
+    # Fetch one extra row to know whether another page exists
+    comments = query.limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(comments) > per_page:
+        comments = comments[:per_page]
+        next_cursor = encode_cursor(comments[-1].created_at, comments[-1].id)
+
+    return comments, next_cursor
+
+
+# ==================== COUNTER MAINTENANCE ====================
+
+def adjust_counters(article_id: int, **deltas):
+    """
+    Atomically apply deltas to an article's engagement counters
+
+    Runs as an UPDATE inside the caller's transaction, so the counter change
+    commits or rolls back together with the interaction write. The article's
+    engagement version is bumped even when no counter changes (e.g. a
+    comment edit), so HTTP validators see every interaction.
+
+    Args:
+        article_id: Article to update
+        **deltas: Counter column name -> amount, e.g. like_count=1
+    """
+    values = {getattr(Article, name): getattr(Article, name) + delta for name, delta in deltas.items() if delta}
+    values[Article.engagement_version] = Article.engagement_version + 1
+    values[Article.engagement_updated_at] = datetime.utcnow()
+    Article.query.filter_by(id=article_id).update(values, synchronize_session=False)
+
+
+def reconcile_engagement_counters(app=None, repair=True, batch_size=1000):
+    """
+    Detect (and optionally repair) drift between the counters and the interaction tables
+
+    Args:
+        app: Flask application instance (for app context)
+        repair: Write the recomputed values back when drift is found
+        batch_size: Number of articles checked per batch
+
+    Returns:
+        dict: {'checked': int, 'drifted': int}
+    """
+    if app:
+        with app.app_context():
+            return _reconcile_engagement_counters_impl(repair, batch_size)
+    return _reconcile_engagement_counters_impl(repair, batch_size)
+
+
+def _reconcile_engagement_counters_impl(repair, batch_size):
+    """Internal implementation of counter reconciliation"""
+    checked = 0
+    drifted = 0
+    last_id = 0
+
+    try:
+        # Walk the table in id order so each batch is short and holds no long locks
+        while True:
+            batch = db.session.query(Article.id)\
+                .filter(Article.id > last_id)\
+                .order_by(Article.id)\
+                .limit(batch_size)\
+                .all()
+            if not batch:
+                break
+            first_id, last_id = batch[0][0], batch[-1][0]
+            checked += len(batch)
+
+            rows = _find_counter_drift(first_id, last_id)
+            if rows:
+                drifted += len(rows)
+                logger.warning(f"Engagement counter drift on {len(rows)} article(s) in ids {first_id}-{last_id}")
+                if repair:
+                    # Bump the version like adjust_counters() does, so ETags and
+                    # Last-Modified built from it change with the counts
+                    table = Article.__table__
+                    db.session.execute(
+                        table.update()
+                        .where(table.c.id == bindparam('article_id'))
+                        .values(
+                            like_count=bindparam('likes'),
+                            active_comment_count=bindparam('comments'),
+                            rating_sum=bindparam('total'),
+                            rating_count=bindparam('ratings'),
+                            engagement_version=table.c.engagement_version + 1,
+                            engagement_updated_at=datetime.utcnow(),
+                        ),
+                        [
+                            {
+                                'article_id': article_id,
+                                'likes': like_count,
+                                'comments': comment_count,
+                                'total': rating_sum,
+                                'ratings': rating_count,
+                            }
+                            for article_id, like_count, comment_count, rating_sum, rating_count in rows
+                        ]
+                    )
+                    invalidate_feed()
+                    db.session.commit()
+
+        logger.info(f"Reconciled engagement counters: {checked} checked, {drifted} drifted")
+        return {'checked': checked, 'drifted': drifted}
+
+    except Exception as e:
+        logger.error(f"Error reconciling engagement counters: {str(e)}")
+        db.session.rollback()
+        raise
+
+
+def _find_counter_drift(first_id, last_id):
+    """Return (id, likes, comments, rating_sum, rating_count) for drifted articles in an id range"""
+    likes = db.session.query(Like.article_id, func.count(Like.id).label('n'))\
+        .filter(Like.article_id.between(first_id, last_id))\
+        .group_by(Like.article_id).subquery()
+    comments = db.session.query(Comment.article_id, func.count(Comment.id).label('n'))\
+        .filter(Comment.article_id.between(first_id, last_id), Comment.is_active == True)\
+        .group_by(Comment.article_id).subquery()
+    ratings = db.session.query(
+        HappinessRating.article_id,
+        func.count(HappinessRating.id).label('n'),
+        func.sum(HappinessRating.rating).label('total')
+    ).filter(HappinessRating.article_id.between(first_id, last_id))\
+        .group_by(HappinessRating.article_id).subquery()
+
+    actual_likes = func.coalesce(likes.c.n, 0)
+    actual_comments = func.coalesce(comments.c.n, 0)
+    actual_rating_sum = func.coalesce(ratings.c.total, 0)
+    actual_rating_count = func.coalesce(ratings.c.n, 0)
+
+    return db.session.query(
+        Article.id,
+        actual_likes,
+        actual_comments,
+        actual_rating_sum,
+        actual_rating_count
+    ).outerjoin(likes, likes.c.article_id == Article.id)\
+        .outerjoin(comments, comments.c.article_id == Article.id)\
+        .outerjoin(ratings, ratings.c.article_id == Article.id)\
+        .filter(Article.id.between(first_id, last_id))\
+        .filter(or_(
+            Article.like_count != actual_likes,
+            Article.active_comment_count != actual_comments,
+            Article.rating_sum != actual_rating_sum,
+            Article.rating_count != actual_rating_count
+        )).all()
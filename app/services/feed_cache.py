@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def _paths(feed_url: str):
+    """(raw document path, metadata path) for a feed URL"""
+    key = hashlib.sha1(feed_url.encode('utf-8')).hexdigest()
+    return (os.path.join(Config.RSS_CACHE_DIR, f'{key}.xml'),
+            os.path.join(Config.RSS_CACHE_DIR, f'{key}.json'))
+
+
+def _write_atomic(path: str, data: bytes):
+    """Write a file so concurrent readers (other workers) never see a partial copy"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def content_hash(content: bytes) -> str:
+    """Hash of a raw feed document, used to detect unchanged payloads"""
+    return hashlib.sha256(content).hexdigest()
+
+
+def load_feed_state(feed_url: str) -> Optional[Dict]:
+    """
+    Load the stored validators and content hash for a feed
+
+    Args:
+        feed_url: URL of the feed
+
+    Returns:
+        dict: {'etag', 'last_modified', 'content_type', 'content_hash', 'fetched_at'}
+        or None if the feed has not been fetched yet
+    """
+    _, meta_path = _paths(feed_url)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable feed cache entry for {feed_url}: {str(e)}")
+        return None
+
+
+def load_feed_content(feed_url: str) -> Optional[bytes]:
+    """
+    Load the cached raw document for a feed
+
+    Args:
+        feed_url: URL of the feed
+
+    Returns:
+        bytes: Raw feed document, or None if not cached
+    """
+    raw_path, _ = _paths(feed_url)
+    try:
+        with open(raw_path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def save_feed(feed_url: str, content: bytes, headers: Dict) -> str:
+    """
+    Store a freshly downloaded feed document and its validators
+
+    Args:
+        feed_url: URL of the feed
+        content: Raw feed document
+        headers: HTTP response headers (lower-cased names)
+
+    Returns:
+        str: Content hash of the document
+    """
+    os.makedirs(Config.RSS_CACHE_DIR, exist_ok=True)
+    raw_path, meta_path = _paths(feed_url)
+    digest = content_hash(content)
+    state = {
+        'url': feed_url,
+        'etag': headers.get('etag'),
+        'last_modified': headers.get('last-modified'),
+        'content_type': headers.get('content-type'),
+        'content_hash': digest,
+        'fetched_at': datetime.utcnow().isoformat(),
+    }
+    # Raw bytes first, so metadata never points at a document we don't have
+    _write_atomic(raw_path, content)
+    _write_atomic(meta_path, json.dumps(state).encode('utf-8'))
+    return digest
+
+
+def forget_feed_states(feed_urls: Optional[Iterable[str]] = None):
+    """
+    Drop stored validators and hashes
+
+    Call when articles from a fetch could not be stored (or were only
+    partly taken), so the next run downloads and parses those feeds in full
+    instead of skipping them as unchanged.
+
+    Args:
+        feed_urls: Feeds to forget (defaults to all of them)
+    """
+    if not os.path.isdir(Config.RSS_CACHE_DIR):
+        return
+    if feed_urls is None:
+        paths = [os.path.join(Config.RSS_CACHE_DIR, name)
+                 for name in os.listdir(Config.RSS_CACHE_DIR) if name.endswith('.json')]
+    else:
+        paths = [_paths(feed_url)[1] for feed_url in feed_urls]
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
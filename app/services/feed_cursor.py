@@ -0,0 +1,68 @@
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(timestamp, row_id):
+    """
+    Build an opaque keyset cursor from a (timestamp, id) position
+
+    Args:
+        timestamp: Sort timestamp of the last row on the page
+        row_id: Primary key of the last row on the page
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    raw = json.dumps([(timestamp or datetime.min).isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Cursor string from the client
+
+    Returns:
+        tuple: (timestamp, row_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+def encode_feed_cursor(article):
+    """
+    Build an opaque cursor pointing just past the given article
+
+    Args:
+        article: Last Article object of the current page
+
+    Returns:
+        str: URL-safe cursor string
+    """
+    return encode_cursor(article.published_at, article.id)
+
+
+def decode_feed_cursor(cursor):
+    """
+    Decode a cursor produced by encode_feed_cursor
+
+    Args:
+        cursor: Cursor string from the client
+
+    Returns:
+        tuple: (published_at, article_id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    return decode_cursor(cursor)
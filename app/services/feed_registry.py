@@ -0,0 +1,201 @@
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from app.models import db, Feed
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Longest error message kept on a feed
+MAX_ERROR_LENGTH = 1000
+
+# Default feeds, registered in the feeds table on first start (see seed_feeds)
+RSS_FEEDS = [
+    {
+        'url': 'https://www.positive.news/feed/',
+        'source_name': 'Positive News'
+    },
+    {
+        'url': 'https://reasonstobecheerful.world/feed/',
+        'source_name': 'Reasons to be Cheerful'
+    },
+    {
+        'url': 'https://news.janegoodall.org/feed/',
+        'source_name': 'Jane Goodall News'
+    }
+]
+
+
+def seed_feeds(feeds: List[Dict]) -> int:
+    """
+    Register feeds that are not in the feeds table yet
+
+    Args:
+        feeds: Feed configs ({'url', 'source_name'}), e.g. RSS_FEEDS
+
+    Returns:
+        int: Number of feeds added
+    """
+    known = {url for (url,) in db.session.query(Feed.url)}
+    added = 0
+    for feed_config in feeds:
+        if feed_config['url'] not in known:
+            db.session.add(Feed(
+                url=feed_config['url'],
+                source_name=feed_config['source_name'],
+                poll_interval=Config.FEED_POLL_INTERVAL
+            ))
+            added += 1
+    if added:
+        db.session.commit()
+        logger.info(f"Registered {added} default feed(s)")
+    return added
+
+
+def get_active_feeds() -> List[Feed]:
+    """All enabled feeds, regardless of schedule"""
+    return Feed.query.filter_by(is_active=True).order_by(Feed.id).all()
+
+
+def claim_due_feeds(limit: Optional[int] = None, now: Optional[datetime] = None) -> List[Feed]:
+    """
+    Claim the enabled feeds whose next poll time has passed
+
+    Each due feed is pushed FEED_CLAIM_TIMEOUT seconds into the future with a
+    conditional UPDATE, so when every worker runs the scheduler only one of
+    them polls a given feed. record_poll() then sets the real next poll time;
+    if the poll never gets recorded (crash, rolled-back ingest) the feed
+    simply becomes due again once the claim expires. Commits the claims.
+
+    Args:
+        limit: Most feeds to claim (defaults to FEED_POLL_BATCH); the most
+            overdue feeds go first
+        now: Current time (for tests)
+
+    Returns:
+        list: Feed objects claimed by this call
+    """
+    now = now or datetime.utcnow()
+    due = db.or_(Feed.next_poll_at.is_(None), Feed.next_poll_at <= now)
+    candidates = db.session.query(Feed.id)\
+        .filter(Feed.is_active == True, due)\
+        .order_by(Feed.next_poll_at.asc().nullsfirst(), Feed.id)\
+        .limit(limit or Config.FEED_POLL_BATCH)\
+        .all()
+
+    lease = now + timedelta(seconds=Config.FEED_CLAIM_TIMEOUT)
+    claimed = []
+    for (feed_id,) in candidates:
+        result = db.session.execute(
+            db.update(Feed).where(Feed.id == feed_id, due).values(next_poll_at=lease)
+        )
+        if result.rowcount == 1:
+            claimed.append(feed_id)
+    db.session.commit()
+
+    if not claimed:
+        return []
+    return Feed.query.filter(Feed.id.in_(claimed)).order_by(Feed.id).all()
+
+
+def backoff_delay(poll_interval: int, failures: int) -> float:
+    """
+    Seconds to wait before retrying a failing feed
+
+    Doubles the feed's interval per consecutive failure, capped at
+    FEED_MAX_BACKOFF, with up to 10% jitter so feeds that failed together
+    (e.g. during an outage) don't all retry on the same tick.
+
+    Args:
+        poll_interval: The feed's normal interval in seconds
+        failures: Consecutive failures including the current one
+
+    Returns:
+        float: Delay in seconds
+    """
+    delay = min(poll_interval * 2 ** min(failures, 16), Config.FEED_MAX_BACKOFF)
+    return max(delay, poll_interval) * random.uniform(1.0, 1.1)
+
+
+def record_poll(feed: Feed, latency: Optional[float] = None, entries: Optional[int] = None,
+                error: Optional[str] = None, now: Optional[datetime] = None,
+                watermark: Optional[Tuple[datetime, str]] = None):
+    """
+    Store the outcome of polling a feed and schedule its next poll
+
+    Runs inside the caller's transaction, so a rolled-back ingest also
+    rolls back the watermark and the entries get parsed again.
+
+    Args:
+        feed: The polled feed
+        latency: Download time in seconds (successful polls)
+        entries: Articles parsed from the feed, or None if it was unchanged
+        error: Error message if the poll failed
+        now: Current time (for tests)
+        watermark: Newest entry ingested (timestamp, entry id), if it moved
+    """
+    now = now or datetime.utcnow()
+    feed.last_polled_at = now
+    if error is None:
+        feed.failure_count = 0
+        feed.last_success_at = now
+        feed.last_error = None
+        if latency is not None:
+            feed.last_latency_ms = int(latency * 1000)
+        if entries is not None:
+            feed.last_entry_count = entries
+        if watermark is not None:
+            feed.watermark_at, feed.watermark_entry_id = watermark  # Whole id: it is matched exactly
+        feed.next_poll_at = now + timedelta(seconds=feed.poll_interval)
+    else:
+        feed.failure_count = (feed.failure_count or 0) + 1
+        feed.last_error = error[:MAX_ERROR_LENGTH]
+        feed.next_poll_at = now + timedelta(seconds=backoff_delay(feed.poll_interval, feed.failure_count))
+        logger.warning(
+            f"Feed {feed.source_name} failed {feed.failure_count} time(s) in a row, "
+            f"next attempt at {feed.next_poll_at:%Y-%m-%d %H:%M}"
+        )
+
+
+def poll_reporter(feeds: List[Feed]) -> Callable:
+    """
+    Callback for fetch_articles_from_rss(report=...) that records each feed's outcome
+
+    Args:
+        feeds: The Feed objects being polled
+
+    Returns:
+        callable: report(feed_config, latency=None, entries=None, error=None, watermark=None)
+    """
+    by_id = {feed.id: feed for feed in feeds}
+
+    def report(feed_config, latency=None, entries=None, error=None, watermark=None):
+        record_poll(by_id[feed_config['id']], latency=latency, entries=entries, error=error,
+                    watermark=watermark)
+
+    return report
+
+
+def feed_health() -> List[Dict]:
+    """
+    Health of every registered feed, from the stats of its recent polls
+
+    Reads only the feeds table; nothing is downloaded.
+
+    Returns:
+        list: One dict per feed with 'feed' and 'status' ('ok', 'failing',
+        'never polled' or 'disabled')
+    """
+    results = []
+    for feed in Feed.query.order_by(Feed.source_name).all():
+        if not feed.is_active:
+            status = 'disabled'
+        elif feed.failure_count:
+            status = 'failing'
+        elif feed.last_polled_at is None:
+            status = 'never polled'
+        else:
+            status = 'ok'
+        results.append({'feed': feed, 'status': status})
+    return results
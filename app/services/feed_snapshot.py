@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+from app.models import db, Article, ReadArticle
+from app.config import Config
+from app.services.feed_cursor import decode_feed_cursor, encode_feed_cursor
+from app.services.version_service import FEED_VERSION, get_version, bump_version
+
+logger = logging.getLogger(__name__)
+
+
+class FeedCard:
+    """Card fields of an approved article, held in the in-memory feed snapshot"""
+    __slots__ = ('id', 'title', 'description', 'content', 'image_url',
+                 'published_at', 'source_name', 'source_url', 'story_id')
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    # Same JSON shape as a real Article card
+    to_card_dict = Article.to_card_dict
+
+
+# Per-worker snapshot state; rebuilt when the shared feed version changes
+_snapshot = {
+    'version': None,
+    'cards': [],
+    'truncated': False,  # True if more approved articles exist beyond the snapshot
+    'checked_at': 0.0,
+}
+_snapshot_lock = threading.Lock()
+
+
+def invalidate_feed():
+    """
+    Mark the approved feed as changed
+
+    Call inside the transaction that changes the set of approved, active
+    articles (or their card fields). Every worker rebuilds its snapshot once
+    the transaction commits.
+    """
+    bump_version(FEED_VERSION)
+    # Re-check the version on this worker's next feed request
+    _snapshot['checked_at'] = 0.0
+
+
+def get_feed_snapshot() -> Tuple[List[FeedCard], bool]:
+    """
+    Get this worker's snapshot of the newest approved, active articles
+
+    The shared version stamp is checked at most every
+    FEED_SNAPSHOT_CHECK_INTERVAL seconds; the snapshot is rebuilt only
+    when it has changed.
+
+    Returns:
+        tuple: (cards ordered by (published_at, id) desc, truncated flag)
+    """
+    now = time.monotonic()
+    if now - _snapshot['checked_at'] >= Config.FEED_SNAPSHOT_CHECK_INTERVAL:
+        with _snapshot_lock:
+            if now - _snapshot['checked_at'] >= Config.FEED_SNAPSHOT_CHECK_INTERVAL:
+                # Read the version before the rows so a concurrent change can only make us rebuild again
+                version = get_version(FEED_VERSION)
+                if version != _snapshot['version']:
+                    _rebuild_snapshot(version)
+                _snapshot['checked_at'] = now
+
+    return _snapshot['cards'], _snapshot['truncated']
+
+
+def _rebuild_snapshot(version):
+    """Load the newest approved, active articles into the snapshot"""
+    columns = [getattr(Article, name) for name in FeedCard.__slots__]
+    rows = db.session.query(*columns)\
+        .filter(Article.is_active == True, Article.status == 'approved', Article.published_at.isnot(None))\
+        .order_by(Article.published_at.desc(), Article.id.desc())\
+        .limit(Config.FEED_SNAPSHOT_SIZE + 1)\
+        .all()
+
+    cards = [FeedCard(**row._asdict()) for row in rows[:Config.FEED_SNAPSHOT_SIZE]]
+    if Config.STORY_COLLAPSE:
+        # Keep the newest card of each story (same rule as story_service.collapse_stories)
+        seen_stories = set()
+        collapsed = []
+        for card in cards:
+            if card.story_id is not None:
+                if card.story_id in seen_stories:
+                    continue
+                seen_stories.add(card.story_id)
+            collapsed.append(card)
+        cards = collapsed
+    _snapshot.update({
+        'version': version,
+        'cards': cards,
+        'truncated': len(rows) > Config.FEED_SNAPSHOT_SIZE,
+    })
+    logger.info(f"Rebuilt feed snapshot (version {version}, {len(cards)} articles)")
+
+
+def get_snapshot_page(user_id, show_read='true', cursor=None, per_page=5) -> Optional[Tuple[List[FeedCard], Optional[str]]]:
+    """
+    Serve a feed page from the in-memory snapshot
+
+    Only the per-user read-state overlay touches the database, and only for
+    the IDs of snapshot cards at or after the cursor.
+
+    Args:
+        user_id: Current user's ID
+        show_read: 'false' for unread only, 'only' for read only, 'true' for all
+        cursor: Cursor returned with the previous page (None for first page)
+        per_page: Number of articles per page
+
+    Returns:
+        tuple: (cards, next cursor or None), or None if the page reaches past
+        the snapshot and must be served from the database
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    cards, truncated = get_feed_snapshot()
+
+    start = 0
+    if cursor:
+        position = decode_feed_cursor(cursor)
+        start = next((i for i, card in enumerate(cards) if (card.published_at, card.id) < position), None)
+        if start is None:
+            return None if truncated else ([], None)
+
+    candidates = cards[start:]
+    if show_read in ('false', 'only') and candidates:
+        read_ids = {row[0] for row in db.session.query(ReadArticle.article_id).filter(
+            ReadArticle.user_id == user_id,
+            ReadArticle.article_id.in_([card.id for card in candidates])
+        )}
+        want_read = show_read == 'only'
+        candidates = [card for card in candidates if (card.id in read_ids) == want_read]
+
+    page = candidates[:per_page]
+    has_more = len(candidates) > per_page
+    if len(page) < per_page:
+        if truncated:
+            return None
+        return page, None
+
+    return page, encode_feed_cursor(page[-1]) if has_more or truncated else None
@@ -0,0 +1,150 @@
+import logging
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from app.services import feed_cache
+from app.services.rss_feed_service import FeedDownloads, iter_articles, newest
+from app.services.ingest_service import BulkWriter, article_row_from_feed, batches
+from app.services.sentiment_service import load_model, article_text
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineStats:
+    """
+    Item counts and timings for a chain of generator stages
+
+    Each stage is wrapped so the time spent producing its items is
+    measured. Stages pull from the stage before them, so that time includes
+    upstream work; summary() subtracts it to give each stage's own time.
+    """
+
+    def __init__(self):
+        self._stages = []  # [name, items, seconds including upstream]
+
+    def stage(self, name: str, items: Iterable) -> Iterator:
+        """Wrap a stage, counting the items it yields and the time it takes to produce them"""
+        record = [name, 0, 0.0]
+        self._stages.append(record)
+        return self._measure(record, iter(items))
+
+    @staticmethod
+    def _measure(record, iterator):
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                record[2] += time.perf_counter() - start
+                return
+            record[2] += time.perf_counter() - start
+            record[1] += 1
+            yield item
+
+    def summary(self) -> List[Dict]:
+        """
+        Per-stage results, in pipeline order
+
+        Returns:
+            list: {'stage', 'items', 'seconds'} dicts; seconds exclude upstream stages
+        """
+        results = []
+        upstream = 0.0
+        for name, items, seconds in self._stages:
+            results.append({'stage': name, 'items': items, 'seconds': round(max(seconds - upstream, 0.0), 4)})
+            upstream = seconds
+        return results
+
+    def __str__(self):
+        return ', '.join(f"{s['stage']} {s['items']} in {s['seconds']:.2f}s" for s in self.summary())
+
+
+def article_rows(articles: Iterable[Dict], status: str) -> Iterator[Dict]:
+    """Convert RSS article dictionaries to Article rows, skipping malformed items"""
+    for item in articles:
+        try:
+            yield article_row_from_feed(item, status)
+        except Exception as e:
+            logger.error(f"Error processing article: {str(e)}")
+
+
+def score_rows(rows: Iterable[Dict], batch_size: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Classify stage: set positivity_score on each row, scoring a batch at a time
+
+    Rows arrive at the database already scored, so score_articles() has
+    nothing left to do for them.
+    """
+    model = load_model()
+    for batch in batches(rows, batch_size or Config.INGEST_CHUNK_SIZE):
+        scores = model.score_batch([article_text(row['title'], row['description']) for row in batch])
+        for row, score in zip(batch, scores):
+            row['positivity_score'] = round(float(score), 4)
+            yield row
+
+
+def insert_rows(rows: Iterable[Dict], writer: BulkWriter) -> Iterator[Dict]:
+    """Insert stage: write rows a chunk at a time, yielding each row once written"""
+    for chunk in batches(rows, writer.chunk_size):
+        writer.write_chunk(chunk)
+        yield from chunk
+
+
+def ingest_feeds(feeds: List[Dict], status: str, limit: Optional[int] = None, update_existing: bool = False,
+                 report: Optional[Callable] = None, concurrent: bool = True,
+                 only_changed: bool = True) -> Optional[Dict]:
+    """
+    Stream articles from RSS feeds into the database
+
+    fetch -> parse -> top-K (with a limit) -> classify -> insert,
+    each stage a generator pulling from the one before. Only a few raw feed
+    documents, the top-K heap and one batch of rows are held at a time, so
+    memory stays flat however many feeds there are or however large they
+    get. Feeds with a watermark are parsed only down to the newest entry
+    already ingested (see iter_feed_entries). Rows that fail to insert are skipped and reported (see BulkWriter).
+    Runs inside the caller's transaction; on failure the caller should roll
+    back and call feed_cache.forget_feed_states().
+
+    Args:
+        feeds: Feed configs ({'id', 'url', 'source_name', 'watermark'})
+        status: Review status for new rows ('approved' or 'pending')
+        limit: Keep only the newest `limit` articles across all feeds
+        update_existing: Refresh known articles (see upsert_articles)
+        report: Per-feed outcome callback (see fetch_articles_from_rss)
+        concurrent: Download feeds in parallel
+        only_changed: Skip feeds that haven't changed since the last download
+            (ignored with a limit)
+
+    Returns:
+        dict: BulkWriter.report() plus 'feeds_failed', 'feeds_unchanged' and
+        'stages', or None if every feed failed
+    """
+    stats = PipelineStats()
+    writer = BulkWriter(update_existing=update_existing)
+    if limit is not None:
+        # A top-K cut drops parsed entries, so a limited run reads every feed,
+        # and afterwards (below) leaves them to be read in full again
+        only_changed = False
+
+    downloads = FeedDownloads(feeds, concurrent, only_changed, report)
+    items = stats.stage('fetch', downloads)
+    # A top-K cut drops parsed articles, so only unlimited runs may move the watermarks
+    items = stats.stage('parse', iter_articles(items, report, advance_watermarks=limit is None))
+    if limit is not None:
+        items = stats.stage('top-k', newest(items, limit))
+    items = stats.stage('classify', score_rows(article_rows(items, status)))
+    for _ in stats.stage('insert', insert_rows(items, writer)):
+        pass
+
+    logger.info(f"Ingest pipeline: {stats}; {writer}")
+    if limit is not None:
+        feed_cache.forget_feed_states(feed['url'] for feed in feeds)
+    if downloads.all_failed:
+        return None
+
+    return {
+        **writer.report(),
+        'feeds_failed': downloads.failed,
+        'feeds_unchanged': downloads.unchanged,
+        'stages': stats.summary(),
+    }
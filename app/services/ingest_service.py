@@ -0,0 +1,300 @@
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from app.models import db, Article, ARCHIVE_TABLES
+from app.services.article_stats import count_inserted
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that identify a campaign or click rather than the article
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'cmpid'}
+
+# Feed-owned fields refreshed when a known entry is ingested again
+REFRESHED_FIELDS = ('title', 'description', 'content', 'image_url', 'published_at', 'source_name')
+
+# Row errors kept in a BulkWriter report
+MAX_REPORTED_ERRORS = 20
+
+
+def normalize_url(url: str) -> str:
+    """
+    Reduce an article URL to a canonical form for duplicate detection
+
+    Lower-cases the scheme and host, drops "www.", default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the query string.
+
+    Args:
+        url: Article URL as found in a feed or entered by an admin
+
+    Returns:
+        str: Normalised URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or 'http').lower()
+    if scheme == 'https':
+        scheme = 'http'  # Same article is often linked both ways
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f'{host}:{parts.port}'
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or '/'
+
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def url_hash(url: Optional[str]) -> Optional[str]:
+    """
+    Hash of the normalised URL, stored in Article.url_hash
+
+    Args:
+        url: Article URL
+
+    Returns:
+        str: 64-character hex digest, or None for an empty URL
+    """
+    if not url or not url.strip():
+        return None
+    return hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+
+
+def article_row_from_feed(item: Dict, status: str) -> Dict:
+    """
+    Convert an article dictionary from the RSS service into Article column values
+
+    Args:
+        item: Article dictionary from fetch_articles_from_rss
+        status: Review status for new rows ('approved' or 'pending')
+
+    Returns:
+        dict: Column values for an Article insert
+    """
+    return {
+        'title': item.get('title', 'No title'),
+        'description': item.get('description'),
+        'content': item.get('content'),
+        'image_url': item.get('urlToImage'),
+        'published_at': datetime.strptime(item['publishedAt'], '%Y-%m-%dT%H:%M:%SZ') if item.get('publishedAt') else None,
+        'source_name': item['source']['name'] if isinstance(item.get('source'), dict) else 'Unknown',
+        'source_url': item.get('url', ''),
+        'url_hash': url_hash(item.get('url')),
+        'source_type': 'auto',
+        'status': status,
+        'is_active': True,
+    }
+
+
+def upsert_articles(rows: List[Dict], update_existing: bool = False) -> Dict[str, int]:
+    """
+    Insert articles with one executemany statement, keyed on url_hash
+
+    Uses INSERT ... ON CONFLICT (url_hash) on SQLite and PostgreSQL, so
+    running an ingest twice never duplicates articles. With update_existing,
+    known articles get their feed fields refreshed, but only while no admin
+    has reviewed or edited (edited_at) them and only if something actually
+    changed; status and is_active are never touched, so deleted or rejected
+    articles stay that way, and archived articles are skipped. Runs inside the
+    caller's transaction.
+
+    Args:
+        rows: Article column values (see article_row_from_feed); rows without
+            a url_hash are inserted unconditionally
+        update_existing: Refresh known articles instead of skipping them
+
+    Returns:
+        dict: {'inserted': int, 'updated': int, 'skipped': int}
+    """
+    counts = {'inserted': 0, 'updated': 0, 'skipped': 0}
+
+    # A statement may not touch the same conflict key twice; keep the first occurrence
+    unique_rows = []
+    seen = set()
+    for row in rows:
+        key = row.get('url_hash')
+        if key is not None and key in seen:
+            counts['skipped'] += 1
+            continue
+        seen.add(key)
+        unique_rows.append(row)
+    if not unique_rows:
+        return counts
+
+    hashes = [row['url_hash'] for row in unique_rows if row.get('url_hash')]
+    existing = {row[0] for row in db.session.query(Article.url_hash).filter(Article.url_hash.in_(hashes))} \
+        if hashes else set()
+
+    # Articles moved to the archive (see services/retention_service.py) are not ingested again
+    archive = ARCHIVE_TABLES['articles']
+    archived = {row[0] for row in db.session.execute(
+        db.select(archive.c.url_hash).where(archive.c.url_hash.in_(hashes))
+    )} if hashes else set()
+    if archived:
+        counts['skipped'] += sum(1 for row in unique_rows if row.get('url_hash') in archived)
+        unique_rows = [row for row in unique_rows if row.get('url_hash') not in archived]
+        if not unique_rows:
+            return counts
+
+    # Plain table statements: the ORM bulk path adds per-row bookkeeping we don't need here
+    table = Article.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in ('sqlite', 'postgresql'):
+        # Portable fallback: insert only the rows we haven't seen before
+        new_rows = [row for row in unique_rows if row.get('url_hash') not in existing]
+        if new_rows:
+            db.session.execute(table.insert(), new_rows)
+            count_inserted(new_rows)
+        counts['inserted'] += len(new_rows)
+        counts['skipped'] += len(unique_rows) - len(new_rows)
+        return counts
+
+    # executemany needs the same keys in every row; SQLAlchemy then sends the
+    # rows as multi-row INSERT pages sized to the driver's parameter limit
+    columns = sorted({name for row in unique_rows for name in row})
+    values = [{name: row.get(name) for name in columns} for row in unique_rows]
+
+    insert = (postgresql.insert if dialect == 'postgresql' else sqlite.insert)(table)
+    if update_existing:
+        changed = db.or_(*[table.c[name].is_distinct_from(insert.excluded[name]) for name in REFRESHED_FIELDS])
+        statement = insert.on_conflict_do_update(
+            index_elements=[table.c.url_hash],
+            # Refreshed text needs a new score: the row's own, or NULL for the next scoring pass
+            set_={**{name: insert.excluded[name] for name in REFRESHED_FIELDS},
+                  'positivity_score': insert.excluded.positivity_score},
+            where=db.and_(table.c.source_type == 'auto', table.c.reviewed_by_id.is_(None),
+                          table.c.edited_at.is_(None), changed)
+        )
+    else:
+        statement = insert.on_conflict_do_nothing(index_elements=[table.c.url_hash])
+
+    # RETURNING yields only rows that were inserted or actually updated
+    affected = [row[0] for row in db.session.execute(statement.returning(table.c.url_hash), values)]
+    for key in affected:
+        if key is not None and key in existing:
+            counts['updated'] += 1
+        else:
+            counts['inserted'] += 1
+    counts['skipped'] += len(unique_rows) - len(affected)
+
+    # URL-less rows never conflict, so they were all inserted
+    inserted = {key for key in affected if key is not None and key not in existing}
+    count_inserted(row for row in unique_rows if row.get('url_hash') is None or row['url_hash'] in inserted)
+
+    return counts
+
+
+def batches(items: Iterable, size: int) -> Iterable[List]:
+    """Group an iterable into lists of at most `size` items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class BulkWriter:
+    """
+    Write article rows in chunks, isolating bad rows
+
+    Each chunk goes through upsert_articles() (one executemany INSERT)
+    inside a savepoint. If the chunk fails it is bisected into smaller
+    savepoints until the offending rows are found, so a single bad row (an
+    over-long title, a NULL where none is allowed) is counted and reported
+    instead of aborting the whole import. With commit, every chunk is committed as it
+    is written, so large imports hold neither a huge transaction nor all
+    rows in memory.
+    """
+
+    def __init__(self, update_existing: bool = False, chunk_size: Optional[int] = None, commit: bool = False):
+        self.update_existing = update_existing
+        self.chunk_size = chunk_size or Config.INGEST_CHUNK_SIZE
+        self.commit = commit
+        self.counts = {'inserted': 0, 'updated': 0, 'skipped': 0, 'failed': 0}
+        self.rows = 0
+        self.chunks = 0
+        self.seconds = 0.0
+        self.errors = []
+
+    def write(self, rows: Iterable[Dict]) -> 'BulkWriter':
+        """Write all rows, chunk by chunk"""
+        for chunk in batches(rows, self.chunk_size):
+            self.write_chunk(chunk)
+        return self
+
+    def write_chunk(self, rows: List[Dict]):
+        """Write one chunk of rows"""
+        start = time.perf_counter()
+        if not self._write_isolated(rows):
+            logger.warning(f"Chunk {self.chunks + 1} had rows the database rejected")
+        if self.commit:
+            db.session.commit()
+        self.rows += len(rows)
+        self.chunks += 1
+        self.seconds += time.perf_counter() - start
+
+    def _write_isolated(self, rows: List[Dict]) -> bool:
+        """
+        Write rows in a savepoint; on failure split them in half and retry each half
+
+        Bisecting finds a bad row in about log2(len(rows)) extra statements
+        instead of retrying the whole chunk row by row.
+
+        Returns:
+            bool: True if every row was written
+        """
+        try:
+            with db.session.begin_nested():
+                self._add(upsert_articles(rows, update_existing=self.update_existing))
+            return True
+        except SQLAlchemyError as e:
+            if len(rows) == 1:
+                self.counts['failed'] += 1
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    error = getattr(e, 'orig', None) or e
+                    self.errors.append(f"{rows[0].get('source_url') or rows[0].get('title')}: {error}")
+                return False
+        middle = len(rows) // 2
+        first = self._write_isolated(rows[:middle])
+        return self._write_isolated(rows[middle:]) and first
+
+    def _add(self, counts):
+        for key, value in counts.items():
+            self.counts[key] += value
+
+    def report(self) -> Dict:
+        """
+        Outcome and throughput of everything written so far
+
+        Returns:
+            dict: inserted, updated, skipped and failed counts, plus rows,
+            chunks, seconds, rows_per_second and (up to MAX_REPORTED_ERRORS) errors
+        """
+        return {
+            **self.counts,
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': round(self.rows / self.seconds) if self.seconds else 0,
+            'errors': list(self.errors),
+        }
+
+    def __str__(self):
+        return (
+            f"{self.rows} rows in {self.chunks} chunk(s), {self.seconds:.2f}s "
+            f"({self.rows / self.seconds if self.seconds else 0:,.0f} rows/s): "
+            f"{self.counts['inserted']} inserted, {self.counts['updated']} updated, "
+            f"{self.counts['skipped']} skipped, {self.counts['failed']} failed"
+        )
@@ -0,0 +1,199 @@
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from app.models import db, BackgroundJob
+from app.config import Config
+from app.services.scheduler_lease import holder_id
+
+logger = logging.getLogger(__name__)
+
+# Job kind -> handler(job: JobContext, params: dict) -> result dict
+JOB_HANDLERS: Dict[str, Callable] = {}
+
+# Longest error message kept on a job
+MAX_ERROR_LENGTH = 1000
+
+
+def job_handler(kind: str):
+    """Register a function as the handler for a job kind"""
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind: str, params: Optional[Dict] = None, payload: Optional[str] = None,
+            user_id: Optional[int] = None) -> int:
+    """
+    Persist a job for the worker pool; commits
+
+    Args:
+        kind: Registered job kind (see job_handler)
+        params: JSON-serialisable arguments for the handler
+        payload: Bulk input too large for params (e.g. an uploaded CSV)
+        user_id: Admin who queued the job
+
+    Returns:
+        int: Job ID, for the status endpoint
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+
+    job = BackgroundJob(
+        kind=kind,
+        status='queued',
+        params=json.dumps(params or {}),
+        payload=payload,
+        created_by_id=user_id
+    )
+    db.session.add(job)
+    db.session.commit()
+    runner.wake()
+    logger.info(f"Queued {kind} job {job.id}")
+    return job.id
+
+
+class JobContext:
+    """What a handler gets besides its params: the payload and a progress reporter"""
+
+    def __init__(self, job: BackgroundJob):
+        self.job = job
+
+    @property
+    def payload(self) -> Optional[str]:
+        return self.job.payload
+
+    def progress(self, done: int, total: Optional[int] = None):
+        """
+        Record progress for the status endpoint
+
+        Commits the session, so call it between units of work. Also serves
+        as the job's heartbeat (see expire_jobs).
+        """
+        self.job.progress = done
+        if total is not None:
+            self.job.total = total
+        self.job.heartbeat_at = datetime.utcnow()
+        db.session.commit()
+
+
+def claim_next_job() -> Optional[BackgroundJob]:
+    """
+    Take the oldest queued job; commits
+
+    A conditional UPDATE moves it from queued to running, so however many
+    workers and processes poll the table each job is claimed once.
+
+    Returns:
+        BackgroundJob: The claimed job, or None if the queue is empty
+    """
+    candidates = db.session.query(BackgroundJob.id)\
+        .filter(BackgroundJob.status == 'queued')\
+        .order_by(BackgroundJob.id)\
+        .limit(5)\
+        .all()
+
+    now = datetime.utcnow()
+    for (job_id,) in candidates:
+        result = db.session.execute(
+            db.update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, BackgroundJob.status == 'queued')
+            .values(status='running', worker=holder_id(), started_at=now, heartbeat_at=now)
+        )
+        if result.rowcount == 1:
+            db.session.commit()
+            return db.session.get(BackgroundJob, job_id)
+    db.session.rollback()
+    return None
+
+
+def run_job(job: BackgroundJob):
+    """Run a claimed job's handler and store its result or error; commits"""
+    job_id = job.id
+    try:
+        result = JOB_HANDLERS[job.kind](JobContext(job), json.loads(job.params or '{}'))
+        job.status = 'succeeded'
+        job.result = json.dumps(result or {})
+    except Exception as e:
+        logger.error(f"Job {job_id} ({job.kind}) failed: {str(e)}")
+        db.session.rollback()
+        job = db.session.get(BackgroundJob, job_id)
+        job.status = 'failed'
+        job.error = str(e)[:MAX_ERROR_LENGTH] or type(e).__name__
+    job.finished_at = datetime.utcnow()
+    job.payload = None
+    db.session.commit()
+    logger.info(f"Job {job_id} ({job.kind}) {job.status}")
+
+
+def expire_jobs(now: Optional[datetime] = None):
+    """
+    Fail jobs whose worker stopped reporting, and drop old finished jobs; commits
+
+    A scheduled job (every JOB_EXPIRE_INTERVAL seconds, scheduler leader
+    only), so the job threads' polls stay read-only until they find work.
+    Jobs are not retried automatically: handlers such as CSV imports are
+    not idempotent, so an admin should look at what got done first.
+    """
+    now = now or datetime.utcnow()
+    stale = now - timedelta(seconds=Config.JOB_STALE_AFTER)
+    db.session.execute(
+        db.update(BackgroundJob)
+        .where(BackgroundJob.status == 'running', BackgroundJob.heartbeat_at < stale)
+        .values(status='failed', error='Worker stopped before the job finished', finished_at=now, payload=None)
+    )
+    cutoff = now - timedelta(days=Config.JOB_RETENTION_DAYS)
+    BackgroundJob.query\
+        .filter(BackgroundJob.status.in_(['succeeded', 'failed']), BackgroundJob.finished_at < cutoff)\
+        .delete(synchronize_session=False)
+    db.session.commit()
+
+
+class JobRunner:
+    """
+    Pool of threads running queued jobs in this process
+
+    Each thread claims and runs one job at a time. Jobs queued in this
+    process wake the pool straight away; otherwise it polls the table every
+    JOB_POLL_INTERVAL seconds, so jobs queued by other workers are picked
+    up too.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._threads = []
+        self._wake = threading.Event()
+
+    def start(self, app, workers: int):
+        """Start `workers` job threads (once per process)"""
+        if self._threads or workers <= 0:
+            return
+        self.app = app
+        for number in range(workers):
+            thread = threading.Thread(target=self._work, name=f'job-worker-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def wake(self):
+        """Tell idle threads a job was queued"""
+        self._wake.set()
+
+    def _work(self):
+        while True:
+            with self.app.app_context():
+                try:
+                    job = claim_next_job()
+                    if job is not None:
+                        run_job(job)
+                        continue
+                except Exception as e:
+                    logger.error(f"Job worker error: {str(e)}")
+                    db.session.rollback()
+            self._wake.wait(Config.JOB_POLL_INTERVAL)
+            self._wake.clear()
+
+
+# Per-process pool, started by create_app
+runner = JobRunner()
@@ -0,0 +1,301 @@
+import logging
+import re
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Negative keywords that should exclude an article
+NEGATIVE_KEYWORDS = [
+    '死', 'death', 'die', 'died', 'kill', 'murder', 'shoot', 'attack',
+    'war', 'conflict', 'terror', 'bomb', 'explode', 'crash', 'accident',
+    'fire', 'disaster', 'threat', 'warning', 'crisis', 'scandal', 'abuse',
+    'violence', 'injure', 'wound', 'arrest', 'guilty', 'sentence', 'jail',
+    'prison', 'convicted', 'fraud', 'scam', 'stolen', 'theft', 'robbery',
+    'missing', 'lost', 'disappear', 'tragic', 'devastat', 'destroy',
+    'lawsuit', 'sue', 'bankrupt', 'collapse', 'fail', 'defeat', 'loss',
+    'cancer', 'disease outbreak', 'pandemic', 'epidemic', 'victim'
+]
+
+# Positive keywords that increase confidence
+POSITIVE_KEYWORDS = [
+    'rescue', 'save', 'hero', 'miracle', 'heartwarming', 'inspire',
+    'help', 'donate', 'charity', 'volunteer', 'recover', 'cure',
+    'breakthrough', 'discover', 'success', 'achieve', 'win', 'celebrate',
+    'award', 'honor', 'graduate', 'adopted', 'reunite', 'wedding',
+    'birth', 'newborn', 'joy', 'happy', 'smile', 'kind', 'generous',
+    'hope', 'peace', 'unity', 'together', 'community', 'friend',
+    'love', 'compassion', 'beauty', 'amazing', 'wonderful', 'fantastic'
+]
+
+# Word starts that look like a keyword but aren't one ("warm" is not "war",
+# "wine" is not "win"); a word starting with one of these never matches the
+# shorter keyword inside it
+KEYWORD_EXCLUSIONS = [
+    'warble', 'ward', 'ware', 'warm', 'warp', 'warrant', 'warren', 'wart', 'wary',
+    'wince', 'winch', 'wind', 'wine', 'wing', 'wink', 'winnow', 'winter',
+    'diem', 'diesel', 'diet', 'suede', 'suet', 'scamp', 'bombast', 'heron',
+    'kindergarten', 'kindl', 'kindred',
+]
+
+_VOWELS = set('aeiou')
+
+# Between the words of a phrase keyword, once tokenize()'s table has
+# blanked the punctuation
+_WORD_SEPARATOR = ' +'
+
+
+def _build_token_table() -> bytes:
+    """bytes.translate table: lower-case ASCII letters, keep digits and non-ASCII, blank the rest"""
+    table = bytearray(range(256))
+    for byte in range(256):
+        if 65 <= byte <= 90:
+            table[byte] = byte + 32
+        elif not (97 <= byte <= 122 or 48 <= byte <= 57 or byte >= 128):
+            table[byte] = 32
+    return bytes(table)
+
+
+# Lower-casing and punctuation stripping in one C-level pass
+_TOKEN_TABLE = _build_token_table()
+
+
+def tokenize(text: str) -> List[bytes]:
+    """Split text into lower-case words (UTF-8 bytes); punctuation and hyphens separate words"""
+    return tokenize_bytes(text.encode('utf-8'))
+
+
+def tokenize_bytes(data: bytes) -> List[bytes]:
+    """tokenize() for text already encoded as UTF-8"""
+    return data.translate(_TOKEN_TABLE).split()
+
+
+def inflections(word: str) -> List[str]:
+    """
+    A keyword and its common inflected forms, as whole words
+
+    Used where a keyword has to become a fixed vocabulary (the sentiment
+    lexicon); the classifier itself matches word starts (see prefixes).
+
+    Args:
+        word: Lower-case keyword (a single word)
+
+    Returns:
+        list: Forms of the word, the keyword itself first
+    """
+    if word.endswith('e'):
+        stem = word[:-1]
+        suffixes = ['e', 'es', 'ed', 'er', 'ers', 'ely', 'eful', 'eness', 'ing', 'ion', 'ions']
+    elif word.endswith('y') and word[-2:-1] not in _VOWELS:
+        stem = word[:-1]
+        suffixes = ['y', 'ies', 'ied', 'ier', 'iest', 'ily', 'iness']
+    else:
+        stem = word
+        suffixes = ['', 's', 'es', 'ed', 'ing', 'er', 'ers', 'est', 'ion', 'ions', 'ly', 'ful', 'ness', 'y', 'ies']
+
+    forms = [word] + [stem + suffix for suffix in suffixes]
+    if word[-1] not in _VOWELS and word[-2:-1] in _VOWELS and not word.endswith(('w', 'x', 'y')):
+        # Doubled final consonant: win -> winning, winner
+        forms += [word + word[-1] + suffix for suffix in ('ed', 'ing', 'er', 'ers')]
+    return [form for form in forms if not _excluded(form, word)]
+
+
+def prefixes(word: str) -> List[str]:
+    """
+    Word starts that match a keyword
+
+    Like the old substring scan, a keyword matches every word it begins
+    ("terror" matches "terrorism", "devastat" matches "devastating"), but
+    only at the start of a word, so "war" no longer fires inside "award" or
+    "sword". Keywords ending in e, a consonant + y or a consonant + er also
+    match the forms that change that ending ("inspiring", "dying",
+    "happiness", "disastrous").
+
+    Args:
+        word: Lower-case keyword (a single word)
+
+    Returns:
+        list: Word starts, the keyword itself first
+    """
+    starts = [word]
+    if word.endswith('ie'):
+        starts.append(word[:-2] + 'ying')
+    elif word.endswith('e'):
+        starts.append(word[:-1] + 'ing')
+        if word.endswith('ate'):
+            starts.append(word[:-1] + 'ion')
+    elif word.endswith('y') and word[-2:-1] not in _VOWELS:
+        starts.append(word[:-1] + 'i')
+    elif word.endswith('er') and word[-3:-2] not in _VOWELS:
+        starts.append(word[:-2] + 'r')
+    return starts
+
+
+def _excluded(form: str, keyword: str) -> bool:
+    """Whether a word starting with `keyword` is one of the KEYWORD_EXCLUSIONS"""
+    return any(form.startswith(exclusion) and len(exclusion) > len(keyword) for exclusion in KEYWORD_EXCLUSIONS)
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex alternation of words, as a trie
+
+    Shared prefixes are written once ("wa(?:r|...)") so the regex engine
+    steps through each candidate character once instead of trying every
+    word in turn; optional groups are greedy, so the longest word wins. A
+    space matches any run of spaces.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node) -> str:
+        branches = [(_WORD_SEPARATOR if char == ' ' else re.escape(char)) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+class _WordStarts(dict):
+    """Word start (bytes) -> (is_positive, keyword), or None for an exclusion"""
+
+    def __missing__(self, start: bytes):
+        # A phrase that matched with several spaces between its words
+        return self[b' '.join(start.split())]
+
+
+class KeywordClassifier:
+    """
+    Positive/negative keyword matcher built once from the keyword lists
+
+    The word starts of every keyword (and the exclusions) are compiled into
+    one regex, a trie-shaped alternation anchored at word starts. A batch
+    goes through tokenize()'s translate table and that regex entirely in C;
+    Python only sees the hits, and a word matches the keyword of its
+    longest start. Each hit says which keyword (and which list) it came from.
+    """
+
+    def __init__(self, positive_keywords: Iterable[str], negative_keywords: Iterable[str],
+                 exclusions: Iterable[str] = KEYWORD_EXCLUSIONS):
+        starts = {}  # word start -> (is_positive, keyword), or None for an exclusion
+        self._substrings = []  # Keywords in scripts written without spaces
+        for is_positive, keywords in ((False, negative_keywords), (True, positive_keywords)):
+            for keyword in keywords:
+                if not keyword.isascii():
+                    self._substrings.append((keyword.encode('utf-8'), (is_positive, keyword)))
+                    continue
+                *head, last = keyword.lower().split()
+                for start in prefixes(last):
+                    # Earlier keywords win ("died" reports as "die")
+                    starts.setdefault(' '.join(head + [start]), (is_positive, keyword))
+        for exclusion in exclusions:
+            starts.setdefault(exclusion, None)
+        # Translated text is only lower-case letters, digits, non-ASCII and
+        # spaces, so words start after a space; texts get a leading one. A
+        # literal first character lets the regex engine skip ahead to it
+        self._pattern = re.compile((' (' + _trie_pattern(starts) + ')').encode())
+        self._starts = _WordStarts((start.encode(), found) for start, found in starts.items())
+
+    def _scan(self, texts: List[str]) -> List[Tuple[List[str], List[str]]]:
+        """(positive keywords, negative keywords) for each text"""
+        translated = [(' ' + text).encode('utf-8').translate(_TOKEN_TABLE) for text in texts]
+        results = []
+        starts = self._starts
+        for hits in map(self._pattern.findall, translated):
+            positive = []
+            negative = []
+            results.append((positive, negative))
+            for hit in hits:
+                found = starts[hit]
+                if found is None:
+                    continue  # An exclusion: "warm" is not "war"
+                is_positive, keyword = found
+                terms = positive if is_positive else negative
+                if keyword not in terms:
+                    terms.append(keyword)
+
+        # Rare: texts with a keyword from an unspaced script are scanned again on
+        # their own, so those keywords take their place in order of appearance
+        joined = b'\n'.join(translated)
+        for needle, _ in self._substrings:
+            if needle not in joined:
+                continue
+            for index, text in enumerate(translated):
+                if needle in text:
+                    results[index] = self._ordered_terms(text)
+        return results
+
+    def _ordered_terms(self, text: bytes) -> Tuple[List[str], List[str]]:
+        """_scan() for one translated text, including the unspaced-script keywords"""
+        hits = [(match.start(), self._starts[match.group(1)]) for match in self._pattern.finditer(text)]
+        hits += [(text.find(needle), hit) for needle, hit in self._substrings if needle in text]
+        hits.sort(key=lambda item: item[0])
+        positive = []
+        negative = []
+        for _, hit in hits:
+            if hit is None:
+                continue
+            is_positive, keyword = hit
+            terms = positive if is_positive else negative
+            if keyword not in terms:
+                terms.append(keyword)
+        return positive, negative
+
+    def match(self, text: str) -> Tuple[List[str], List[str]]:
+        """
+        Find the keywords present in a text
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            tuple: (positive keywords matched, negative keywords matched), each
+            without duplicates and in order of first appearance
+        """
+        return self._scan([text])[0]
+
+    def classify(self, title: str, description: str = None) -> Dict:
+        """
+        Classify one article
+
+        An article is positive if it has at least one positive keyword and no
+        negative ones.
+
+        Args:
+            title: Article title
+            description: Article description
+
+        Returns:
+            dict: {'positive': bool, 'positive_terms': list, 'negative_terms': list}
+        """
+        return self.classify_batch([(title, description)])[0]
+
+    def classify_batch(self, articles: Iterable[Tuple[str, str]]) -> List[Dict]:
+        """
+        Classify a batch of articles in one pass
+
+        Args:
+            articles: (title, description) pairs
+
+        Returns:
+            list: One classify() result per article, in order
+        """
+        texts = [(title or '') + ' ' + (description or '') for title, description in articles]
+        return [
+            {
+                'positive': bool(positive_terms) and not negative_terms,
+                'positive_terms': positive_terms,
+                'negative_terms': negative_terms,
+            }
+            for positive_terms, negative_terms in self._scan(texts)
+        ]
+
+
+# Shared instance; the regex is compiled once at import time
+default_classifier = KeywordClassifier(POSITIVE_KEYWORDS, NEGATIVE_KEYWORDS)
@@ -2,6 +2,7 @@ import requests
 import logging
 from datetime import datetime
 from app.config import Config
+from app.services.keyword_classifier import default_classifier
 
 logger = logging.getLogger(__name__)
 
@@ -52,14 +53,19 @@ def fetch_good_news(page_size=50):
 
         articles = data.get('articles', [])
 
+        # Classify the whole batch in one pass per article
+        verdicts = default_classifier.classify_batch(
+            (article.get('title', ''), article.get('description', '')) for article in articles
+        )
+
         # Parse and filter articles
         parsed_articles = []
-        for article in articles:
+        for article, verdict in zip(articles, verdicts):
             title = article.get('title', '')
             description = article.get('description', '')
 
-            # Skip articles with negative keywords in title or description
-            if not is_positive_article(title, description):
+            # Skip articles with negative keywords (or no positive ones) in title or description
+            if not verdict['positive']:
                 continue
 
             parsed_article = {
@@ -108,40 +114,7 @@ def is_positive_article(title, description):
     Returns:
         bool: True if article seems positive, False otherwise
     """
-    # Negative keywords that should exclude an article
-    negative_keywords = [
-        '死', 'death', 'die', 'died', 'kill', 'murder', 'shoot', 'attack',
-        'war', 'conflict', 'terror', 'bomb', 'explode', 'crash', 'accident',
-        'fire', 'disaster', 'threat', 'warning', 'crisis', 'scandal', 'abuse',
-        'violence', 'injure', 'wound', 'arrest', 'guilty', 'sentence', 'jail',
-        'prison', 'convicted', 'fraud', 'scam', 'stolen', 'theft', 'robbery',
-        'missing', 'lost', 'disappear', 'tragic', 'devastat', 'destroy',
-        'lawsuit', 'sue', 'bankrupt', 'collapse', 'fail', 'defeat', 'loss',
-        'cancer', 'disease outbreak', 'pandemic', 'epidemic', 'victim'
-    ]
-
-    # Positive keywords that increase confidence
-    positive_keywords = [
-        'rescue', 'save', 'hero', 'miracle', 'heartwarming', 'inspire',
-        'help', 'donate', 'charity', 'volunteer', 'recover', 'cure',
-        'breakthrough', 'discover', 'success', 'achieve', 'win', 'celebrate',
-        'award', 'honor', 'graduate', 'adopted', 'reunite', 'wedding',
-        'birth', 'newborn', 'joy', 'happy', 'smile', 'kind', 'generous',
-        'hope', 'peace', 'unity', 'together', 'community', 'friend',
-        'love', 'compassion', 'beauty', 'amazing', 'wonderful', 'fantastic'
-    ]
-
-    text = f"{title} {description}".lower()
-
-    # Check for negative keywords
-    for keyword in negative_keywords:
-        if keyword.lower() in text:
-            return False
-
-    # Check for positive keywords (at least one should be present)
-    has_positive = any(keyword.lower() in text for keyword in positive_keywords)
-
-    return has_positive
+    return default_classifier.classify(title, description)['positive']
 
 
 def parse_date(date_string):
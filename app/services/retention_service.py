@@ -0,0 +1,156 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from app.models import (
+    db, Article, Like, Comment, ReportedComment, HappinessRating, ReadArticle,
+    StoryFingerprint, StoryBand, ARCHIVE_TABLES
+)
+from app.services.feed_snapshot import invalidate_feed
+from app.services.ingest_service import batches
+from app.services.article_stats import count_removed, update_articles
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Archive policies (Config.ARCHIVE_POLICY)
+ARCHIVE = 'archive'
+DELETE = 'delete'
+
+
+def expire_articles(now: Optional[datetime] = None, batch_size: Optional[int] = None) -> int:
+    """
+    Take articles older than ARTICLE_RETENTION_DAYS out of the feed; commits per batch
+
+    Finds them with one range scan of idx_article_cached, then marks them
+    inactive batch_size IDs per transaction, so no statement locks more
+    than a batch of rows.
+
+    Returns:
+        int: Articles expired
+    """
+    now = now or datetime.utcnow()
+    batch_size = batch_size or Config.RETENTION_BATCH_SIZE
+    cutoff = now - timedelta(days=Config.ARTICLE_RETENTION_DAYS)
+
+    ids = [row[0] for row in db.session.query(Article.id)
+           .filter(Article.cached_at < cutoff, Article.is_active == True)]
+    for batch in batches(ids, batch_size):
+        # By ID alone: with is_active in the WHERE clause SQLite would scan idx_article_feed
+        update_articles([Article.id.in_(batch)], {'is_active': False})
+        invalidate_feed()
+        db.session.commit()
+    return len(ids)
+
+
+def _batch_rows(article_ids: List[int]):
+    """
+    Rows belonging to a batch of articles, per table, children before parents
+
+    Returns:
+        list: (table, WHERE clause) pairs in a safe delete order
+    """
+    comment_ids = db.select(Comment.id).where(Comment.article_id.in_(article_ids))
+    return [
+        (ReportedComment.__table__, ReportedComment.comment_id.in_(comment_ids)),
+        (Comment.__table__, Comment.article_id.in_(article_ids)),
+        (Like.__table__, Like.article_id.in_(article_ids)),
+        (HappinessRating.__table__, HappinessRating.article_id.in_(article_ids)),
+        (ReadArticle.__table__, ReadArticle.article_id.in_(article_ids)),
+        (StoryBand.__table__, StoryBand.article_id.in_(article_ids)),
+        (StoryFingerprint.__table__, StoryFingerprint.article_id.in_(article_ids)),
+        (Article.__table__, Article.id.in_(article_ids)),
+    ]
+
+
+def archive_articles(now: Optional[datetime] = None, batch_size: Optional[int] = None,
+                     policy: Optional[str] = None) -> Dict[str, int]:
+    """
+    Move articles older than ARTICLE_ARCHIVE_DAYS out of the hot tables; commits per batch
+
+    Each batch of articles goes, together with its likes, comments (and
+    their reports), ratings and reads, into the matching *_archive tables
+    with INSERT ... SELECT, and is then deleted; story fingerprints are
+    derived data and are just deleted. With the 'delete' policy nothing is
+    copied. Every batch is its own short transaction, so readers and
+    writers of the hot tables never wait long.
+
+    Args:
+        now: Reference time (defaults to now)
+        batch_size: Articles per transaction (defaults to RETENTION_BATCH_SIZE)
+        policy: 'archive' or 'delete' (defaults to ARCHIVE_POLICY)
+
+    Returns:
+        dict: Rows moved (or deleted) per hot table, plus 'batches'
+    """
+    now = now or datetime.utcnow()
+    batch_size = batch_size or Config.RETENTION_BATCH_SIZE
+    policy = policy or Config.ARCHIVE_POLICY
+    if policy not in (ARCHIVE, DELETE):
+        raise ValueError(f"Unknown archive policy: {policy}")
+    cutoff = now - timedelta(days=Config.ARTICLE_ARCHIVE_DAYS)
+
+    counts = {'batches': 0}
+    while True:
+        ids = [row[0] for row in db.session.query(Article.id)
+               .filter(Article.cached_at < cutoff)
+               .order_by(Article.id)
+               .limit(batch_size)]
+        if not ids:
+            break
+
+        # Parents are copied first so an archived child always has its article
+        # in the archive, then everything is deleted children first
+        rows = _batch_rows(ids)
+        if policy == ARCHIVE:
+            for table, where in reversed(rows):
+                archive = ARCHIVE_TABLES.get(table.name)
+                if archive is None:
+                    continue
+                columns = [column.name for column in table.columns]
+                db.session.execute(archive.insert().from_select(
+                    columns + ['archived_at'],
+                    db.select(*table.columns, db.literal(now, db.DateTime)).where(where)
+                ))
+        count_removed(Article.id.in_(ids))
+        for table, where in rows:
+            deleted = db.session.execute(table.delete().where(where)).rowcount
+            counts[table.name] = counts.get(table.name, 0) + deleted
+        invalidate_feed()  # In case ARTICLE_ARCHIVE_DAYS is shorter than ARTICLE_RETENTION_DAYS
+        db.session.commit()
+        counts['batches'] += 1
+
+    return counts
+
+
+def apply_retention(app=None) -> bool:
+    """
+    Expire and archive old articles (scheduled job)
+
+    Args:
+        app: Flask application instance (for app context)
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    if app:
+        with app.app_context():
+            return _apply_retention_impl()
+    return _apply_retention_impl()
+
+
+def _apply_retention_impl():
+    try:
+        expired = expire_articles()
+        counts = archive_articles()
+        moved = counts.get(Article.__tablename__, 0)
+        logger.info(
+            f"Retention: {expired} article(s) expired, {moved} "
+            f"{'deleted' if Config.ARCHIVE_POLICY == DELETE else 'archived'} in {counts['batches']} batch(es)"
+            + ''.join(f", {count} {name}" for name, count in counts.items()
+                      if name not in ('batches', Article.__tablename__) and count)
+        )
+        return True
+    except Exception as e:
+        logger.error(f"Error applying article retention: {str(e)}")
+        db.session.rollback()
+        return False
@@ -1,70 +1,432 @@
 import feedparser
+import heapq
 import logging
+import time
+import requests
+import urllib3
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
-from typing import List, Dict, Optional
+from xml.sax.saxutils import escape as xml_escape
+from typing import Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple
+from app.config import Config
+from app.services import feed_cache
+from app.services.feed_registry import RSS_FEEDS
 
 logger = logging.getLogger(__name__)
 
-# RSS Feeds to subscribe to
-RSS_FEEDS = [
-    {
-        'url': 'https://www.positive.news/feed/',
-        'source_name': 'Positive News'
-    },
-    {
-        'url': 'https://reasonstobecheerful.world/feed/',
-        'source_name': 'Reasons to be Cheerful'
-    },
-    {
-        'url': 'https://news.janegoodall.org/feed/',
-        'source_name': 'Jane Goodall News'
-    }
-]
-
-
-def fetch_articles_from_rss(max_articles=50) -> Optional[List[Dict]]:
+USER_AGENT = 'GoodNewsAggregator/1.0 (+https://github.com/cardwizard/GoodNewsGenerator)'
+
+
+def download_feed(feed_url: str, state: Optional[Dict] = None) -> Tuple[Optional[bytes], Dict]:
     """
-    Fetch articles from configured RSS feeds
+    Download a feed's raw bytes with connect, read and total deadlines
 
     Args:
-        max_articles: Maximum number of articles to return across all feeds
+        feed_url: URL of the RSS/Atom feed
+        state: Stored feed state; its ETag/Last-Modified make the request conditional
 
     Returns:
-        list: List of article dictionaries or None on error
+        tuple: (raw feed document or None if the server answered 304, response headers)
+
+    Raises:
+        requests.RequestException: On network errors or HTTP error status
+        TimeoutError: If the download exceeds RSS_FETCH_DEADLINE seconds
+    """
+    headers = {'User-Agent': USER_AGENT}
+    if state:
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+
+    deadline = time.monotonic() + Config.RSS_FETCH_DEADLINE
+    with requests.get(
+        feed_url,
+        headers=headers,
+        timeout=(Config.RSS_CONNECT_TIMEOUT, Config.RSS_READ_TIMEOUT),
+        stream=True
+    ) as response:
+        if response.status_code == 304:
+            return None, dict(response.headers)
+        response.raise_for_status()
+        chunks = []
+        # The read timeout only bounds each socket read, so also enforce a total
+        # deadline. read1() returns whatever has arrived, so a server trickling
+        # bytes can't hold one read open past it (iter_content waits for a full chunk)
+        while True:
+            try:
+                chunk = response.raw.read1(16384, decode_content=True)
+            except urllib3.exceptions.HTTPError as e:
+                raise requests.ConnectionError(e) from e
+            if not chunk:
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Download exceeded {Config.RSS_FETCH_DEADLINE}s")
+            chunks.append(chunk)
+        return b''.join(chunks), dict(response.headers)
+
+
+def fetch_feed(feed_url: str) -> Tuple[bytes, Dict, bool]:
     """
-    all_articles = []
+    Get a feed's current document, revalidating against the on-disk copy
 
-    for feed_config in RSS_FEEDS:
-        feed_url = feed_config['url']
-        source_name = feed_config['source_name']
+    Sends If-None-Match/If-Modified-Since from the last download; on a 304
+    the cached raw bytes are reused. A 200 whose body hashes the same as the
+    cached copy also counts as unchanged (many publishers don't send
+    validators, or regenerate them on every request).
 
-        try:
-            logger.info(f"Fetching RSS feed from {source_name}: {feed_url}")
-            feed = feedparser.parse(feed_url)
+    Args:
+        feed_url: URL of the RSS/Atom feed
+
+    Returns:
+        tuple: (raw feed document, headers, changed since the last download)
+    """
+    state = feed_cache.load_feed_state(feed_url)
+    cached_content = feed_cache.load_feed_content(feed_url) if state else None
+    if cached_content is None:
+        state = None  # Metadata without a document: fetch unconditionally
+
+    content, headers = download_feed(feed_url, state)
+    headers = {name.lower(): value for name, value in headers.items()}
+
+    if content is None:
+        logger.info(f"Feed not modified (304): {feed_url}")
+        return cached_content, {'content-type': state.get('content_type') or ''}, False
+
+    digest = feed_cache.save_feed(feed_url, content, headers)
+    return content, headers, state is None or digest != state.get('content_hash')
+
+
+def _feed_headers(headers: Dict, feed_url: str) -> Dict:
+    """Headers for feedparser: lower-cased, with the feed URL as base for relative links"""
+    result = {name.lower(): value for name, value in headers.items()}
+    result.setdefault('content-location', feed_url)
+    return result
+
+
+def entry_timestamp(entry) -> Optional[datetime]:
+    """
+    When an entry was last published or updated, from the feed's own dates
+
+    Uses the later of the two, so an entry edited after it was ingested
+    counts as new again.
+
+    Args:
+        entry: feedparser entry object
+
+    Returns:
+        datetime: Naive UTC timestamp, or None if the entry has no usable date
+    """
+    stamps = []
+    for field in ('published_parsed', 'updated_parsed'):
+        parsed = entry.get(field)
+        if parsed:
+            try:
+                stamps.append(datetime(*parsed[:6]))
+            except (TypeError, ValueError):
+                pass
+    return max(stamps) if stamps else None
+
+
+def entry_key(entry) -> str:
+    """Stable identifier of a feed entry: its id/guid, falling back to the link"""
+    return entry.get('id') or entry.get('link') or ''
+
+
+def _trim_to_watermark(content: bytes, entry_id: str) -> Optional[bytes]:
+    """
+    Cut a raw feed document just after the entry with the given id
+
+    Keeps everything before the end of that entry plus the document's
+    closing tags, so feedparser never sees the older entries below it.
+
+    Args:
+        content: Raw feed document
+        entry_id: Id (guid) or link of the watermark entry
+
+    Returns:
+        bytes: The shortened document, or None if the entry could not be located
+    """
+    if not entry_id:
+        return None
+    position = content.find(b'>' + xml_escape(entry_id).encode('utf-8') + b'<')
+    if position < 0:
+        return None
+    ends = [end for end in (content.find(b'</item>', position), content.find(b'</entry>', position)) if end >= 0]
+    if not ends:
+        return None
+    cut = content.index(b'>', min(ends)) + 1
+    tail = content.index(b'>', max(content.rfind(b'</item>'), content.rfind(b'</entry>'))) + 1
+    return content[:cut] + content[tail:]
+
+
+def iter_feed_entries(content: bytes, headers: Dict, feed_config: Dict) -> Generator[Dict, None, Optional[Tuple]]:
+    """
+    Parse a downloaded feed, yielding one article dictionary per new entry
+
+    With a watermark in feed_config (the newest entry ingested before), the
+    document is first cut after the watermark entry so only the entries
+    above it are parsed at all; if the cut turns out wrong (the entry's id
+    also appears elsewhere) the whole document is parsed instead. Entries
+    are then walked newest first as feeds list them, and processing stops
+    at the first entry at or below the watermark, so steady-state cost
+    scales with new content rather than with the length of the feed.
+    Entries without dates are always processed; the upsert drops the ones
+    already stored.
+
+    Args:
+        content: Raw feed document
+        headers: HTTP response headers (used for encoding detection)
+        feed_config: Feed entry from RSS_FEEDS, or Feed.as_config() with
+            'watermark': (datetime, entry id) or None
 
-            if feed.bozo and feed.bozo_exception:
-                logger.warning(f"Feed parsing warning for {source_name}: {feed.bozo_exception}")
+    Yields:
+        dict: Parsed articles (invalid entries skipped)
 
-            # Process each entry in the feed
-            for entry in feed.entries:
-                article = parse_rss_entry(entry, source_name)
-                if article:
-                    all_articles.append(article)
+    Returns:
+        tuple: The feed's new watermark (datetime, entry id), or None if no
+        entry had a date (read it with `watermark = yield from ...`)
+    """
+    source_name = feed_config['source_name']
+    watermark = feed_config.get('watermark')
+    response_headers = _feed_headers(headers, feed_config['url'])
+
+    feed = None
+    trimmed = _trim_to_watermark(content, watermark[1]) if watermark else None
+    if trimmed is not None:
+        feed = feedparser.parse(trimmed, response_headers=response_headers)
+        if not feed.entries or entry_key(feed.entries[-1]) != watermark[1]:
+            feed = None  # Cut in the wrong place
+    if feed is None:
+        feed = feedparser.parse(content, response_headers=response_headers)
+
+    if feed.bozo and feed.bozo_exception:
+        logger.warning(f"Feed parsing warning for {source_name}: {feed.bozo_exception}")
+
+    # The topmost of the newest entries: entries sharing its timestamp sit
+    # below it, so the next poll stops before reaching them
+    newest_seen = None
+    processed = 0
+    for entry in feed.entries:
+        stamp = entry_timestamp(entry)
+        key = entry_key(entry)
+        if watermark and stamp is not None and (
+                stamp < watermark[0] or (stamp == watermark[0] and key == watermark[1])):
+            break  # Reached entries ingested by an earlier poll
+
+        processed += 1
+        article = parse_rss_entry(entry, source_name)
+        if article:
+            yield article
+        if stamp is not None and (newest_seen is None or stamp > newest_seen[0]):
+            newest_seen = (stamp, key)
+
+    logger.info(f"Fetched {processed} new articles from {source_name}")
+    return newest_seen or watermark
+
+
+def _fetch_timed(feed_url: str) -> Tuple[bytes, Dict, bool, float]:
+    """fetch_feed() plus the time it took in seconds"""
+    start = time.monotonic()
+    content, headers, changed = fetch_feed(feed_url)
+    return content, headers, changed, time.monotonic() - start
+
+
+class FeedDownloads:
+    """
+    Fetch stage: iterate over (feed_config, content, headers, latency) per downloaded feed
+
+    In concurrent mode feeds are downloaded on a bounded thread pool and
+    yielded in completion order, so a run takes about as long as the slowest
+    feed rather than the sum of all feeds. At most RSS_FETCH_WORKERS
+    downloads are in flight or waiting to be consumed at any time, so memory
+    does not grow with the number of feeds.
+
+    Every download is a conditional request against the on-disk feed cache.
+    With only_changed, feeds whose payload is unchanged since the last
+    download are not yielded; callers that store the result should call
+    feed_cache.forget_feed_states() if storing fails, so the skipped entries
+    are not lost.
+
+    Failed and unchanged feeds are reported here; successful ones are
+    reported by iter_articles() once their entries have been parsed.
+    """
 
-            logger.info(f"Fetched {len(feed.entries)} articles from {source_name}")
+    def __init__(self, feeds: List[Dict], concurrent=True, only_changed=False, report: Optional[Callable] = None):
+        self.feeds = feeds
+        self.concurrent = concurrent
+        self.only_changed = only_changed
+        self.report = report
+        self.failed = 0
+        self.unchanged = 0
+
+    @property
+    def all_failed(self) -> bool:
+        """True if there were feeds to fetch and every one of them failed"""
+        return bool(self.feeds) and self.failed == len(self.feeds)
+
+    def __iter__(self) -> Iterator[Tuple[Dict, bytes, Dict, float]]:
+        if self.concurrent and len(self.feeds) > 1:
+            yield from self._iter_concurrent()
+            return
+        for feed_config in self.feeds:
+            logger.info(f"Fetching RSS feed from {feed_config['source_name']}: {feed_config['url']}")
+            try:
+                content, headers, changed, latency = _fetch_timed(feed_config['url'])
+            except Exception as e:
+                self._failed(feed_config, e)
+                continue
+            if self._accept(feed_config, changed, latency):
+                yield feed_config, content, headers, latency
+
+    def _iter_concurrent(self):
+        remaining = iter(self.feeds)
+        with ThreadPoolExecutor(max_workers=min(len(self.feeds), Config.RSS_FETCH_WORKERS)) as pool:
+            pending = {}
+
+            def submit_next():
+                for feed_config in remaining:
+                    pending[pool.submit(_fetch_timed, feed_config['url'])] = feed_config
+                    return
+
+            for _ in range(Config.RSS_FETCH_WORKERS):
+                submit_next()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    feed_config = pending.pop(future)
+                    submit_next()
+                    try:
+                        content, headers, changed, latency = future.result()
+                    except Exception as e:
+                        self._failed(feed_config, e)
+                        continue
+                    if self._accept(feed_config, changed, latency):
+                        yield feed_config, content, headers, latency
+
+    def _accept(self, feed_config, changed, latency) -> bool:
+        """Whether a downloaded feed goes on to be parsed"""
+        if self.only_changed and not changed:
+            self.unchanged += 1
+            logger.info(f"Skipping unchanged RSS feed {feed_config['source_name']}")
+            if self.report:
+                self.report(feed_config, latency=latency, entries=None)
+            return False
+        return True
+
+    def _failed(self, feed_config, error):
+        self.failed += 1
+        logger.error(f"Error fetching RSS feed {feed_config['source_name']}: {str(error)}")
+        if self.report:
+            self.report(feed_config, error=str(error) or type(error).__name__)
+
+
+def iter_articles(documents: Iterable, report: Optional[Callable] = None,
+                  advance_watermarks: bool = True) -> Iterator[Dict]:
+    """
+    Parse stage: yield the new articles of each downloaded feed
 
+    Args:
+        documents: (feed_config, content, headers, latency) tuples from FeedDownloads
+        report: Called as report(feed_config, latency=..., entries=..., watermark=...)
+            once a feed's entries have all been yielded, or with error=... if
+            the feed could not be parsed
+        advance_watermarks: Report each feed's new watermark; pass False when
+            not every yielded article will be stored (e.g. a top-K cut
+            follows), so the articles dropped are parsed again next time
+
+    Yields:
+        dict: Article dictionaries
+    """
+    for feed_config, content, headers, latency in documents:
+        entries = 0
+        try:
+            entry_iter = iter_feed_entries(content, headers, feed_config)
+            while True:
+                try:
+                    article = next(entry_iter)
+                except StopIteration as stop:
+                    watermark = stop.value
+                    break
+                entries += 1
+                yield article
         except Exception as e:
-            logger.error(f"Error fetching RSS feed {source_name}: {str(e)}")
+            logger.error(f"Error parsing RSS feed {feed_config['source_name']}: {str(e)}")
+            if report:
+                report(feed_config, error=str(e) or type(e).__name__)
             continue
+        if report:
+            report(feed_config, latency=latency, entries=entries,
+                   watermark=watermark if advance_watermarks else None)
+
+
+def newest(articles: Iterable[Dict], limit: Optional[int]) -> Iterator[Dict]:
+    """
+    Top-K stage: the `limit` most recently published articles, newest first
 
-    # Sort by published date (most recent first)
-    all_articles.sort(key=lambda x: x.get('published_date') or datetime.min, reverse=True)
+    Keeps a min-heap of at most `limit` articles instead of sorting
+    everything, so memory is bounded by the limit, not by the input.
 
-    # Return requested number of articles
-    result = all_articles[:max_articles]
-    logger.info(f"Successfully fetched {len(result)} total articles from RSS feeds")
+    Args:
+        articles: Article dictionaries
+        limit: Articles to keep (None passes everything through unsorted)
 
-    return result if result else None
+    Yields:
+        dict: Articles, newest first
+    """
+    if limit is None:
+        yield from articles
+        return
+
+    heap = []
+    for seq, article in enumerate(articles):
+        # seq breaks ties so dictionaries are never compared
+        item = (article.get('published_date') or datetime.min, -seq, article)
+        if len(heap) < limit:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    for _, _, article in sorted(heap, reverse=True):
+        yield article
+
+
+def fetch_articles_from_rss(max_articles=50, feeds=None, concurrent=True, only_changed=False,
+                            report: Optional[Callable] = None) -> Optional[List[Dict]]:
+    """
+    Fetch articles from configured RSS feeds
+
+    Chains the fetch, parse and top-K stages (see FeedDownloads, iter_articles
+    and newest); ingestion itself streams them further through
+    services/ingest_pipeline.py.
+
+    Args:
+        max_articles: Maximum number of articles to return across all feeds
+            (None for no limit)
+        feeds: Feed configs to fetch (defaults to RSS_FEEDS)
+        concurrent: Download feeds in parallel (False fetches one at a time)
+        only_changed: Skip feeds that haven't changed since the last download
+        report: Called on the calling thread once per feed as
+            report(feed_config, latency=..., entries=..., watermark=...) on
+            success (entries is None for an unchanged feed, watermark None
+            unless every article is returned) or report(feed_config, error=...)
+
+    Returns:
+        list: List of article dictionaries, newest first (empty if nothing
+        changed), or None if every feed failed
+    """
+    downloads = FeedDownloads(RSS_FEEDS if feeds is None else feeds, concurrent, only_changed, report)
+    articles = iter_articles(downloads, report, advance_watermarks=max_articles is None)
+    result = list(newest(articles, max_articles))
+
+    if downloads.all_failed:
+        return None
+
+    logger.info(
+        f"Successfully fetched {len(result)} total articles from RSS feeds "
+        f"({downloads.unchanged} feed(s) unchanged)"
+    )
+    return result
 
 
 def parse_rss_entry(entry, source_name: str) -> Optional[Dict]:
@@ -171,40 +533,3 @@ def parse_rss_entry(entry, source_name: str) -> Optional[Dict]:
         logger.error(f"Error parsing RSS entry: {str(e)}")
         return None
 
-
-def test_rss_feeds():
-    """
-    Test function to verify RSS feeds are accessible
-
-    Returns:
-        dict: Status of each feed
-    """
-    results = {}
-
-    for feed_config in RSS_FEEDS:
-        feed_url = feed_config['url']
-        source_name = feed_config['source_name']
-
-        try:
-            feed = feedparser.parse(feed_url)
-
-            if feed.bozo and feed.bozo_exception:
-                results[source_name] = {
-                    'status': 'warning',
-                    'message': str(feed.bozo_exception),
-                    'entries': len(feed.entries)
-                }
-            else:
-                results[source_name] = {
-                    'status': 'success',
-                    'entries': len(feed.entries),
-                    'title': feed.feed.get('title', 'Unknown')
-                }
-
-        except Exception as e:
-            results[source_name] = {
-                'status': 'error',
-                'message': str(e)
-            }
-
-    return results
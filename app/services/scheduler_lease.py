@@ -0,0 +1,252 @@
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from app.models import db, SchedulerLease, JobRun
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Lease row shared by all workers
+LEADER_LEASE = 'scheduler'
+
+# Longest error message kept on a job run
+MAX_ERROR_LENGTH = 1000
+
+
+def holder_id() -> str:
+    """Identity of this process in leases and job runs (host:pid)"""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+class DatabaseLease:
+    """
+    Leader lease stored in the scheduler_leases table
+
+    Works across hosts. The holder renews it with every heartbeat; if the
+    holder dies the lease expires after `ttl` seconds and the next worker to
+    heartbeat takes over.
+    """
+
+    def __init__(self, name: str = LEADER_LEASE, ttl: Optional[int] = None):
+        self.name = name
+        self.ttl = ttl or Config.SCHEDULER_LEASE_TTL
+
+    def acquire(self, now: Optional[datetime] = None) -> bool:
+        """
+        Take or renew the lease; commits
+
+        A conditional UPDATE succeeds only for the current holder or once the
+        lease has expired, so two workers can never both win it.
+
+        Returns:
+            bool: True if this process holds the lease
+        """
+        now = now or datetime.utcnow()
+        me = holder_id()
+        result = db.session.execute(
+            db.update(SchedulerLease)
+            .where(
+                SchedulerLease.name == self.name,
+                db.or_(SchedulerLease.holder == me, SchedulerLease.expires_at < now)
+            )
+            .values(
+                holder=me,
+                acquired_at=db.case((SchedulerLease.holder == me, SchedulerLease.acquired_at), else_=now),
+                heartbeat_at=now,
+                expires_at=now + timedelta(seconds=self.ttl)
+            )
+        )
+        if result.rowcount == 1:
+            db.session.commit()
+            return True
+
+        if db.session.get(SchedulerLease, self.name) is not None:
+            db.session.rollback()
+            return False  # Held by a live worker
+
+        try:
+            db.session.add(SchedulerLease(
+                name=self.name,
+                holder=me,
+                acquired_at=now,
+                heartbeat_at=now,
+                expires_at=now + timedelta(seconds=self.ttl)
+            ))
+            db.session.commit()
+            return True
+        except IntegrityError:
+            db.session.rollback()  # Another worker created it first
+            return False
+
+    def release(self):
+        """Give the lease up so another worker can take over without waiting for it to expire"""
+        db.session.execute(
+            db.update(SchedulerLease)
+            .where(SchedulerLease.name == self.name, SchedulerLease.holder == holder_id())
+            .values(expires_at=datetime.utcnow())
+        )
+        db.session.commit()
+
+
+class FileLease:
+    """
+    Leader lease held as an exclusive lock on a local file
+
+    For single-host deployments. The operating system drops the lock when
+    the process exits, so there is nothing to expire.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def acquire(self, now: Optional[datetime] = None) -> bool:
+        """Take the lock if it is free; returns True if this process holds it"""
+        import fcntl
+
+        if self._file is not None:
+            return True
+        lock_file = open(self.path, 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self):
+        """Unlock the file"""
+        import fcntl
+
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def scheduler_lease():
+    """The configured lease: a file lock if SCHEDULER_LOCK_FILE is set, otherwise the database"""
+    if Config.SCHEDULER_LOCK_FILE:
+        return FileLease(Config.SCHEDULER_LOCK_FILE)
+    return DatabaseLease()
+
+
+class SchedulerLeader:
+    """
+    Runs scheduled jobs only in the worker that holds the leader lease
+
+    Every worker starts the same scheduler; heartbeat() runs on an interval
+    in each of them, and whichever holds the lease is the leader. Job
+    wrappers check leadership before running, so each job runs once across
+    all workers and hosts, and the duration and outcome of every run is
+    recorded in job_runs. A run falling due while leadership changes hands
+    (at most SCHEDULER_LEASE_TTL seconds after a leader dies) is skipped.
+    """
+
+    def __init__(self, app, lease=None):
+        self.app = app
+        self.lease = lease or scheduler_lease()
+        self.is_leader = False
+
+    def heartbeat(self) -> bool:
+        """
+        Take or renew the lease
+
+        Returns:
+            bool: True if this worker is the leader
+        """
+        with self.app.app_context():
+            try:
+                held = self.lease.acquire()
+            except Exception as e:
+                logger.error(f"Error renewing scheduler lease: {str(e)}")
+                db.session.rollback()
+                held = False
+
+        if held != self.is_leader:
+            logger.info(f"Worker {holder_id()} {'became' if held else 'is no longer'} the scheduler leader")
+        self.is_leader = held
+        return held
+
+    def run(self, job_name: str, func: Callable):
+        """
+        Run a job if this worker is the leader, recording the run
+
+        Args:
+            job_name: Name stored in job_runs
+            func: The job; it runs inside an app context, and a False return
+                value counts as a failure
+        """
+        if not self.heartbeat():
+            return
+
+        with self.app.app_context():
+            started_at = datetime.utcnow()
+            start = time.perf_counter()
+            error = None
+            try:
+                outcome = 'failed' if func() is False else 'success'
+            except Exception as e:
+                logger.error(f"Scheduled job {job_name} failed: {str(e)}")
+                db.session.rollback()
+                outcome = 'failed'
+                error = str(e)[:MAX_ERROR_LENGTH] or type(e).__name__
+            record_job_run(job_name, started_at, time.perf_counter() - start, outcome, error)
+
+    def release(self):
+        """Step down (e.g. on shutdown)"""
+        if not self.is_leader:
+            return
+        with self.app.app_context():
+            try:
+                self.lease.release()
+            except Exception as e:
+                logger.error(f"Error releasing scheduler lease: {str(e)}")
+                db.session.rollback()
+        self.is_leader = False
+
+
+def record_job_run(job_name: str, started_at: datetime, seconds: float, outcome: str, error: Optional[str] = None):
+    """Store one job run and drop runs older than JOB_RUN_RETENTION_DAYS; commits"""
+    try:
+        db.session.add(JobRun(
+            job_name=job_name,
+            holder=holder_id(),
+            started_at=started_at,
+            duration_ms=int(seconds * 1000),
+            outcome=outcome,
+            error=error
+        ))
+        cutoff = datetime.utcnow() - timedelta(days=Config.JOB_RUN_RETENTION_DAYS)
+        JobRun.query.filter(JobRun.started_at < cutoff).delete(synchronize_session=False)
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Error recording run of {job_name}: {str(e)}")
+        db.session.rollback()
+
+
+def job_status() -> Dict:
+    """
+    Current leader and the latest run of each job, for the admin pages
+
+    Returns:
+        dict: {'lease': SchedulerLease or None, 'runs': list of the newest
+        JobRun per job, 'failures': {job_name: failed runs in the last day}}
+    """
+    latest = db.session.query(db.func.max(JobRun.id)).group_by(JobRun.job_name)
+    runs = JobRun.query.filter(JobRun.id.in_(latest)).order_by(JobRun.job_name).all()
+    since = datetime.utcnow() - timedelta(days=1)
+    failures = db.session.query(JobRun.job_name, db.func.count(JobRun.id))\
+        .filter(JobRun.outcome == 'failed', JobRun.started_at >= since)\
+        .group_by(JobRun.job_name)\
+        .all()
+    return {
+        'lease': db.session.get(SchedulerLease, LEADER_LEASE),
+        'runs': runs,
+        'failures': dict(failures),
+    }
@@ -0,0 +1,266 @@
+import json
+import logging
+import os
+import threading
+from itertools import repeat
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from app.models import db, Article
+from app.config import Config
+from app.services.keyword_classifier import (
+    tokenize, tokenize_bytes, inflections, POSITIVE_KEYWORDS, NEGATIVE_KEYWORDS
+)
+
+logger = logging.getLogger(__name__)
+
+# Lexicon fallback weights (log-odds) used until a model has been trained
+LEXICON_POSITIVE_WEIGHT = 1.0
+LEXICON_NEGATIVE_WEIGHT = -2.0
+LEXICON_BIAS = -0.5
+
+# Joins the texts of a batch: 0xFF never occurs in UTF-8, so it survives
+# tokenizing as a word of its own that no text contains
+_TEXT_SEPARATOR = b' \xff '
+
+# A trained model needs at least this many reviewed articles of each class
+MIN_TRAINING_ARTICLES = 20
+
+
+def article_text(title, description) -> str:
+    return (title or '') + ' ' + (description or '')
+
+
+class SentimentModel:
+    """
+    Linear positivity model over binary word features
+
+    score = sigmoid(bias + sum of the weights of the distinct words in the
+    text). Weights are either log-likelihood ratios from a naive Bayes fit on
+    approve/reject history or a keyword lexicon.
+    """
+
+    def __init__(self, vocabulary: Sequence[str], weights, bias: float, meta: Optional[Dict] = None):
+        self.vocabulary = list(vocabulary)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.meta = meta or {}
+        # Token bytes (see keyword_classifier.tokenize) -> column; the text
+        # separator maps to -1
+        self._columns = {word.encode('utf-8'): column for column, word in enumerate(self.vocabulary)}
+        self._columns[_TEXT_SEPARATOR.strip()] = -1
+
+    @classmethod
+    def from_lexicon(cls) -> 'SentimentModel':
+        """Model built from the keyword lists, used when no trained model exists"""
+        weights = {}
+        for keywords, weight in ((NEGATIVE_KEYWORDS, LEXICON_NEGATIVE_WEIGHT), (POSITIVE_KEYWORDS, LEXICON_POSITIVE_WEIGHT)):
+            for keyword in keywords:
+                if keyword.isascii() and ' ' not in keyword:
+                    for form in inflections(keyword):
+                        weights.setdefault(form, weight)
+        return cls(list(weights), list(weights.values()), LEXICON_BIAS, {'kind': 'lexicon'})
+
+    @classmethod
+    def train(cls, positive_texts: List[str], negative_texts: List[str], alpha=1.0, min_count=2) -> 'SentimentModel':
+        """
+        Fit a naive Bayes model on binary word presence
+
+        Args:
+            positive_texts: Texts of approved articles
+            negative_texts: Texts of rejected articles
+            alpha: Laplace smoothing
+            min_count: Words seen in fewer documents are ignored
+
+        Returns:
+            SentimentModel: The fitted model
+        """
+        documents = [set(tokenize(text)) for text in positive_texts + negative_texts]
+        labels = np.array([1] * len(positive_texts) + [0] * len(negative_texts))
+
+        # Document frequency per word and class, counted with bincount over flat index arrays
+        index = {}
+        columns = []
+        rows = []
+        for row, words in enumerate(documents):
+            for word in words:
+                columns.append(index.setdefault(word, len(index)))
+                rows.append(row)
+        columns = np.array(columns, dtype=np.int64)
+        row_labels = labels[np.array(rows, dtype=np.int64)] if rows else np.array([], dtype=np.int64)
+        positive_counts = np.bincount(columns[row_labels == 1], minlength=len(index))
+        negative_counts = np.bincount(columns[row_labels == 0], minlength=len(index))
+
+        keep = (positive_counts + negative_counts) >= min_count
+        positive_counts = positive_counts[keep]
+        negative_counts = negative_counts[keep]
+        vocabulary = [word.decode('utf-8') for word, kept in zip(index, keep) if kept]
+
+        n_positive = len(positive_texts)
+        n_negative = len(negative_texts)
+        # Bernoulli likelihood ratios for present words
+        weights = np.log((positive_counts + alpha) / (n_positive + 2 * alpha)) \
+            - np.log((negative_counts + alpha) / (n_negative + 2 * alpha))
+        bias = np.log(n_positive / n_negative)
+
+        return cls(vocabulary, weights, bias, {
+            'kind': 'naive_bayes',
+            'trained_at': datetime.utcnow().isoformat(),
+            'approved': n_positive,
+            'rejected': n_negative,
+        })
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Positivity scores for a batch of texts
+
+        The batch is tokenized in one pass into a flat array of vocabulary
+        columns with the text of each token as its row, i.e. a sparse
+        text x word matrix; repeated words are dropped by sorting the
+        (row, column) pairs, and the logits are one weighted bincount over
+        the rows.
+
+        Args:
+            texts: Article texts (title and description)
+
+        Returns:
+            ndarray: Scores in [0, 1], one per text
+        """
+        width = len(self.vocabulary)  # Also the column of unknown words
+        tokens = tokenize_bytes(_TEXT_SEPARATOR.join([text.encode('utf-8') for text in texts]))
+        columns = np.fromiter(map(self._columns.get, tokens, repeat(width)), dtype=np.int64, count=len(tokens))
+
+        separators = columns < 0
+        rows = np.cumsum(separators)
+        known = ~separators & (columns != width)
+        # One key per (text, word); sorting brings repeats together
+        keys = np.sort(rows[known] * width + columns[known])
+        distinct = np.ones(len(keys), dtype=bool)
+        distinct[1:] = keys[1:] != keys[:-1]
+        keys = keys[distinct]
+
+        logits = np.bincount(keys // width, weights=self.weights[keys % width], minlength=len(texts)) + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def to_dict(self) -> Dict:
+        return {
+            'vocabulary': self.vocabulary,
+            'weights': self.weights.tolist(),
+            'bias': self.bias,
+            'meta': self.meta,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SentimentModel':
+        return cls(data['vocabulary'], data['weights'], data['bias'], data.get('meta'))
+
+
+# Per-process model cache, reloaded when the model file changes
+_model_cache = {'mtime': None, 'model': None}
+_model_lock = threading.Lock()
+
+
+def load_model() -> SentimentModel:
+    """
+    Get the current model: the trained one on disk, or the keyword lexicon
+
+    Returns:
+        SentimentModel: Cached model instance
+    """
+    path = Config.SENTIMENT_MODEL_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+
+    with _model_lock:
+        if _model_cache['model'] is None or _model_cache['mtime'] != mtime:
+            model = None
+            if mtime is not None:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        model = SentimentModel.from_dict(json.load(f))
+                except (OSError, ValueError, KeyError) as e:
+                    logger.error(f"Could not load sentiment model from {path}: {str(e)}")
+            _model_cache.update({'mtime': mtime, 'model': model or SentimentModel.from_lexicon()})
+        return _model_cache['model']
+
+
+def save_model(model: SentimentModel, path: Optional[str] = None):
+    """Write a model to SENTIMENT_MODEL_PATH (atomically, so workers never read half a file)"""
+    path = path or Config.SENTIMENT_MODEL_PATH
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(model.to_dict(), f)
+    os.replace(tmp_path, path)
+
+
+def train_from_history() -> Optional[SentimentModel]:
+    """
+    Train a naive Bayes model from admin review decisions
+
+    Uses articles an admin approved or rejected (reviewed_by_id set);
+    auto-approved articles carry no human judgement and are left out.
+
+    Returns:
+        SentimentModel: The trained model, or None if there is too little history
+    """
+    reviewed = db.session.query(Article.title, Article.description, Article.status)\
+        .filter(Article.reviewed_by_id.isnot(None), Article.status.in_(['approved', 'rejected']))\
+        .all()
+    positive = [article_text(title, description) for title, description, status in reviewed if status == 'approved']
+    negative = [article_text(title, description) for title, description, status in reviewed if status == 'rejected']
+
+    if len(positive) < MIN_TRAINING_ARTICLES or len(negative) < MIN_TRAINING_ARTICLES:
+        logger.warning(
+            f"Not enough review history to train ({len(positive)} approved, {len(negative)} rejected; "
+            f"need {MIN_TRAINING_ARTICLES} of each)"
+        )
+        return None
+
+    model = SentimentModel.train(positive, negative)
+    logger.info(f"Trained sentiment model on {len(positive)} approved / {len(negative)} rejected articles "
+                f"({len(model.vocabulary)} words)")
+    return model
+
+
+def score_articles(rescore=False, batch_size=1000) -> int:
+    """
+    Compute and store positivity scores in batches
+
+    Runs inside the caller's transaction for the unscored articles of an
+    ingest; with rescore, walks every article and commits per batch.
+
+    Args:
+        rescore: Recompute all scores (e.g. after training a new model)
+        batch_size: Articles scored per batch
+
+    Returns:
+        int: Number of articles scored
+    """
+    model = load_model()
+    scored = 0
+    last_id = 0
+
+    while True:
+        query = db.session.query(Article.id, Article.title, Article.description)\
+            .filter(Article.id > last_id)
+        if not rescore:
+            query = query.filter(Article.positivity_score.is_(None))
+        batch = query.order_by(Article.id).limit(batch_size).all()
+        if not batch:
+            break
+        last_id = batch[-1][0]
+
+        scores = model.score_batch([article_text(title, description) for _, title, description in batch])
+        db.session.execute(db.update(Article), [
+            {'id': article_id, 'positivity_score': round(float(score), 4)}
+            for (article_id, _, _), score in zip(batch, scores)
+        ])
+        if rescore:
+            db.session.commit()
+        scored += len(batch)
+
+    if scored:
+        logger.info(f"Scored {scored} articles with the {model.meta.get('kind', 'unknown')} sentiment model")
+    return scored
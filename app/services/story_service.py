@@ -0,0 +1,230 @@
+import hashlib
+import logging
+import random
+import re
+import struct
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy.orm import aliased
+from app.models import db, Article, StoryFingerprint, StoryBand
+from app.services.ingest_service import batches
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# MinHash/LSH parameters: 20 bands of 3 rows put the candidate threshold
+# around 0.37 Jaccard, so pairs at or above the 0.5 verification threshold
+# become candidates with >93% probability while unrelated articles rarely do.
+BANDS = 20
+ROWS_PER_BAND = 3
+NUM_PERM = BANDS * ROWS_PER_BAND
+
+# Each "permutation" XORs the token's 64-bit blake2b hash with a random mask:
+# several times cheaper than (a*x + b) mod p in pure Python, and close enough
+# to min-wise independent for a well-mixed base hash
+_rng = random.Random(20240101)  # Fixed seed: signatures must be stable across processes
+_MASKS = [_rng.getrandbits(64) for _ in range(NUM_PERM)]
+_SIGNATURE_FORMAT = f'<{NUM_PERM}Q'
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_TAG_RE = re.compile(r'<[^<]+?>')
+STOPWORDS = frozenset("""
+    a about after all also an and are as at be been but by can for from has have he her his how in into is it
+    its more new not of on or our out over says she so than that the their them they this to up was we were
+    what when which who will with you your
+""".split())
+
+
+def tokenize(title: str, description: Optional[str] = None) -> set:
+    """
+    Distinct content words of an article's title and description
+
+    Args:
+        title: Article title
+        description: Article description (HTML is stripped)
+
+    Returns:
+        set: Lower-cased words, without stopwords and one-letter tokens
+    """
+    text = f"{title or ''} {_TAG_RE.sub(' ', description or '')}".lower()
+    return {word for word in _WORD_RE.findall(text) if len(word) > 1 and word not in STOPWORDS}
+
+
+def minhash(tokens: set) -> Optional[List[int]]:
+    """
+    MinHash signature of a token set
+
+    Args:
+        tokens: Token set from tokenize()
+
+    Returns:
+        list: NUM_PERM integers, or None for an empty set
+    """
+    if not tokens:
+        return None
+    hashed = [int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+              for token in tokens]
+    return [min(map(mask.__xor__, hashed)) for mask in _MASKS]
+
+
+def similarity(signature_a: List[int], signature_b: List[int]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures"""
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_PERM
+
+
+def band_buckets(signature: List[int]) -> List[int]:
+    """
+    LSH buckets of a signature, one per band
+
+    Args:
+        signature: MinHash signature
+
+    Returns:
+        list: Signed 64-bit hashes of (band number, band rows)
+    """
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f'<H{ROWS_PER_BAND}Q', band, *rows), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'little', signed=True))
+    return buckets
+
+
+def assign_stories(batch_size=500) -> Dict[str, int]:
+    """
+    Cluster recent articles that have no story yet into near-duplicate stories
+
+    Candidates are found through the LSH band table with one indexed lookup
+    per batch, never by comparing every pair, and only articles from the
+    last STORY_WINDOW_DAYS are indexed, so the cost per article stays flat
+    as the archive grows. A new article joins the story of its most similar
+    candidate at or above STORY_SIMILARITY_THRESHOLD, otherwise it starts a
+    story of its own. Every pending article is clustered, a batch at a time;
+    later batches see the earlier ones. Runs inside the caller's transaction.
+
+    Args:
+        batch_size: Articles fingerprinted per batch
+
+    Returns:
+        dict: {'fingerprinted': int, 'clustered': int} - clustered counts
+        articles that joined an existing story
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=Config.STORY_WINDOW_DAYS)
+    _prune_index(cutoff)
+
+    fingerprinted = 0
+    clustered = 0
+    last_id = 0
+    while True:
+        pending = db.session.query(Article.id, Article.title, Article.description)\
+            .filter(Article.id > last_id, Article.story_id.is_(None), Article.cached_at >= cutoff)\
+            .order_by(Article.id)\
+            .limit(batch_size)\
+            .all()
+        if not pending:
+            break
+        last_id = pending[-1][0]
+
+        clustered += _assign_batch(pending, now)
+        fingerprinted += len(pending)
+
+    if fingerprinted:
+        logger.info(f"Fingerprinted {fingerprinted} articles, {clustered} joined an existing story")
+    return {'fingerprinted': fingerprinted, 'clustered': clustered}
+
+
+def _assign_batch(pending, now) -> int:
+    """Fingerprint and cluster one batch of (id, title, description); returns how many joined a story"""
+    new = []
+    for article_id, title, description in pending:
+        signature = minhash(tokenize(title, description))
+        new.append((article_id, signature, band_buckets(signature) if signature else []))
+
+    # One indexed lookup for every bucket of the batch
+    keys = {key for _, _, buckets in new for key in buckets}
+    candidates = {}  # bucket -> [(article_id, story_id)]
+    signatures = {}  # article_id -> signature
+    for key_chunk in batches(keys, 500):
+        rows = db.session.query(StoryBand.bucket, Article.id, Article.story_id, StoryFingerprint.signature)\
+            .join(Article, Article.id == StoryBand.article_id)\
+            .join(StoryFingerprint, StoryFingerprint.article_id == StoryBand.article_id)\
+            .filter(StoryBand.bucket.in_(key_chunk))
+        for bucket, article_id, story_id, packed in rows:
+            candidates.setdefault(bucket, []).append((article_id, story_id))
+            signatures[article_id] = list(struct.unpack(_SIGNATURE_FORMAT, packed))
+
+    fingerprints = []
+    bands = []
+    stories = []
+    clustered = 0
+    for article_id, signature, buckets in new:
+        story_id = article_id
+        if signature:
+            best = 0.0
+            for key in buckets:
+                for candidate_id, candidate_story in candidates.get(key, ()):
+                    score = similarity(signature, signatures[candidate_id])
+                    if score >= Config.STORY_SIMILARITY_THRESHOLD and score > best:
+                        best, story_id = score, candidate_story or candidate_id
+            if story_id != article_id:
+                clustered += 1
+
+            # Later articles in this batch can match this one
+            signatures[article_id] = signature
+            for key in buckets:
+                candidates.setdefault(key, []).append((article_id, story_id))
+            bands.extend({'bucket': bucket, 'article_id': article_id, 'created_at': now} for bucket in buckets)
+            fingerprints.append({
+                'article_id': article_id,
+                'signature': struct.pack(_SIGNATURE_FORMAT, *signature),
+                'created_at': now,
+            })
+
+        # Articles without words form a story of their own
+        stories.append({'id': article_id, 'story_id': story_id})
+
+    # Plain table inserts: the ORM bulk path adds per-row bookkeeping we don't need here
+    if fingerprints:
+        db.session.execute(StoryFingerprint.__table__.insert(), fingerprints)
+    if bands:
+        db.session.execute(StoryBand.__table__.insert(), bands)
+    db.session.execute(db.update(Article), stories)
+
+    return clustered
+
+
+def _prune_index(cutoff):
+    """Drop band entries older than the story window, keeping the candidate index small"""
+    db.session.query(StoryBand)\
+        .filter(StoryBand.created_at < cutoff)\
+        .delete(synchronize_session=False)
+
+
+def collapse_stories(query):
+    """
+    Hide articles that have a newer approved, active article in the same story
+
+    Matches the in-memory feed snapshot, which keeps the newest card of each
+    story. Articles not yet clustered (story_id NULL) are always shown.
+
+    Args:
+        query: Article query
+
+    Returns:
+        Query: The query with older duplicates filtered out
+    """
+    if not Config.STORY_COLLAPSE:
+        return query
+
+    newer = aliased(Article)
+    return query.filter(~db.session.query(newer.id).filter(
+        newer.story_id == Article.story_id,
+        newer.is_active == True,
+        newer.status == 'approved',
+        newer.published_at.isnot(None),
+        db.or_(
+            newer.published_at > Article.published_at,
+            db.and_(newer.published_at == Article.published_at, newer.id > Article.id)
+        )
+    ).exists())
@@ -0,0 +1,80 @@
+import logging
+import time
+from datetime import datetime
+from app.models import db, VersionStamp
+
+logger = logging.getLogger(__name__)
+
+# Version stamp names
+FEED_VERSION = 'feed'
+USERS_VERSION = 'users'
+
+# Per-process copy of recently read versions: name -> (version, checked_at)
+_known_versions = {}
+
+
+def get_version(name):
+    """
+    Get the current value of a version stamp
+
+    Args:
+        name: Version stamp name
+
+    Returns:
+        int: Current version (0 if never bumped)
+    """
+    version = db.session.query(VersionStamp.version).filter_by(name=name).scalar()
+    return version or 0
+
+
+def get_version_info(name):
+    """
+    Get a version stamp together with the time it last changed
+
+    Args:
+        name: Version stamp name
+
+    Returns:
+        tuple: (version, updated_at) - (0, None) if never bumped
+    """
+    row = db.session.query(VersionStamp.version, VersionStamp.updated_at).filter_by(name=name).first()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+def get_recent_version(name, max_age):
+    """
+    Get a version stamp, re-reading it from the database at most every `max_age` seconds
+
+    Args:
+        name: Version stamp name
+        max_age: Seconds a previously read value may be reused
+
+    Returns:
+        int: Current (or recently read) version
+    """
+    now = time.monotonic()
+    known = _known_versions.get(name)
+    if known is None or now - known[1] >= max_age:
+        known = (get_version(name), now)
+        _known_versions[name] = known
+    return known[0]
+
+
+def bump_version(name):
+    """
+    Increment a version stamp inside the caller's transaction
+
+    The new version becomes visible to other workers when the caller commits,
+    together with the change it describes.
+
+    Args:
+        name: Version stamp name
+    """
+    updated = VersionStamp.query.filter_by(name=name).update(
+        {VersionStamp.version: VersionStamp.version + 1, VersionStamp.updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    if not updated:
+        db.session.add(VersionStamp(name=name, version=1))
+    # Make this process re-read the new value on its next check
+    _known_versions.pop(name, None)
@@ -1,5 +1,5 @@
 // Global variables
-let currentPage = 2; // Start from page 2 since page 1 is already loaded
+let nextCursor = null; // Opaque feed cursor returned by the server (null = first page)
 let isLoading = false;
 let currentReportCommentId = null; // Track which comment is being reported
 
@@ -16,17 +16,31 @@ function loadMore() {
         button.textContent = 'Loading...';
     }
 
-    fetch(`/api/feed?page=${currentPage}`)
+    // Page 1 is rendered server-side with the cursor for page 2 on the button
+    if (nextCursor === null && button) {
+        nextCursor = button.getAttribute('data-next-cursor');
+    }
+    const params = new URLSearchParams();
+    params.set('show_read', new URLSearchParams(window.location.search).get('show_read') || 'false');
+    if (nextCursor) {
+        params.set('cursor', nextCursor);
+    }
+    const url = `/api/feed?${params.toString()}`;
+
+    fetch(url)
         .then(response => {
             if (!response.ok) {
                 throw new Error('Network response was not ok');
             }
             return response.json();
         })
-        .then(articles => {
+        .then(data => {
+            const articles = data.articles;
             if (articles.length > 0) {
                 appendArticles(articles);
-                currentPage++;
+            }
+            nextCursor = data.next_cursor;
+            if (articles.length > 0 && nextCursor) {
                 if (button) {
                     button.disabled = false;
                     button.textContent = 'Load More Good News';
@@ -391,22 +405,45 @@ function toggleComments(articleId) {
 }
 
 /**
- * Load comments for an article
+ * Load comments for an article, one page at a time
  * @param {number} articleId - Article ID
+ * @param {string} cursor - Cursor for the next page (omit to load the first page)
  */
-function loadComments(articleId) {
-    const commentsList = document.querySelector(`.comments-section[data-article-id="${articleId}"] .comments-list`);
+function loadComments(articleId, cursor) {
+    const commentsSection = document.querySelector(`.comments-section[data-article-id="${articleId}"]`);
+    const commentsList = commentsSection ? commentsSection.querySelector('.comments-list') : null;
     if (!commentsList) return;
 
-    commentsList.innerHTML = '<p class="loading-comments">Loading comments...</p>';
+    let loadMoreBtn = commentsSection.querySelector('.btn-load-more-comments');
+    if (!loadMoreBtn) {
+        loadMoreBtn = document.createElement('button');
+        loadMoreBtn.className = 'btn-load-more-comments';
+        loadMoreBtn.textContent = 'Load more comments';
+        loadMoreBtn.style.display = 'none';
+        loadMoreBtn.onclick = () => loadComments(articleId, loadMoreBtn.getAttribute('data-next-cursor'));
+        commentsList.after(loadMoreBtn);
+    }
+
+    const url = cursor
+        ? `/api/articles/${articleId}/comments?cursor=${encodeURIComponent(cursor)}`
+        : `/api/articles/${articleId}/comments`;
+
+    if (cursor) {
+        loadMoreBtn.disabled = true;
+        loadMoreBtn.textContent = 'Loading...';
+    } else {
+        commentsList.innerHTML = '<p class="loading-comments">Loading comments...</p>';
+    }
 
-    fetch(`/api/articles/${articleId}/comments`)
+    fetch(url)
         .then(response => response.json())
         .then(data => {
             if (data.success) {
-                commentsList.innerHTML = '';
+                if (!cursor) {
+                    commentsList.innerHTML = '';
+                }
 
-                if (data.comments.length === 0) {
+                if (!cursor && data.comments.length === 0) {
                     commentsList.innerHTML = '<p class="no-comments">No comments yet. Be the first to comment!</p>';
                 } else {
                     data.comments.forEach(comment => {
@@ -415,18 +452,29 @@ function loadComments(articleId) {
                     });
                 }
 
+                // Show the button only while more pages remain
+                loadMoreBtn.disabled = false;
+                loadMoreBtn.textContent = 'Load more comments';
+                loadMoreBtn.setAttribute('data-next-cursor', data.next_cursor || '');
+                loadMoreBtn.style.display = data.next_cursor ? '' : 'none';
+
                 // Update comment count
-                const commentCount = document.querySelector(`.comments-section[data-article-id="${articleId}"] .comment-count`);
+                const commentCount = commentsSection.querySelector('.comment-count');
                 if (commentCount) {
-                    commentCount.textContent = data.comments.length;
+                    commentCount.textContent = data.comment_count;
                 }
-            } else {
+            } else if (!cursor) {
                 commentsList.innerHTML = '<p class="error-message">Failed to load comments.</p>';
             }
         })
         .catch(error => {
             console.error('Error loading comments:', error);
-            commentsList.innerHTML = '<p class="error-message">Network error. Please try again.</p>';
+            if (cursor) {
+                loadMoreBtn.disabled = false;
+                loadMoreBtn.textContent = 'Try Again';
+            } else {
+                commentsList.innerHTML = '<p class="error-message">Network error. Please try again.</p>';
+            }
         });
 }
 
@@ -942,6 +990,48 @@ function updateHappinessMeter(articleId, data) {
     }
 }
 
+/**
+ * Load likes, comment counts and happiness data for several articles in one request
+ * @param {Array} articleIds - Article IDs
+ */
+function loadEngagement(articleIds) {
+    if (articleIds.length === 0) return;
+
+    fetch(`/api/articles/engagement?ids=${articleIds.join(',')}`)
+        .then(response => response.json())
+        .then(data => {
+            if (data.success) {
+                Object.entries(data.engagement).forEach(([articleId, engagement]) => {
+                    applyEngagement(parseInt(articleId), engagement);
+                });
+            }
+        })
+        .catch(error => console.error('Error loading engagement data:', error));
+}
+
+/**
+ * Update like button, likes display, comment count and happiness meter for an article
+ * @param {number} articleId - Article ID
+ * @param {Object} data - Engagement data from backend
+ */
+function applyEngagement(articleId, data) {
+    const likeBtn = document.querySelector(`.like-btn[data-article-id="${articleId}"]`);
+    if (likeBtn) {
+        likeBtn.setAttribute('data-liked', data.user_has_liked ? 'true' : 'false');
+        likeBtn.querySelector('.like-outline').style.display = data.user_has_liked ? 'none' : '';
+        likeBtn.querySelector('.like-filled').style.display = data.user_has_liked ? '' : 'none';
+    }
+
+    updateLikesDisplay(articleId, data);
+
+    const commentCount = document.querySelector(`.comments-section[data-article-id="${articleId}"] .comment-count`);
+    if (commentCount) {
+        commentCount.textContent = data.comment_count;
+    }
+
+    updateHappinessMeter(articleId, data);
+}
+
 /**
  * Load happiness data for an article
  * @param {number} articleId - Article ID
@@ -1016,11 +1106,10 @@ document.addEventListener('DOMContentLoaded', function() {
     // Initialize dark mode
     initDarkMode();
 
-    // Load happiness data for all visible articles
-    document.querySelectorAll('.happiness-meter').forEach(meter => {
-        const articleId = parseInt(meter.getAttribute('data-article-id'));
-        loadHappinessMeter(articleId);
-    });
+    // Hydrate likes, comment counts and happiness data for all visible articles in one request
+    const articleIds = Array.from(document.querySelectorAll('.happiness-meter'))
+        .map(meter => parseInt(meter.getAttribute('data-article-id')));
+    loadEngagement(articleIds);
 
     // Mark articles as read after a few seconds of viewing
     setTimeout(() => {
@@ -0,0 +1,741 @@
+"""Micro-benchmarks for hot query paths
+
+Runs against a throwaway SQLite database so it never touches real data.
+
+Usage:
+    python benchmark.py unread-filter
+    python benchmark.py rss-fetch
+    python benchmark.py story-dedupe
+    python benchmark.py classify
+    python benchmark.py sentiment
+    python benchmark.py ingest
+    python benchmark.py bulk-insert
+    python benchmark.py watermark
+    python benchmark.py retention
+    python benchmark.py dashboard
+    python benchmark.py boot [--budget-ms 800]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Point the app at a scratch database before anything imports the config
+_db_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+_db_file.close()
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file.name}'
+os.environ['SCHEDULER_ENABLED'] = 'false'  # No feed polling in the middle of a measurement
+os.environ['JOB_WORKERS'] = '0'
+
+from app import create_app  # noqa: E402
+from app.models import db, User, Article, ReadArticle  # noqa: E402
+from app.config import Config  # noqa: E402
+
+
+def timed(func, repeat=20):
+    """Run func `repeat` times and return the median wall time in milliseconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def seed_articles(count):
+    """Bulk insert `count` approved, active articles"""
+    base = datetime.utcnow()
+    db.session.execute(db.insert(Article), [
+        {
+            'title': f'Article {i}',
+            'source_url': f'https://example.com/{i}',
+            'published_at': base - timedelta(minutes=i),
+            'cached_at': base,
+            'is_active': True,
+            'status': 'approved',
+            'source_type': 'auto',
+        }
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def seed_user(username, read_count):
+    """Create a user who has read the newest `read_count` articles"""
+    user = User(username=username)
+    user.set_password('benchmark')
+    db.session.add(user)
+    db.session.commit()
+
+    article_ids = [row[0] for row in db.session.query(Article.id)
+                   .order_by(Article.published_at.desc())
+                   .limit(read_count)]
+    db.session.execute(db.insert(ReadArticle), [
+        {'user_id': user.id, 'article_id': article_id} for article_id in article_ids
+    ])
+    db.session.commit()
+    return user
+
+
+# ==================== BENCHMARKS ====================
+
+def bench_unread_filter(args):
+    """Compare NOT IN (read id list) against the correlated NOT EXISTS filter"""
+    from app.services.cache_service import filter_by_read_status
+
+    read_counts = [10, 1000, 100000]
+    seed_articles(max(read_counts) + Config.ARTICLES_PER_PAGE * 10)
+
+    def legacy_page(user_id):
+        read_ids = [r[0] for r in db.session.query(ReadArticle.article_id).filter_by(user_id=user_id).all()]
+        query = Article.query.filter_by(is_active=True, status='approved')
+        if read_ids:
+            query = query.filter(~Article.id.in_(read_ids))
+        return query.order_by(Article.published_at.desc()).limit(Config.ARTICLES_PER_PAGE).all()
+
+    def anti_join_page(user_id):
+        query = filter_by_read_status(Article.query.filter_by(is_active=True, status='approved'), user_id)
+        return query.order_by(Article.published_at.desc()).limit(Config.ARTICLES_PER_PAGE).all()
+
+    print(f"{'reads':>8}  {'NOT IN (ms)':>12}  {'NOT EXISTS (ms)':>16}")
+    for read_count in read_counts:
+        user = seed_user(f'reader{read_count}', read_count)
+        try:
+            legacy = f'{timed(lambda: legacy_page(user.id), args.repeat):.2f}'
+        except Exception as e:
+            db.session.rollback()
+            legacy = f'error: {type(e).__name__}'
+        anti_join = timed(lambda: anti_join_page(user.id), args.repeat)
+        print(f'{read_count:>8}  {legacy:>12}  {anti_join:>16.2f}')
+
+
+def _rss_document(name, entries=20):
+    """A small RSS 2.0 document with `entries` items"""
+    items = ''.join(
+        f'<item><title>{name} story {i}</title><link>http://localhost/{name}/{i}</link>'
+        f'<description>Good news number {i}</description>'
+        f'<pubDate>Mon, 0{1 + i % 9} Jan 2024 12:00:00 GMT</pubDate></item>'
+        for i in range(entries)
+    )
+    return (f'<?xml version="1.0"?><rss version="2.0"><channel><title>{name}</title>'
+            f'{items}</channel></rss>').encode('utf-8')
+
+
+class _SlowFeedHandler(BaseHTTPRequestHandler):
+    """
+    Serves /<delay>/<name>[/<entries>] as an RSS feed after sleeping <delay> seconds (honours If-None-Match)
+
+    /trickle/<name> sends a byte every half second for a minute, so only a
+    total deadline (not a read timeout) stops it.
+    """
+
+    def do_GET(self):
+        delay, name, *entries = self.path.split('/')[1:]
+        if delay == 'trickle':
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml')
+            self.end_headers()
+            try:
+                for _ in range(120):
+                    self.wfile.write(b' ')
+                    self.wfile.flush()
+                    time.sleep(0.5)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            return
+        time.sleep(float(delay))
+        body = _rss_document(name, int(entries[0]) if entries else 20)
+        etag = f'"{hash(body)}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_rss_fetch(args):
+    """
+    Compare sequential, concurrent and revalidated RSS ingestion against a local server with slow feeds
+
+    Timing only; that stalled feeds are abandoned in time is covered by
+    tests/test_rss_feed_service.py.
+    """
+    from app.services.rss_feed_service import fetch_articles_from_rss
+    from app.services.feed_cache import forget_feed_states
+
+    server, base = _feed_server()
+
+    # One feed hangs past the read timeout and one trickles past the total
+    # deadline; the rest respond at different speeds
+    delays = [0.2, 0.5, 0.5, 1.0, 1.0, 1.5]
+    feeds = [{'url': f'{base}/{delay}/feed{i}', 'source_name': f'Feed {i}'} for i, delay in enumerate(delays)]
+    stalled = [
+        {'url': f'{base}/30/hanging', 'source_name': 'Hanging feed'},
+        {'url': f'{base}/trickle/trickling', 'source_name': 'Trickling feed'},
+    ]
+
+    saved = Config.RSS_READ_TIMEOUT, Config.RSS_FETCH_DEADLINE, Config.RSS_CACHE_DIR
+    Config.RSS_READ_TIMEOUT = 2
+    Config.RSS_FETCH_DEADLINE = 3
+    Config.RSS_CACHE_DIR = tempfile.mkdtemp(prefix='benchmark_feeds_')
+    try:
+        print(f"{len(feeds)} feeds, delays {delays} + 1 hanging + 1 trickling; "
+              f"read timeout {Config.RSS_READ_TIMEOUT}s, deadline {Config.RSS_FETCH_DEADLINE}s")
+        print(f"{'mode':>12}  {'time (s)':>9}  {'articles':>9}  {'returned':>9}  {'abandoned':>9}")
+        modes = (
+            ('sequential', False, False),
+            ('concurrent', True, False),
+            ('unchanged', True, True),  # Second run: every feed answers 304, nothing is parsed
+        )
+        for mode, concurrent, only_changed in modes:
+            if not only_changed:
+                forget_feed_states()
+            outcomes = {}
+
+            def report(feed_config, error=None, **kwargs):
+                outcomes[feed_config['source_name']] = error
+
+            start = time.perf_counter()
+            articles = fetch_articles_from_rss(max_articles=1000, feeds=feeds + stalled, concurrent=concurrent,
+                                               only_changed=only_changed, report=report) or []
+            elapsed = time.perf_counter() - start
+            returned = sum(1 for error in outcomes.values() if error is None)
+            abandoned = len(outcomes) - returned
+            print(f'{mode:>12}  {elapsed:>9.2f}  {len(articles):>9}  {returned:>9}  {abandoned:>9}')
+    finally:
+        forget_feed_states()
+        shutil.rmtree(Config.RSS_CACHE_DIR, ignore_errors=True)
+        Config.RSS_READ_TIMEOUT, Config.RSS_FETCH_DEADLINE, Config.RSS_CACHE_DIR = saved
+        server.shutdown()
+
+
+def _feed_server():
+    """Start a local _SlowFeedHandler server; returns (server, base URL)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SlowFeedHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def bench_ingest(args):
+    """
+    Peak memory and per-stage time of streaming ingestion as the number of feeds grows
+
+    Exits non-zero if the streamed peak grows with the feed count. The
+    smallest run already fills the download pool and two row chunks, the
+    buffers whose size the streamed peak is bounded by.
+    """
+    import tracemalloc
+    from app.services.rss_feed_service import FeedDownloads, iter_articles
+    from app.services.ingest_pipeline import ingest_feeds, article_rows
+    from app.services.ingest_service import upsert_articles, batches
+    from app.services.feed_cache import forget_feed_states
+
+    server, base = _feed_server()
+    entries = 100
+
+    def collect_all(feeds):
+        # Previous approach: every article of every feed in one list, sorted, then stored
+        articles = list(iter_articles(FeedDownloads(feeds)))
+        articles.sort(key=lambda x: x['published_date'], reverse=True)
+        rows = list(article_rows(articles, 'approved'))
+        for batch in batches(rows, 500):
+            upsert_articles(batch)
+
+    def streamed(feeds):
+        ingest_feeds(feeds, status='approved', only_changed=False)
+
+    def measure(func, feeds):
+        forget_feed_states()
+        Article.query.delete()
+        db.session.commit()
+        tracemalloc.start()
+        start = time.perf_counter()
+        func(feeds)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        db.session.commit()
+        return elapsed, peak / 1024 / 1024
+
+    saved = Config.RSS_CACHE_DIR
+    Config.RSS_CACHE_DIR = tempfile.mkdtemp(prefix='benchmark_feeds_')
+    try:
+        print(f"{entries} entries per feed (times include tracemalloc overhead)")
+        print(f"{'feeds':>6}  {'collect-all MB':>15}  {'streamed MB':>12}  {'collect-all s':>14}  {'streamed s':>11}")
+        streamed_peaks = []
+        smallest = max(Config.RSS_FETCH_WORKERS, 2 * Config.INGEST_CHUNK_SIZE // entries)
+        for feed_count in (smallest, smallest * 2, smallest * 4):
+            feeds = [{'url': f'{base}/0/feed{i}/{entries}', 'source_name': f'Feed {i}'} for i in range(feed_count)]
+            legacy_s, legacy_mb = measure(collect_all, feeds)
+            stream_s, stream_mb = measure(streamed, feeds)
+            streamed_peaks.append(stream_mb)
+            print(f'{feed_count:>6}  {legacy_mb:>15.1f}  {stream_mb:>12.1f}  {legacy_s:>14.2f}  {stream_s:>11.2f}')
+
+        forget_feed_states()
+        Article.query.delete()
+        db.session.commit()
+        result = ingest_feeds(feeds, status='approved', only_changed=False)
+        db.session.commit()
+        print(f"\nstages for {len(feeds)} feeds (no tracing):")
+        for stage in result['stages']:
+            print(f"{stage['stage']:>10}  {stage['items']:>7} items  {stage['seconds']:>6.2f}s")
+
+        # Four times the feeds may cost a little allocator noise, not a multiple
+        if max(streamed_peaks) > min(streamed_peaks) * 1.25:
+            print(f"\nFAIL: streamed peak memory grew with the feed count "
+                  f"({min(streamed_peaks):.1f} -> {max(streamed_peaks):.1f} MB)")
+            return 1
+    finally:
+        forget_feed_states()
+        shutil.rmtree(Config.RSS_CACHE_DIR, ignore_errors=True)
+        Config.RSS_CACHE_DIR = saved
+        server.shutdown()
+
+
+def bench_bulk_insert(args):
+    """Rows/second of ORM add-per-row against chunked executemany writes, with a few bad rows"""
+    from app.services.ingest_service import BulkWriter, url_hash
+
+    def rows(count, prefix, bad_every=None):
+        base = datetime.utcnow()
+        for i in range(count):
+            yield {
+                'title': None if bad_every and i % bad_every == 0 else f'{prefix} article {i}',
+                'description': 'Something good happened',
+                'source_url': f'https://example.com/{prefix}/{i}',
+                'url_hash': url_hash(f'https://example.com/{prefix}/{i}'),
+                'source_name': 'Benchmark',
+                'published_at': base,
+                'source_type': 'manual',
+                'status': 'pending',
+                'is_active': True,
+            }
+
+    def orm(count):
+        for row in rows(count, f'orm{count}'):
+            db.session.add(Article(**row))
+        db.session.commit()
+
+    print(f"{'rows':>8}  {'method':>22}  {'seconds':>8}  {'rows/sec':>10}  {'failed':>7}")
+    for count in (10000, 100000):
+        start = time.perf_counter()
+        orm(count)
+        elapsed = time.perf_counter() - start
+        print(f"{count:>8}  {'ORM add, one commit':>22}  {elapsed:>8.2f}  {count / elapsed:>10,.0f}  {'-':>7}")
+
+        for bad_every, label in ((None, 'chunked executemany'), (10000, '... 1 bad row per 10k')):
+            writer = BulkWriter(commit=True).write(rows(count, f'bulk{bad_every}{count}', bad_every))
+            report = writer.report()
+            print(f"{count:>8}  {label:>22}  {report['seconds']:>8.2f}  {report['rows_per_second']:>10,}  "
+                  f"{report['failed']:>7}")
+
+
+def bench_story_dedupe(args):
+    """Per-article cost of near-duplicate clustering as the archive grows"""
+    import random
+    from app.services.story_service import assign_stories
+
+    rng = random.Random(1)
+    vocabulary = [f'word{i}' for i in range(5000)]
+
+    def insert_batch(count, age_days=0, story=False):
+        cached_at = datetime.utcnow() - timedelta(days=age_days)
+        db.session.execute(db.insert(Article), [
+            {
+                'title': ' '.join(rng.sample(vocabulary, 10)),
+                'description': ' '.join(rng.sample(vocabulary, 25)),
+                'published_at': cached_at,
+                'cached_at': cached_at,
+                'status': 'approved',
+            }
+            for _ in range(count)
+        ])
+        if story:
+            Article.query.filter(Article.story_id.is_(None), Article.cached_at == cached_at)\
+                .update({'story_id': Article.id}, synchronize_session=False)
+        db.session.commit()
+
+    # A week of recent articles in the candidate index
+    window = 2000
+    insert_batch(window)
+    assign_stories(batch_size=window)
+    db.session.commit()
+
+    batch = 200
+    archived = 0
+    print(f"{window} recent articles indexed")
+    print(f"{'archive':>8}  {'ms/article':>11}")
+    for target in (1000, 10000, 100000):
+        # Older, already clustered articles outside the window (untimed)
+        while archived < target:
+            step = min(10000, target - archived)
+            insert_batch(step, age_days=Config.STORY_WINDOW_DAYS + 30, story=True)
+            archived += step
+
+        samples = []
+        for _ in range(max(1, args.repeat // 4)):
+            insert_batch(batch)
+            start = time.perf_counter()
+            assign_stories(batch_size=batch)
+            db.session.commit()
+            samples.append((time.perf_counter() - start) * 1000 / batch)
+        print(f'{target:>8}  {statistics.median(samples):>11.3f}')
+
+
+def bench_classify(args):
+    """
+    Articles/sec of the keyword classifier against the old substring scan
+
+    Also checks the classifier against a regex reference (each keyword's
+    word starts, i.e. the old substring scan anchored at the start of a word,
+    minus KEYWORD_EXCLUSIONS) on the sample titles and on every keyword with
+    common suffixes attached; exits non-zero on any difference.
+    """
+    import random
+    import re
+    from app.services.keyword_classifier import (
+        default_classifier, prefixes, POSITIVE_KEYWORDS, NEGATIVE_KEYWORDS, KEYWORD_EXCLUSIONS
+    )
+
+    def legacy_is_positive(title, description):
+        # The previous implementation: lists rebuilt per call, one substring scan per keyword
+        negative_keywords = list(NEGATIVE_KEYWORDS)
+        positive_keywords = list(POSITIVE_KEYWORDS)
+        text = f"{title} {description}".lower()
+        for keyword in negative_keywords:
+            if keyword.lower() in text:
+                return False
+        return any(keyword.lower() in text for keyword in positive_keywords)
+
+    rng = random.Random(1)
+    filler = ('the city council announced plans for a new park near the river where families '
+              'gather every weekend and local students shared their ideas with reporters').split()
+    keywords = POSITIVE_KEYWORDS + NEGATIVE_KEYWORDS[:10] + ['award', 'warm', 'sword', 'diet']
+    articles = []
+    for _ in range(2000):
+        title = rng.sample(filler, 8) + rng.sample(keywords, 1)
+        description = rng.sample(filler, 20) + rng.sample(keywords, 2)
+        rng.shuffle(title)
+        rng.shuffle(description)
+        articles.append((' '.join(title).capitalize(), ' '.join(description)))
+
+    legacy_ms = timed(lambda: [legacy_is_positive(t, d) for t, d in articles], args.repeat)
+    batch_ms = timed(lambda: default_classifier.classify_batch(articles), args.repeat)
+    changed = sum(
+        legacy_is_positive(t, d) != verdict['positive']
+        for (t, d), verdict in zip(articles, default_classifier.classify_batch(articles))
+    )
+
+    print(f"{'classifier':>24}  {'articles/sec':>13}")
+    print(f"{'substring scan':>24}  {len(articles) / legacy_ms * 1000:>13,.0f}")
+    print(f"{'word-start regex (batch)':>24}  {len(articles) / batch_ms * 1000:>13,.0f}"
+          f"  ({legacy_ms / batch_ms:.2f}x)")
+    print(f"{changed} of {len(articles)} verdicts differ from the substring scan (e.g. 'war' inside 'award')")
+
+    # Reference: a \bstart\w* regex per keyword, skipping excluded words
+    def reference_terms(text):
+        text = text.lower()
+        terms = {True: set(), False: set()}
+        for is_positive, keywords in ((True, POSITIVE_KEYWORDS), (False, NEGATIVE_KEYWORDS)):
+            for keyword in keywords:
+                if not keyword.isascii():
+                    if keyword in text:
+                        terms[is_positive].add(keyword)
+                    continue
+                *head, last = keyword.split()
+                pattern = r'\b' + ''.join(re.escape(word) + ' ' for word in head) \
+                    + '(' + '|'.join(map(re.escape, prefixes(last))) + r')(\w*)'
+                for found in re.finditer(pattern, text):
+                    word = found.group(1) + found.group(2)
+                    if not any(word.startswith(exclusion) and len(exclusion) > len(found.group(1))
+                               for exclusion in KEYWORD_EXCLUSIONS):
+                        terms[is_positive].add(keyword)
+        return terms
+
+    suffixes = ['', 's', 'ed', 'ing', 'ings', 'er', 'ers', 'ism', 'ous', 'ure', 'ent', 'al', 'cy', 'ened', 'ation']
+    samples = [f'{t} {d}' for t, d in articles] + [
+        keyword + suffix for keyword in POSITIVE_KEYWORDS + NEGATIVE_KEYWORDS for suffix in suffixes
+    ] + KEYWORD_EXCLUSIONS + ['wary', 'wines', 'award', 'sword', 'dietary', 'warmth', 'window']
+    mismatches = []
+    for text in samples:
+        expected = reference_terms(text)
+        positive_terms, negative_terms = default_classifier.match(text)
+        verdict = (bool(positive_terms) and not negative_terms, bool(negative_terms))
+        if verdict != (bool(expected[True]) and not expected[False], bool(expected[False])):
+            mismatches.append((text, positive_terms, negative_terms, expected))
+
+    must_be_negative = ['terrorism', 'threatened', 'bankruptcy', 'fraudulent', 'failure', 'murderous',
+                        'killings', 'devastate', 'cancerous', 'disastrous', 'accidental']
+    missed = [word for word in must_be_negative if not default_classifier.match(word)[1]]
+    collisions = [word for word in ('wary', 'wines', 'award', 'sword', 'warm', 'diet')
+                  if default_classifier.match(word) != ((['award'], []) if word == 'award' else ([], []))]
+
+    print(f"{len(mismatches)} of {len(samples)} samples differ from the word-start reference")
+    for text, positive_terms, negative_terms, expected in mismatches[:5]:
+        print(f"  {text[:60]!r}: got +{positive_terms} -{negative_terms}, "
+              f"expected +{sorted(expected[True])} -{sorted(expected[False])}")
+    if missed:
+        print(f"Not negative any more: {', '.join(missed)}")
+    if collisions:
+        print(f"False matches: {', '.join(collisions)}")
+    if mismatches or missed or collisions:
+        return 1
+
+
+def bench_sentiment(args):
+    """Positivity scoring throughput: SentimentModel.score_batch against a naive per-article loop"""
+    import math
+    import random
+    from app.services.keyword_classifier import POSITIVE_KEYWORDS, NEGATIVE_KEYWORDS, tokenize
+    from app.services.sentiment_service import SentimentModel
+
+    rng = random.Random(1)
+    words = [f'word{i}' for i in range(3000)] + POSITIVE_KEYWORDS + NEGATIVE_KEYWORDS[1:]
+
+    def text():
+        return ' '.join(rng.choice(words) for _ in range(35))
+
+    model = SentimentModel.train([text() for _ in range(500)], [text() for _ in range(500)])
+    texts = [text() for _ in range(10000)]
+    weights = dict(zip((word.encode() for word in model.vocabulary), model.weights.tolist()))
+
+    def per_article():
+        return [1 / (1 + math.exp(-(model.bias + sum(weights.get(word, 0.0) for word in set(tokenize(t))))))
+                for t in texts]
+
+    loop_ms = timed(per_article, args.repeat)
+    batch_ms = timed(lambda: model.score_batch(texts), args.repeat)
+    print(f"{len(model.vocabulary)} word model, {len(texts)} articles")
+    print(f"{'scoring':>18}  {'articles/sec':>13}")
+    print(f"{'per-article loop':>18}  {len(texts) / loop_ms * 1000:>13,.0f}")
+    print(f"{'score_batch':>18}  {len(texts) / batch_ms * 1000:>13,.0f}")
+
+
+def bench_watermark(args):
+    """Per-poll parse cost of a feed with a few new entries, with and without a watermark, as the feed grows"""
+    from email.utils import format_datetime
+    from app.services.rss_feed_service import iter_feed_entries
+
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    new_entries = 5
+
+    def document(first, count):
+        # Newest first, one minute apart, as feeds list their entries
+        items = ''.join(
+            f'<item><title>Story {i}</title><link>http://localhost/story/{i}</link>'
+            f'<guid>http://localhost/story/{i}</guid>'
+            f'<description>&lt;p&gt;Good news number {i}&lt;/p&gt;</description>'
+            f'<pubDate>{format_datetime(base + timedelta(minutes=i), usegmt=True)}</pubDate></item>'
+            for i in range(first + count - 1, first - 1, -1)
+        )
+        return (f'<?xml version="1.0"?><rss version="2.0"><channel><title>Bench</title>'
+                f'{items}</channel></rss>').encode('utf-8')
+
+    def parse(content, watermark):
+        entries = iter_feed_entries(content, {'content-type': 'application/rss+xml'}, {'url': 'http://localhost/feed', 'source_name': 'Bench',
+                                                  'watermark': watermark})
+        count = 0
+        while True:
+            try:
+                next(entries)
+                count += 1
+            except StopIteration as stop:
+                return count, stop.value
+
+    print(f"{new_entries} new entries per poll")
+    print(f"{'feed length':>12}  {'full parse ms':>14}  {'watermark ms':>13}  {'entries parsed':>15}")
+    for length in (50, 200, 1000):
+        _, watermark = parse(document(0, length), None)
+        # Next poll: the feed gained new_entries at the top and dropped as many at the bottom
+        content = document(new_entries, length)
+        full_ms = timed(lambda: parse(content, None), args.repeat)
+        watermark_ms = timed(lambda: parse(content, watermark), args.repeat)
+        parsed, _ = parse(content, watermark)
+        print(f'{length:>12}  {full_ms:>14.2f}  {watermark_ms:>13.2f}  {parsed:>15}')
+
+
+# Run in a fresh interpreter by bench_boot: prints import and create_app() times as JSON
+_BOOT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+booted = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (booted - imported) * 1000,
+    'modules': [name for name in ('apscheduler', 'feedparser', 'requests', 'numpy') if name in sys.modules],
+}))
+"""
+
+
+def bench_boot(args):
+    """Import and create_app() time of a fresh worker process, with and without the schema version check"""
+    import json
+    import subprocess
+
+    env = dict(os.environ, SCHEDULER_ENABLED='false', JOB_WORKERS='0')
+    runs = min(args.repeat, 10)
+    results = {}
+    print(f"median of {runs} fresh processes")
+    print(f"{'SCHEMA_CHECK':>13}  {'import ms':>10}  {'create_app ms':>14}  {'total ms':>9}  ingestion modules loaded")
+    for mode in ('always', 'auto'):
+        samples = []
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, '-c', _BOOT_PROBE],
+                env=dict(env, SCHEMA_CHECK=mode),
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                capture_output=True, text=True, check=True
+            ).stdout
+            samples.append(json.loads(output.splitlines()[-1]))
+        import_ms = statistics.median(sample['import_ms'] for sample in samples)
+        create_ms = statistics.median(sample['create_app_ms'] for sample in samples)
+        results[mode] = import_ms + create_ms
+        print(f"{mode:>13}  {import_ms:>10.0f}  {create_ms:>14.0f}  {import_ms + create_ms:>9.0f}  "
+              f"{', '.join(samples[-1]['modules']) or 'none'}")
+
+    if args.budget_ms and results['auto'] > args.budget_ms:
+        print(f"Boot took {results['auto']:.0f} ms, over the {args.budget_ms} ms budget")
+        return 1
+
+
+def bench_retention(args):
+    """Whole-table expiry in one statement against batched expiry and archival"""
+    from app.models import Like, ARCHIVE_TABLES
+    from app.services.retention_service import expire_articles, archive_articles
+
+    def seed_old(count, reader):
+        """`count` articles cached 40 days ago, each liked and read by `reader`"""
+        old = datetime.utcnow() - timedelta(days=40)
+        first = (db.session.query(db.func.max(Article.id)).scalar() or 0) + 1
+        seed_articles(count)
+        Article.query.filter(Article.id >= first).update({'cached_at': old}, synchronize_session=False)
+        ids = range(first, first + count)
+        db.session.execute(db.insert(Like), [{'user_id': reader.id, 'article_id': i} for i in ids])
+        db.session.execute(db.insert(ReadArticle), [{'user_id': reader.id, 'article_id': i} for i in ids])
+        db.session.commit()
+
+    print(f"{'articles':>9}  {'method':>24}  {'total (ms)':>11}  {'per batch (ms)':>15}  {'hot rows left':>14}")
+    for count in (10000, 100000):
+        reader = User(username=f'retention{count}')
+        reader.set_password('benchmark')
+        db.session.add(reader)
+        db.session.commit()
+
+        seed_old(count, reader)
+        cutoff = datetime.utcnow() - timedelta(days=Config.ARTICLE_RETENTION_DAYS)
+        start = time.perf_counter()
+        Article.query.filter(Article.cached_at < cutoff).update({'is_active': False})
+        db.session.commit()
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{count:>9}  {'one UPDATE':>24}  {elapsed:>11.1f}  {elapsed:>15.1f}  {count:>14}")
+
+        Article.query.update({'is_active': True})
+        db.session.commit()
+        start = time.perf_counter()
+        expired = expire_articles()
+        elapsed = (time.perf_counter() - start) * 1000
+        batches = -(-expired // Config.RETENTION_BATCH_SIZE)
+        print(f"{count:>9}  {'batched expiry':>24}  {elapsed:>11.1f}  {elapsed / batches:>15.1f}  {count:>14}")
+
+        for policy in ('archive', 'delete'):
+            if policy == 'delete':
+                seed_old(count, reader)
+            start = time.perf_counter()
+            counts = archive_articles(policy=policy)
+            elapsed = (time.perf_counter() - start) * 1000
+            left = Article.query.count() + Like.query.count() + ReadArticle.query.count()
+            print(f"{count:>9}  {'batched ' + policy + ' + interactions':>24}  {elapsed:>11.1f}  "
+                  f"{elapsed / counts['batches']:>15.1f}  {left:>14}")
+
+    archived = db.session.execute(db.select(db.func.count()).select_from(ARCHIVE_TABLES['articles'])).scalar()
+    print(f"{archived} articles in the archive")
+
+
+def bench_dashboard(args):
+    """Five COUNT queries per dashboard load against the article_counts rollup"""
+    from app.models import ReportedComment
+    from app.services.article_stats import rebuild_article_counts, get_article_counts
+    from app.services.cache_service import get_dashboard_counts
+
+    def legacy_counts():
+        return {
+            'total_articles': Article.query.filter_by(is_active=True, status='approved').count(),
+            'manual_articles': Article.query.filter_by(source_type='manual', is_active=True, status='approved').count(),
+            'auto_articles': Article.query.filter_by(source_type='auto', is_active=True, status='approved').count(),
+            'pending_count': Article.query.filter_by(status='pending').count(),
+            'reports_count': ReportedComment.query.filter_by(is_resolved=False).count(),
+        }
+
+    print(f"{'articles':>9}  {'5 COUNTs (ms)':>14}  {'GROUP BY rebuild (ms)':>22}  {'rollup (ms)':>12}  {'match':>6}")
+    seeded = 0
+    for count in (100000, 1000000):
+        seed_articles(count - seeded)
+        seeded = count
+        # A realistic mix: some manual, some pending
+        Article.query.filter(Article.id % 10 == 0).update({'source_type': 'manual'}, synchronize_session=False)
+        Article.query.filter(Article.id % 7 == 0).update({'status': 'pending'}, synchronize_session=False)
+        db.session.commit()
+
+        legacy = timed(legacy_counts, args.repeat)
+        start = time.perf_counter()
+        rebuild_article_counts()
+        rebuild = (time.perf_counter() - start) * 1000
+        rollup = timed(get_article_counts, args.repeat)
+        match = legacy_counts() == get_dashboard_counts.uncached()
+        print(f"{count:>9}  {legacy:>14.2f}  {rebuild:>22.1f}  {rollup:>12.3f}  {str(match):>6}")
+
+
+BENCHMARKS = {
+    'unread-filter': bench_unread_filter,
+    'rss-fetch': bench_rss_fetch,
+    'story-dedupe': bench_story_dedupe,
+    'classify': bench_classify,
+    'sentiment': bench_sentiment,
+    'ingest': bench_ingest,
+    'bulk-insert': bench_bulk_insert,
+    'watermark': bench_watermark,
+    'retention': bench_retention,
+    'dashboard': bench_dashboard,
+    'boot': bench_boot,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Good News Aggregator benchmarks')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=20, help='Samples per measurement')
+    parser.add_argument('--budget-ms', type=float, help='boot: exit non-zero if a worker boot takes longer')
+    args = parser.parse_args()
+
+    app = create_app()
+    try:
+        with app.app_context():
+            return BENCHMARKS[args.benchmark](args)
+    finally:
+        os.unlink(_db_file.name)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
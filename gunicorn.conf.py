@@ -0,0 +1,22 @@
+"""Gunicorn settings (gunicorn -c gunicorn.conf.py run:app)"""
+import os
+
+bind = '0.0.0.0:8000'
+workers = 4
+timeout = 120
+accesslog = '-'
+errorlog = '-'
+
+# Import the app and check the schema once in the master, then fork the
+# workers from it. create_app() sees PRELOAD_APP and leaves opening database
+# connections and starting the scheduler and job threads to each worker
+# (post_fork below).
+preload_app = True
+os.environ.setdefault('PRELOAD_APP', 'true')
+
+
+def post_fork(server, worker):
+    """Runs in each worker right after the fork: fresh connections and its own background threads"""
+    from app import after_worker_fork
+
+    after_worker_fork(worker.app.wsgi())
@@ -2,6 +2,7 @@
 import sys
 from app import create_app
 from app.models import db, User
+from app.auth import invalidate_principal
 
 app = create_app()
 
@@ -11,6 +12,7 @@ with app.app_context():
         user = User.query.first()
         if user:
             user.is_admin = True
+            invalidate_principal(user.id)
             db.session.commit()
             print(f'User "{user.username}" is now admin!')
         else:
@@ -22,6 +24,7 @@ with app.app_context():
 
         if user:
             user.is_admin = True
+            invalidate_principal(user.id)
             db.session.commit()
             print(f'User "{user.username}" is now admin!')
         else:
@@ -1,6 +1,7 @@
 """Setup script to recreate database and make first user admin"""
 from app import create_app
 from app.models import db, User
+from app.auth import invalidate_principal
 from app.services.cache_service import update_cache
 
 app = create_app()
@@ -18,6 +19,7 @@ with app.app_context():
     user = User.query.first()
     if user:
         user.is_admin = True
+        invalidate_principal(user.id)
         db.session.commit()
         print(f'User "{user.username}" is now admin')
     else:
@@ -1,7 +1,8 @@
 #!/bin/bash
 
-# Initialize database
-python -c "from app import create_app; from app.models import db; app = create_app(); app.app_context().push(); db.create_all(); print('Database initialized')"
+# Share the cache between the Gunicorn workers on this host
+export CACHE_BACKEND=${CACHE_BACKEND:-sqlite}
 
-# Start Gunicorn with 4 worker processes
-gunicorn --bind=0.0.0.0:8000 --workers=4 --timeout=120 --access-logfile '-' --error-logfile '-' run:app
+# Start Gunicorn with 4 worker processes; the app (and its schema check) is
+# loaded once in the master and forked into the workers
+gunicorn -c gunicorn.conf.py run:app
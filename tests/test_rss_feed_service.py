@@ -0,0 +1,114 @@
+"""Download deadlines of the RSS fetch stage, against a local server with stalled feeds"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from app.config import Config
+from app.services.rss_feed_service import download_feed, fetch_articles_from_rss
+
+READ_TIMEOUT = 1
+DEADLINE = 2
+MARGIN = 1.0  # Seconds allowed on top of the deadline for thread and parse overhead
+
+
+def _rss_document(name, entries=5):
+    items = ''.join(
+        f'<item><title>{name} story {i}</title><link>http://localhost/{name}/{i}</link>'
+        f'<description>Good news number {i}</description>'
+        f'<pubDate>Mon, 0{1 + i} Jan 2024 12:00:00 GMT</pubDate></item>'
+        for i in range(entries)
+    )
+    return (f'<?xml version="1.0"?><rss version="2.0"><channel><title>{name}</title>'
+            f'{items}</channel></rss>').encode('utf-8')
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    """
+    /ok/<name> answers at once, /hang/<name> sends nothing for 30 seconds and
+    /trickle/<name> sends a byte every 0.2 seconds for 30 seconds, so only the
+    total deadline (not the read timeout) stops it
+    """
+
+    def do_GET(self):
+        kind, name = self.path.split('/')[1:3]
+        if kind == 'hang':
+            time.sleep(30)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        try:
+            if kind == 'trickle':
+                self.end_headers()
+                for _ in range(150):
+                    self.wfile.write(b' ')
+                    self.wfile.flush()
+                    time.sleep(0.2)
+                return
+            body = _rss_document(name)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def feed_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FeedHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def short_timeouts(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'RSS_READ_TIMEOUT', READ_TIMEOUT)
+    monkeypatch.setattr(Config, 'RSS_FETCH_DEADLINE', DEADLINE)
+    monkeypatch.setattr(Config, 'RSS_CACHE_DIR', str(tmp_path))
+
+
+def test_trickling_feed_is_abandoned_at_the_deadline(feed_server):
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        download_feed(f'{feed_server}/trickle/slow')
+    assert time.monotonic() - start <= DEADLINE + MARGIN
+
+
+def test_hanging_feed_is_abandoned_at_the_read_timeout(feed_server):
+    start = time.monotonic()
+    with pytest.raises(requests.RequestException):
+        download_feed(f'{feed_server}/hang/silent')
+    assert time.monotonic() - start <= READ_TIMEOUT + MARGIN
+
+
+def test_healthy_feed_downloads_whole(feed_server):
+    content, headers = download_feed(f'{feed_server}/ok/healthy')
+    assert content == _rss_document('healthy')
+
+
+@pytest.mark.parametrize('concurrent', [True, False])
+def test_stalled_feeds_do_not_hold_back_healthy_ones(feed_server, concurrent):
+    healthy = [{'url': f'{feed_server}/ok/feed{i}', 'source_name': f'Feed {i}'} for i in range(3)]
+    stalled = [
+        {'url': f'{feed_server}/hang/hanging', 'source_name': 'Hanging feed'},
+        {'url': f'{feed_server}/trickle/trickling', 'source_name': 'Trickling feed'},
+    ]
+    outcomes = {}
+
+    def report(feed_config, error=None, **kwargs):
+        outcomes[feed_config['source_name']] = error
+
+    start = time.monotonic()
+    articles = fetch_articles_from_rss(max_articles=None, feeds=healthy + stalled, concurrent=concurrent,
+                                       report=report)
+    elapsed = time.monotonic() - start
+
+    assert {name for name, error in outcomes.items() if error is not None} == {'Hanging feed', 'Trickling feed'}
+    assert {article['source']['name'] for article in articles} == {feed['source_name'] for feed in healthy}
+    # Concurrently the stalled feeds overlap; one after another they add up
+    assert elapsed <= (DEADLINE if concurrent else DEADLINE + READ_TIMEOUT) + MARGIN
@@ -0,0 +1,24 @@
+"""Script to train the positivity model from admin review history and re-score all articles"""
+import sys
+from app import create_app
+from app.models import db
+from app.config import Config
+from app.services.sentiment_service import train_from_history, save_model, score_articles, load_model
+
+app = create_app()
+
+with app.app_context():
+    model = train_from_history()
+    if model is None:
+        print('Not enough approved/rejected articles to train; keeping the current model.')
+        sys.exit(1)
+
+    save_model(model)
+    print(f'Saved model ({len(model.vocabulary)} words, '
+          f'{model.meta["approved"]} approved / {model.meta["rejected"]} rejected) to {Config.SENTIMENT_MODEL_PATH}')
+
+    if '--no-rescore' not in sys.argv:
+        load_model()  # Pick up the file we just wrote
+        count = score_articles(rescore=True)
+        db.session.commit()
+        print(f'Re-scored {count} articles')